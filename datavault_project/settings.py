@@ -90,6 +90,44 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# O cache 'artifacts' guarda o DDL e o Mermaid gerados para cada projeto.
+# MODELER_CACHE_BACKEND=file usa o cache em disco em MODELER_CACHE_LOCATION.
+
+if os.environ.get('MODELER_CACHE_BACKEND', 'locmem').lower() == 'file':
+    ARTIFACT_CACHE_BACKEND = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('MODELER_CACHE_LOCATION', str(BASE_DIR / '.cache' / 'artifacts')),
+    }
+else:
+    ARTIFACT_CACHE_BACKEND = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'modeler-artifacts',
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'artifacts': {
+        **ARTIFACT_CACHE_BACKEND,
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('MODELER_CACHE_MAX_ENTRIES', '1000')),
+        },
+    },
+}
+
+MODELER_ARTIFACT_CACHE = {
+    'ALIAS': 'artifacts',
+    # Limite total (em caracteres) dos artefatos mantidos pelo LRU; vale só
+    # para o locmem (o cache em disco é limitado por MODELER_CACHE_MAX_ENTRIES)
+    'MAX_BYTES': int(os.environ.get('MODELER_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,298 @@
+"""Lote de operações (create, update e delete) em hubs, links e satellites.
+
+Cada operação é um objeto com ``op``, ``kind`` (hub, link ou satellite) e
+os campos da entidade, no mesmo formato da importação (``importer``);
+``update`` e ``delete`` identificam a entidade por ``id``. Referências
+(hubs de um link, pai de um satellite) são feitas pelo nome atual, e
+valem os hubs e links criados no próprio lote. Em ``update``,
+``attributes`` substitui todo o catálogo do satellite.
+
+Todas as operações são validadas juntas em memória; se qualquer uma
+falhar, nada é gravado. Caso contrário, são aplicadas em uma transação:
+remoções (com a mesma cascata de ``deletion``), depois criações e
+alterações em lote.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .deletion import DeleteImpact
+from .forms import column_type_errors
+from .importer import BATCH_SIZE, ENTITY_FIELDS, REFERENCE_FIELDS, ModelImport, non_scalar_fields
+from .models import Hub, Link, Satellite, SatelliteAttribute
+from .signals import project_changed
+
+OPERATIONS = ('create', 'update', 'delete')
+MODELS = {'hub': Hub, 'link': Link, 'satellite': Satellite}
+# Tamanho máximo de um lote
+MAX_OPERATIONS = 10000
+
+
+def is_id(value):
+    """Se ``value`` é um id de entidade (inteiro; booleanos não contam)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class Batch:
+    """Valida e aplica um lote de operações em um projeto."""
+
+    def __init__(self, project, operations):
+        self.project = project
+        self.operations = operations
+        # Valida e grava as criações; seus erros também guardam a posição
+        # (índice + 1) da operação
+        self.model_import = ModelImport(project)
+        # tipo -> {id: índice da operação}
+        self.deletes = {kind: {} for kind in MODELS}
+        # tipo -> {id: (índice, instância alterada, campos alterados)}
+        self.updates = {kind: {} for kind in MODELS}
+        # tipo -> {id: nome antes da alteração}
+        self.old_names = {kind: {} for kind in MODELS}
+        # id do link -> [nomes dos hubs]; id do satellite -> ('hub'|'link', nome do pai)
+        self.link_hubs = {}
+        self.satellite_parents = {}
+        # id do satellite -> [SatelliteAttribute]
+        self.satellite_columns = {}
+        # Índices das operações de criação
+        self.creates = []
+        # Cascata das remoções (``DeleteImpact``), ou None sem remoções
+        self.impact = None
+        # tipo -> ids removidos, diretamente ou em cascata
+        self.removed = {kind: set() for kind in MODELS}
+
+    def error(self, index, message):
+        self.model_import.error(message, index + 1)
+
+    @property
+    def failed(self):
+        return bool(self.model_import.error_total)
+
+    def validate(self):
+        targets = {kind: {} for kind in MODELS}
+        for index, operation in enumerate(self.operations):
+            if not isinstance(operation, dict):
+                self.error(index, 'cada operação deve ser um objeto.')
+                continue
+            op, kind = operation.get('op'), operation.get('kind')
+            if not isinstance(kind, str) or op not in OPERATIONS or kind not in MODELS:
+                self.error(index, 'informe op (create, update ou delete) e kind (hub, link ou satellite).')
+            elif op == 'create':
+                self.creates.append(index)
+            elif not is_id(operation.get('id')):
+                self.error(index, f'{op} exige o id da entidade.')
+            elif operation['id'] in targets[kind]:
+                self.error(index, f'{kind} {operation["id"]} aparece em mais de uma operação.')
+            else:
+                targets[kind][operation['id']] = index
+
+        # Uma query por tipo para as entidades alteradas ou removidas
+        instances = {
+            kind: MODELS[kind].objects.filter(project=self.project, pk__in=list(ids)).in_bulk()
+            for kind, ids in targets.items() if ids
+        }
+        for kind, ids in targets.items():
+            for pk, index in ids.items():
+                if pk not in instances.get(kind, {}):
+                    self.error(index, f'{kind} {pk} não encontrado no projeto.')
+                elif self.operations[index]['op'] == 'delete':
+                    self.deletes[kind][pk] = index
+        self.free_deleted_names()
+
+        for kind, ids in targets.items():
+            for pk, index in ids.items():
+                instance = instances.get(kind, {}).get(pk)
+                if instance is not None and self.operations[index]['op'] == 'update':
+                    self.validate_update(index, kind, instance, self.operations[index])
+
+        for index in self.creates:
+            record = {field: value for field, value in self.operations[index].items() if field != 'op'}
+            # ``add`` avança a posição para índice + 1
+            self.model_import.count = index
+            self.model_import.add(record)
+        self.model_import.resolve()
+        self.resolve_updates()
+        self.check_names()
+        return not self.failed
+
+    def free_deleted_names(self):
+        """Tira dos nomes existentes as entidades removidas no lote, inclusive
+        as removidas em cascata (links dos hubs, satellites dos pais)."""
+        if not any(self.deletes.values()):
+            return
+        self.impact = DeleteImpact(
+            self.project, hubs=self.deletes['hub'], links=self.deletes['link'], satellites=self.deletes['satellite']
+        )
+        model_import = self.model_import
+        for pk, name in self.impact.hubs:
+            model_import.existing_hubs.pop(name, None)
+            self.removed['hub'].add(pk)
+        for pk, name in self.impact.links:
+            model_import.existing_links.pop(name, None)
+            self.removed['link'].add(pk)
+        for pk, name in self.impact.satellites:
+            model_import.existing_satellites.discard(name)
+            self.removed['satellite'].add(pk)
+
+    def validate_update(self, index, kind, instance, operation):
+        if instance.pk in self.removed[kind]:
+            self.error(index, f'{kind} {instance.pk} é removido neste lote.')
+            return
+        allowed = set(ENTITY_FIELDS[kind]) | set(REFERENCE_FIELDS[kind]) | {'op', 'kind', 'id'}
+        unknown = set(operation) - allowed
+        if unknown:
+            self.error(index, f'campo(s) desconhecido(s) em {kind}: {", ".join(sorted(unknown))}.')
+            return
+        nested = non_scalar_fields(operation, ENTITY_FIELDS[kind])
+        if nested:
+            self.error(index, f'{kind} {instance.pk}: {", ".join(nested)} deve(m) ser um valor simples.')
+            return
+        fields = [field for field in ENTITY_FIELDS[kind] if field in operation]
+        self.old_names[kind][instance.pk] = instance.name
+        for field in fields:
+            setattr(instance, field, operation[field])
+        try:
+            instance.clean_fields(exclude=['project', 'hub', 'link'])
+        except ValidationError as error:
+            for field, messages in error.message_dict.items():
+                self.error(index, f'{kind} {instance.pk}: {field}: {" ".join(messages)}')
+            return
+        if kind == 'hub':
+            errors = column_type_errors(instance.business_key_type, instance.business_key_length)
+            if 'length' in errors:
+                self.error(index, f'hub {instance.pk}: {errors["length"]}')
+        elif kind == 'link' and 'hubs' in operation:
+            hubs = operation['hubs']
+            if not hubs or not isinstance(hubs, list):
+                self.error(index, f'link {instance.pk}: informe a lista de hubs.')
+            elif not all(isinstance(hub, str) for hub in hubs):
+                self.error(index, f'link {instance.pk}: os hubs devem ser informados pelo nome.')
+            else:
+                self.link_hubs[instance.pk] = hubs
+        elif kind == 'satellite':
+            parents = [parent for parent in ('hub', 'link') if operation.get(parent)]
+            if len(parents) > 1:
+                self.error(index, f'satellite {instance.pk}: informe apenas um pai (hub ou link).')
+            elif parents and not isinstance(operation[parents[0]], str):
+                self.error(index, f'satellite {instance.pk}: o {parents[0]} deve ser informado pelo nome.')
+            elif parents:
+                self.satellite_parents[instance.pk] = (parents[0], operation[parents[0]])
+            if 'attributes' in operation:
+                self.validate_columns(index, instance, operation['attributes'])
+        self.updates[kind][instance.pk] = (index, instance, fields)
+
+    def validate_columns(self, index, satellite, attributes):
+        model_import = self.model_import
+        model_import.count = index + 1
+        columns, names = [], set()
+        for record in model_import.attribute_records(satellite.name, attributes):
+            column = model_import.attribute_column(record)
+            if column is None:
+                continue
+            if column.name in names:
+                self.error(index, f'atributo {satellite.name}.{column.name} duplicado.')
+            names.add(column.name)
+            columns.append(column)
+        self.satellite_columns[satellite.pk] = columns
+
+    def resolve_updates(self):
+        """Confere os nomes referenciados pelas alterações."""
+        hub_names = set(self.model_import.hubs) | set(self.model_import.existing_hubs)
+        link_names = set(self.model_import.links) | set(self.model_import.existing_links)
+        for pk, hubs in self.link_hubs.items():
+            missing = [hub for hub in hubs if hub not in hub_names]
+            if missing:
+                self.error(self.updates['link'][pk][0], f'link {pk}: hub(s) inexistente(s): {", ".join(missing)}.')
+        for pk, (kind, parent) in self.satellite_parents.items():
+            if parent not in (hub_names if kind == 'hub' else link_names):
+                self.error(self.updates['satellite'][pk][0], f'satellite {pk}: {kind} {parent} inexistente.')
+
+    def check_names(self):
+        """Nomes únicos por tipo depois das renomeações do lote."""
+        model_import = self.model_import
+        taken = {
+            'hub': set(model_import.hubs) | set(model_import.existing_hubs),
+            'link': set(model_import.links) | set(model_import.existing_links),
+            'satellite': set(model_import.satellites) | model_import.existing_satellites,
+        }
+        for kind, updates in self.updates.items():
+            renamed = {
+                pk: (index, instance.name) for pk, (index, instance, fields) in updates.items() if 'name' in fields
+            }
+            # Os nomes antigos das entidades renomeadas ficam livres
+            taken[kind] -= {self.old_names[kind][pk] for pk in renamed}
+            for pk, (index, name) in renamed.items():
+                if name in taken[kind]:
+                    self.error(index, f'{kind} {name} duplicado.')
+                taken[kind].add(name)
+
+    def results(self):
+        """Resultado por operação: erros ou o que foi (ou seria) feito."""
+        errors = {}
+        for position, message in self.model_import.problems:
+            errors.setdefault(position - 1, []).append(message)
+        results = []
+        ids = self.model_import.ids
+        for index, operation in enumerate(self.operations):
+            result = {'index': index}
+            if index in errors:
+                result['errors'] = errors[index]
+            elif self.failed:
+                result['status'] = 'valid'
+            else:
+                result['status'] = {'create': 'created', 'update': 'updated', 'delete': 'deleted'}[operation['op']]
+                kind = operation['kind']
+                result['id'] = ids[kind][operation['name']] if operation['op'] == 'create' else operation['id']
+            results.append(result)
+        return results
+
+    def apply(self):
+        project = self.project
+        with transaction.atomic():
+            if self.impact is not None:
+                self.impact.delete()
+            if self.creates:
+                self.model_import.write()
+            hub_ids = dict(self.model_import.existing_hubs, **self.model_import.ids.get('hub', {}))
+            link_ids = dict(self.model_import.existing_links, **self.model_import.ids.get('link', {}))
+
+            for pk, (kind, parent) in self.satellite_parents.items():
+                instance = self.updates['satellite'][pk][1]
+                instance.hub_id = hub_ids[parent] if kind == 'hub' else None
+                instance.link_id = link_ids[parent] if kind == 'link' else None
+                self.updates['satellite'][pk][2].extend(['hub', 'link'])
+            for kind, updates in self.updates.items():
+                fields = sorted({field for _, _, changed in updates.values() for field in changed})
+                if fields:
+                    MODELS[kind].objects.bulk_update(
+                        [instance for _, instance, _ in updates.values()], fields, batch_size=BATCH_SIZE
+                    )
+
+            if self.link_hubs:
+                Through = Link.hubs.through
+                Through.objects.filter(link_id__in=list(self.link_hubs)).delete()
+                Through.objects.bulk_create(
+                    [
+                        Through(link_id=pk, hub_id=hub_ids[hub])
+                        for pk, hubs in self.link_hubs.items()
+                        for hub in dict.fromkeys(hubs)
+                    ],
+                    batch_size=BATCH_SIZE,
+                )
+            if self.satellite_columns:
+                SatelliteAttribute.objects.filter(satellite_id__in=list(self.satellite_columns)).delete()
+                columns = []
+                for pk, entries in self.satellite_columns.items():
+                    for ordinal, column in enumerate(entries):
+                        column.satellite_id = pk
+                        column.ordinal = ordinal
+                        columns.append(column)
+                SatelliteAttribute.objects.bulk_create(columns, batch_size=BATCH_SIZE)
+            # As gravações em lote não disparam signals
+            project_changed(project.pk)
+
+
+def apply_batch(project, operations):
+    """Valida e aplica as operações; retorna (sucesso, resultados por operação)."""
+    batch = Batch(project, operations)
+    if batch.validate():
+        batch.apply()
+    return not batch.failed, batch.results()
@@ -0,0 +1,180 @@
+"""Benchmarks das views e geradores do modeler em projetos sintéticos grandes."""
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .cache import artifact_cache
+from .models import Hub, Link, Satellite, SatelliteAttribute, Project
+
+DEFAULT_SIZES = (100, 1000, 10000)
+# Views medidas: nome -> (método, função que monta a URL a partir do projeto)
+BENCHMARK_VIEWS = {
+    'project_detail': ('get', lambda project: reverse('project_detail', args=[project.pk])),
+    'visualize': ('get', lambda project: reverse('visualize', args=[project.pk])),
+    'view_ddl': ('get', lambda project: reverse('view_ddl', args=[project.pk])),
+    'generate_ddl': ('get', lambda project: reverse('generate_ddl', args=[project.pk])),
+    'create_satellite': ('get', lambda project: reverse('create_satellite', args=[project.pk])),
+    'delete_hub': ('post', lambda project: reverse(
+        'delete_hub', args=[project.hubs.order_by('-id').values_list('id', flat=True)[0]]
+    )),
+}
+METRICS = ('wall_ms', 'queries', 'peak_kb')
+
+SATELLITE_ATTRIBUTES = {'nome': 'string', 'quantidade': 'integer', 'valor': 'float', 'ativo': 'boolean'}
+LINK_SATELLITE_ATTRIBUTES = {'valor': 'float'}
+
+
+@transaction.atomic
+def create_synthetic_project(name, hubs, satellites_per_hub=2, batch_size=2000):
+    """Cria um projeto com ``hubs`` hubs encadeados por links, um satellite por
+    link e ``satellites_per_hub`` satellites por hub, com inserções em lote.
+
+    As inserções em lote não disparam signals; como o projeto é novo, não
+    há artefatos em cache a invalidar.
+    """
+    project = Project.objects.create(name=name)
+    Hub.objects.bulk_create(
+        [Hub(project=project, name=f'Hub {i}', business_key=f'bk_{i}') for i in range(hubs)],
+        batch_size=batch_size,
+    )
+    hub_ids = list(Hub.objects.filter(project=project).order_by('id').values_list('id', flat=True))
+    Link.objects.bulk_create(
+        [Link(project=project, name=f'Link {i}') for i in range(hubs - 1)],
+        batch_size=batch_size,
+    )
+    link_ids = list(Link.objects.filter(project=project).order_by('id').values_list('id', flat=True))
+    Through = Link.hubs.through
+    Through.objects.bulk_create(
+        [
+            Through(link_id=link_id, hub_id=hub_id)
+            for i, link_id in enumerate(link_ids)
+            for hub_id in (hub_ids[i], hub_ids[i + 1])
+        ],
+        batch_size=batch_size,
+    )
+
+    satellites = [
+        Satellite(project=project, name=f'Sat Link {i}', link_id=link_id)
+        for i, link_id in enumerate(link_ids)
+    ]
+    satellites += [
+        Satellite(project=project, name=f'Sat Hub {i} {j}', hub_id=hub_id)
+        for i, hub_id in enumerate(hub_ids)
+        for j in range(satellites_per_hub)
+    ]
+    Satellite.objects.bulk_create(satellites, batch_size=batch_size)
+    SatelliteAttribute.objects.bulk_create(
+        [
+            SatelliteAttribute(satellite_id=satellite_id, name=name, tipo=tipo, ordinal=ordinal)
+            for satellite_id, satellite_name in Satellite.objects.filter(project=project).values_list('id', 'name')
+            for ordinal, (name, tipo) in enumerate(
+                (LINK_SATELLITE_ATTRIBUTES if satellite_name.startswith('Sat Link') else SATELLITE_ATTRIBUTES).items()
+            )
+        ],
+        batch_size=batch_size,
+    )
+    return project
+
+
+def request(client, method, url):
+    """Executa a requisição em uma transação desfeita ao final, para que as
+    views que alteram o projeto (delete_hub) meçam sempre o mesmo modelo."""
+    with transaction.atomic():
+        response = getattr(client, method)(url, {'confirm': 'true'} if method == 'post' else None)
+        # Respostas em streaming só executam ao serem consumidas
+        if response.streaming:
+            b''.join(response.streaming_content)
+        transaction.set_rollback(True)
+    if response.status_code >= 400:
+        raise RuntimeError(f'{url} respondeu {response.status_code}')
+
+
+def measure(client, method, url):
+    """Tempo e número de queries de uma requisição, com o cache de artefatos frio."""
+    artifact_cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        request(client, method, url)
+        wall = time.perf_counter() - started
+    return {'wall_ms': wall * 1000, 'queries': len(queries)}
+
+
+def measure_peak_memory(client, method, url):
+    """Pico de memória alocada em Python durante uma requisição (em execução
+    separada, pois o tracemalloc distorce o tempo)."""
+    artifact_cache.clear()
+    tracemalloc.start()
+    try:
+        request(client, method, url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=3, views=None, log=None):
+    """Mede cada view em um projeto sintético de cada tamanho.
+
+    Tempo e queries são a mediana das ``repeat`` execuções e o pico de
+    memória vem de uma execução extra (o cache de artefatos é limpo antes
+    de cada uma). Retorna ``{tamanho: {view: métricas}}``
+    com os tamanhos como texto, no formato gravado em JSON.
+    """
+    client = Client()
+    results = {}
+    for size in sizes:
+        started = time.perf_counter()
+        project = create_synthetic_project(f'Benchmark {size}', size)
+        if log:
+            log(f'{size} hubs: projeto criado em {time.perf_counter() - started:.1f}s')
+        results[str(size)] = {}
+        for name in views or BENCHMARK_VIEWS:
+            method, url = BENCHMARK_VIEWS[name]
+            runs = [measure(client, method, url(project)) for _ in range(repeat)]
+            metrics = {metric: statistics.median(run[metric] for run in runs) for metric in ('wall_ms', 'queries')}
+            metrics['peak_kb'] = measure_peak_memory(client, method, url(project))
+            results[str(size)][name] = metrics
+            if log:
+                log(f'  {name:<17} {metrics["wall_ms"]:>10.1f} ms {metrics["queries"]:>6.0f} queries '
+                    f'{metrics["peak_kb"]:>10.0f} KB')
+        project.delete()
+    return results
+
+
+def compare_results(results, baseline, threshold=0.2):
+    """Lista as regressões em relação ao baseline.
+
+    Tempo e memória regridem quando passam do baseline em mais de
+    ``threshold`` (fração); o número de queries regride a qualquer aumento.
+    """
+    regressions = []
+    for size, views in results.items():
+        for name, metrics in views.items():
+            reference = baseline.get(size, {}).get(name)
+            if not reference:
+                continue
+            for metric in METRICS:
+                if metric not in reference:
+                    continue
+                limit = reference[metric] if metric == 'queries' else reference[metric] * (1 + threshold)
+                if metrics[metric] > limit:
+                    regressions.append(
+                        f'{name} ({size} hubs): {metric} {metrics[metric]:.1f} > {reference[metric]:.1f}'
+                    )
+    return regressions
+
+
+def dump_results(results, path):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
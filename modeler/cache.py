@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class ArtifactCache:
+    """Cache dos artefatos gerados (DDL, Mermaid) de cada projeto.
+
+    Os artefatos ficam no framework de cache do Django (locmem por padrão,
+    file-based opcional) e são indexados pela impressão digital do conteúdo
+    do projeto (id + revisão). Com locmem, um índice LRU local limita o
+    total de bytes armazenados, removendo os artefatos menos usados quando
+    o limite estoura; um backend compartilhado entre processos (file-based)
+    fica limitado pelo próprio MAX_ENTRIES, pois um índice por processo não
+    enxergaria o que os outros gravam. As chaves de cada projeto ficam em
+    um conjunto no próprio backend, para ``invalidate`` removê-las sem
+    varrer o índice.
+    """
+
+    def __init__(self, alias='default', max_bytes=64 * 1024 * 1024):
+        self.alias = alias
+        self.max_bytes = max_bytes
+        self._index = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def bounded(self):
+        """Se o índice LRU vale para o backend (só caches locais ao processo)."""
+        return isinstance(self.backend, LocMemCache)
+
+    def fingerprint(self, project):
+        """Retorna a impressão digital atual do conteúdo do projeto."""
+        return f'{project.pk}:{project.revision}'
+
+    def _artifact_key(self, kind, project):
+        return f'modeler:artifact:{kind}:{self.fingerprint(project)}'
+
+    def _project_keys_key(self, project_id):
+        return f'modeler:artifact-keys:{project_id}'
+
+    def _track(self, key, size):
+        """Registra o uso da chave no índice LRU e devolve as chaves a remover."""
+        evicted = []
+        with self._lock:
+            if key in self._index:
+                self._size -= self._index.pop(key)
+            self._index[key] = size
+            self._size += size
+            while self._size > self.max_bytes and len(self._index) > 1:
+                old_key, old_size = self._index.popitem(last=False)
+                self._size -= old_size
+                evicted.append(old_key)
+        return evicted
+
+    def _forget(self, key):
+        with self._lock:
+            if key in self._index:
+                self._size -= self._index.pop(key)
+
+    def get(self, kind, project):
+        key = self._artifact_key(kind, project)
+        value = self.backend.get(key)
+        if not self.bounded:
+            return value
+        if value is None:
+            self._forget(key)
+            return None
+        self.backend.delete_many(self._track(key, len(value)))
+        return value
+
+    def set(self, kind, project, value):
+        size = len(value)
+        bounded = self.bounded
+        if bounded and size > self.max_bytes:
+            return
+        key = self._artifact_key(kind, project)
+        self.backend.set(key, value, None)
+        project_keys = self._project_keys_key(project.pk)
+        self.backend.set(project_keys, self.backend.get(project_keys, set()) | {key}, None)
+        if bounded:
+            self.backend.delete_many(self._track(key, size))
+
+    def get_or_build(self, kind, project, builder):
+        """Retorna o artefato do cache ou o constrói e armazena."""
+        value = self.get(kind, project)
+        if value is None:
+            value = builder()
+            self.set(kind, project, value)
+        return value
+
+    def invalidate(self, project_id):
+        """Descarta os artefatos conhecidos do projeto (de qualquer revisão).
+
+        Artefatos de revisões antigas já não são alcançáveis pela chave; isto
+        apenas libera o espaço que ocupam no backend e no índice LRU.
+        """
+        project_keys = self._project_keys_key(project_id)
+        stale = self.backend.get(project_keys, set())
+        with self._lock:
+            for key in stale:
+                if key in self._index:
+                    self._size -= self._index.pop(key)
+        self.backend.delete_many([*stale, project_keys])
+
+    def clear(self):
+        with self._lock:
+            self._index.clear()
+            self._size = 0
+        self.backend.clear()
+
+
+_config = getattr(settings, 'MODELER_ARTIFACT_CACHE', {})
+artifact_cache = ArtifactCache(
+    alias=_config.get('ALIAS', 'default'),
+    max_bytes=_config.get('MAX_BYTES', 64 * 1024 * 1024),
+)
@@ -0,0 +1,246 @@
+import re
+import zlib
+
+from .dialects import get_dialect
+
+
+def safe_identifier(name):
+    """Converte um nome livre em um identificador SQL seguro."""
+    return re.sub(r'\W+', '_', name)
+
+
+class DDLStyle:
+    """Tipos SQL usados na geração, derivados das configurações do projeto.
+
+    ``dialect`` substitui o dialeto alvo do projeto (usado pelo carregador
+    embutido, que sempre gera para SQLite).
+    """
+
+    def __init__(self, project, dialect=None):
+        self.dialect = get_dialect(dialect or project.target_dialect)
+        # Mesmo tipo para PKs de hubs/links, FKs e HK_DIFF
+        self.hash_key = self.dialect.hash_key_type(project.hash_algorithm, project.hash_key_storage)
+        self.string = self.dialect.column_type('string')
+        self.timestamp = self.dialect.column_type('datetime')
+        self.boolean = self.dialect.column_type('boolean')
+        self.indexes = project.generate_indexes and self.dialect.supports_indexes
+
+
+def close_table(lines, style, table, hash_key, entity, key_has_load_date):
+    """Fecha o CREATE TABLE com as opções físicas da entidade no dialeto alvo;
+    os comandos de preparação do dialeto vão antes dele."""
+    lines[0:0] = style.dialect.table_setup(table, entity, key_has_load_date)
+    suffix, statements = style.dialect.physical_options(table, hash_key, entity, key_has_load_date)
+    lines.append(f'){suffix};')
+    lines.extend(statements)
+
+
+def hub_ddl(hub, style):
+    """Linhas do CREATE TABLE de um Hub."""
+    safe_name = safe_identifier(hub.name)
+    business_key_type = style.dialect.column_type(hub.business_key_type, hub.business_key_length)
+    lines = [
+        f'\nCREATE TABLE H_{safe_name} (',
+        f'    HK_{safe_name} {style.hash_key} PRIMARY KEY,',
+        f'    {hub.business_key} {business_key_type} NOT NULL,',
+        f'    load_date {style.timestamp} NOT NULL,',
+        f'    record_source {style.string} NOT NULL',
+    ]
+    close_table(lines, style, f'H_{safe_name}', f'HK_{safe_name}', hub, key_has_load_date=False)
+    return lines
+
+
+def link_ddl(graph, link, style):
+    """Linhas do CREATE TABLE de um Link."""
+    safe_name = safe_identifier(link.name)
+    lines = [
+        f'\nCREATE TABLE L_{safe_name} (',
+        f'    HK_{safe_name} {style.hash_key} PRIMARY KEY,',
+    ]
+
+    # Adiciona as chaves dos Hubs relacionados
+    safe_hubs = [safe_identifier(hub.name) for hub in graph.hubs_of(link)]
+    for safe_hub in safe_hubs:
+        lines.append(f'    HK_{safe_hub} {style.hash_key} NOT NULL,')
+
+    lines.append(f'    load_date {style.timestamp} NOT NULL,')
+    lines.append(f'    record_source {style.string} NOT NULL')
+
+    # As constraints de tabela vêm depois de todas as colunas
+    for safe_hub in safe_hubs:
+        lines[-1] += ','
+        lines.append(f'    FOREIGN KEY (HK_{safe_hub}) REFERENCES H_{safe_hub}(HK_{safe_hub})')
+    close_table(lines, style, f'L_{safe_name}', f'HK_{safe_name}', link, key_has_load_date=False)
+
+    # Índices para os joins link -> hub
+    if style.indexes:
+        for safe_hub in safe_hubs:
+            lines.append(style.dialect.create_index(
+                f'IX_L_{safe_name}_HK_{safe_hub}', f'L_{safe_name}', [f'HK_{safe_hub}']
+            ))
+    return lines
+
+
+def satellite_ddl(graph, satellite, style):
+    """Linhas do CREATE TABLE de um Satellite."""
+    safe_name = safe_identifier(satellite.name)
+    lines = [f'\nCREATE TABLE S_{safe_name} (']
+
+    # Adiciona a chave do pai (Hub ou Link)
+    parent_key = None
+    parent_kind, parent = graph.parent_of(satellite)
+    if parent is not None:
+        safe_parent = safe_identifier(parent.name)
+        prefix = 'H_' if parent_kind == 'hub' else 'L_'
+        parent_key = f'HK_{safe_parent}'
+        lines.append(f'    HK_{safe_parent} {style.hash_key} NOT NULL,')
+
+    # Adiciona o HK_DIFF e campos default
+    lines.append(f'    HK_DIFF {style.hash_key} NOT NULL,')
+    lines.append(f'    valid_from {style.timestamp} NOT NULL,')
+    lines.append(f'    valid_to {style.timestamp},')
+    lines.append(f'    is_current {style.boolean} NOT NULL,')
+
+    # Adiciona os atributos específicos
+    for column in satellite.columns.all():
+        safe_attr = safe_identifier(column.name)
+        null = '' if column.nullable else ' NOT NULL'
+        lines.append(f'    {safe_attr} {column.sql_type(style.dialect)}{null},')
+
+    # Adiciona os campos de auditoria
+    lines.append(f'    load_date {style.timestamp} NOT NULL,')
+    lines.append(f'    record_source {style.string} NOT NULL,')
+    # Uma linha por estado do pai ao longo do tempo
+    lines.append(f'    PRIMARY KEY ({parent_key or "HK_DIFF"}, load_date)')
+    if parent_key:
+        lines[-1] += ','
+        lines.append(f'    FOREIGN KEY ({parent_key}) REFERENCES {prefix}{safe_parent}({parent_key})')
+    close_table(lines, style, f'S_{safe_name}', parent_key or 'HK_DIFF', satellite, key_has_load_date=True)
+
+    # Índice parcial para localizar a linha corrente de cada pai
+    if style.indexes and parent_key:
+        lines.append(style.dialect.create_index(
+            f'IX_S_{safe_name}_current', f'S_{safe_name}', [parent_key],
+            where=style.dialect.current_row_predicate,
+        ))
+    return lines
+
+
+def pit_satellites(graph, kind, parent):
+    """Nomes seguros dos satellites de um pai, na ordem das colunas da PIT."""
+    return [safe_identifier(graph.satellite_names[sid]) for sid in graph.satellite_ids_of(kind, parent)]
+
+
+def pit_ddl(graph, pit, style):
+    """Linhas do CREATE TABLE de uma PIT."""
+    safe_name = safe_identifier(pit.name)
+    parent_kind, parent = graph.parent_of(pit)
+    if parent is None:
+        return [f'\n-- PIT_{safe_name} ignorada: pai inexistente']
+    safe_parent = safe_identifier(parent.name)
+    prefix = 'H_' if parent_kind == 'hub' else 'L_'
+
+    lines = [
+        f'\nCREATE TABLE PIT_{safe_name} (',
+        f'    HK_{safe_parent} {style.hash_key} NOT NULL,',
+        f'    snapshot_date {style.timestamp} NOT NULL,',
+    ]
+    # load_date vigente de cada satellite do pai na data do snapshot
+    for safe_satellite in pit_satellites(graph, parent_kind, parent):
+        lines.append(f'    S_{safe_satellite}_load_date {style.timestamp},')
+    lines.append(f'    PRIMARY KEY (HK_{safe_parent}, snapshot_date),')
+    lines.append(f'    FOREIGN KEY (HK_{safe_parent}) REFERENCES {prefix}{safe_parent}(HK_{safe_parent})')
+    lines.append(');')
+    return lines
+
+
+def bridge_columns(graph, bridge):
+    """Colunas de hash key da Bridge na ordem do caminho, ou None se o caminho
+    estiver quebrado ou repetir um hub ou link (as colunas colidiriam)."""
+    path = graph.bridge_path(bridge)
+    start_hub = graph.hubs.get(bridge.start_hub_id)
+    if not path or start_hub is None:
+        return None
+    columns = [f'HK_{safe_identifier(start_hub.name)}']
+    for link, hub in path:
+        columns.append(f'HK_{safe_identifier(link.name)}')
+        columns.append(f'HK_{safe_identifier(hub.name)}')
+    if len(set(columns)) != len(columns):
+        return None
+    return columns
+
+
+def bridge_ddl(graph, bridge, style):
+    """Linhas do CREATE TABLE de uma Bridge."""
+    safe_name = safe_identifier(bridge.name)
+    columns = bridge_columns(graph, bridge)
+    if columns is None:
+        return [f'\n-- BR_{safe_name} ignorada: caminho vazio, repetido ou com entidades inexistentes']
+
+    lines = [
+        f'\nCREATE TABLE BR_{safe_name} (',
+        f'    snapshot_date {style.timestamp} NOT NULL,',
+    ]
+    for column in columns:
+        lines.append(f'    {column} {style.hash_key} NOT NULL,')
+    # As hash keys dos links identificam a combinação percorrida
+    link_keys = columns[1::2]
+    lines.append(f'    PRIMARY KEY (snapshot_date, {", ".join(link_keys)})')
+    lines.append(');')
+    return lines
+
+
+def iter_ddl_blocks(graph, dialect=None):
+    """Gera o DDL do projeto como blocos de linhas, uma entidade por vez."""
+    style = DDLStyle(graph.project, dialect)
+    yield [f'-- DDL gerado automaticamente para o projeto: {graph.project.name}']
+
+    yield ['\n-- Criação dos Hubs']
+    for hub in graph.hubs.values():
+        yield hub_ddl(hub, style)
+
+    yield ['\n-- Criação dos Links']
+    for link in graph.links.values():
+        yield link_ddl(graph, link, style)
+
+    yield ['\n-- Criação dos Satellites']
+    for satellite in graph.iter_satellites():
+        yield satellite_ddl(graph, satellite, style)
+
+    if graph.pits:
+        yield ['\n-- Criação das PITs (Point-in-Time)']
+        for pit in graph.pits.values():
+            yield pit_ddl(graph, pit, style)
+
+    if graph.bridges:
+        yield ['\n-- Criação das Bridges']
+        for bridge in graph.bridges.values():
+            yield bridge_ddl(graph, bridge, style)
+
+
+def iter_ddl(graph, dialect=None):
+    """Gera o DDL do projeto em pedaços de texto, uma entidade por vez."""
+    separator = ''
+    for block in iter_ddl_blocks(graph, dialect):
+        yield separator + '\n'.join(block)
+        separator = '\n'
+
+
+def build_ddl(graph, dialect=None):
+    """Monta o DDL SQL completo a partir do grafo do projeto."""
+    return ''.join(iter_ddl(graph, dialect))
+
+
+def iter_encoded(chunks, encoding='utf-8', gzip=False):
+    """Codifica os pedaços de texto, comprimindo-os em gzip sob demanda."""
+    if not gzip:
+        for chunk in chunks:
+            yield chunk.encode(encoding)
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode(encoding))
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,175 @@
+"""Remoção em cascata baseada em conjuntos, com prévia do impacto."""
+from django.db import transaction
+from django.db.models import Q
+
+from .cache import artifact_cache
+from .models import Bridge, BridgeStep, Hub, Link, PointInTime, Project, Satellite, SatelliteAttribute
+
+# Ids por DELETE ... WHERE id IN (abaixo do limite de parâmetros do SQLite)
+DELETE_CHUNK_SIZE = 900
+
+
+def chunks(ids, size=DELETE_CHUNK_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def raw_delete(queryset):
+    """DELETE direto do queryset, sem o coletor do ORM nem signals.
+
+    ``QuerySet._raw_delete`` é API privada do Django (é o que o próprio
+    coletor usa nas remoções rápidas) e fica restrita a este ponto; se
+    deixar de existir, cai no ``delete()`` público, mais lento mas correto.
+    Retorna o número de linhas removidas.
+    """
+    if not hasattr(queryset, '_raw_delete'):
+        return queryset.delete()[0]
+    return queryset._raw_delete(queryset.db)
+
+
+def project_targets(project):
+    """Querysets que removem todo o conteúdo do projeto, dos dependentes
+    para os pais."""
+    return [
+        SatelliteAttribute.objects.filter(satellite__project=project),
+        Satellite.objects.filter(project=project),
+        PointInTime.objects.filter(project=project),
+        BridgeStep.objects.filter(bridge__project=project),
+        Bridge.objects.filter(project=project),
+        Link.hubs.through.objects.filter(link__project=project),
+        Link.objects.filter(project=project),
+        Hub.objects.filter(project=project),
+    ]
+
+
+def delete_project(project):
+    """Remove o projeto e todo o seu conteúdo com DELETEs em conjunto, sem
+    montar a prévia do impacto."""
+    # ``Model.delete`` zera o pk da instância
+    project_id = project.pk
+    with transaction.atomic():
+        for queryset in project_targets(project):
+            raw_delete(queryset)
+        # Sem dependentes, o ORM remove só a linha do projeto
+        project.delete()
+    artifact_cache.invalidate(project_id)
+
+
+class DeleteImpact:
+    """Tudo o que sai junto com os hubs, links e satellites escolhidos (ou
+    com o projeto inteiro).
+
+    Um link sem um dos seus hubs perde a chave, então remover um hub remove
+    os links de que ele participa. Hubs e links levam seus satellites (com
+    os atributos) e PITs, e uma Bridge cujo caminho passa por eles é
+    removida inteira. O impacto sai de um número fixo de queries,
+    independente do tamanho do grafo; cada lista guarda pares (id, nome).
+    """
+
+    def __init__(self, project, hubs=(), links=(), satellites=(), whole_project=False):
+        self.project = project
+        self.whole_project = whole_project
+        # Entidades escolhidas, que não aparecem como dependentes na prévia
+        self.roots = {'hub': set(hubs), 'link': set(links), 'satellite': set(satellites)}
+        scope = {'project': project}
+        if whole_project:
+            hub_filter = link_filter = satellite_filter = pit_filter = bridge_filter = Q()
+        else:
+            # Os dependentes entram como subqueries: só as entidades
+            # escolhidas viram parâmetros, nunca os ids resolvidos
+            hub_query = Hub.objects.filter(pk__in=hubs, **scope).values('pk')
+            link_query = Link.objects.filter(Q(pk__in=links) | Q(hubs__in=hub_query), **scope).values('pk')
+            hub_filter = Q(pk__in=hubs)
+            link_filter = Q(pk__in=link_query)
+            satellite_filter = Q(pk__in=satellites) | Q(hub__in=hub_query) | Q(link__in=link_query)
+            pit_filter = Q(hub__in=hub_query) | Q(link__in=link_query)
+            bridge_filter = Q(pk__in=Bridge.objects.filter(
+                Q(start_hub__in=hub_query) | Q(steps__hub__in=hub_query) | Q(steps__link__in=link_query), **scope
+            ).values('pk'))
+        satellite_query = Satellite.objects.filter(satellite_filter, **scope)
+        self.hubs = list(Hub.objects.filter(hub_filter, **scope).order_by('id').values_list('id', 'name'))
+        self.links = list(Link.objects.filter(link_filter, **scope).order_by('id').values_list('id', 'name'))
+        self.satellites = list(satellite_query.order_by('id').values_list('id', 'name'))
+        self.pits = list(PointInTime.objects.filter(pit_filter, **scope).order_by('id').values_list('id', 'name'))
+        self.bridges = list(Bridge.objects.filter(bridge_filter, **scope).order_by('id').values_list('id', 'name'))
+        self.attribute_count = SatelliteAttribute.objects.filter(satellite__in=satellite_query.values('pk')).count()
+
+    @classmethod
+    def for_project(cls, project):
+        return cls(project, whole_project=True)
+
+    @property
+    def hub_ids(self):
+        return [pk for pk, _ in self.hubs]
+
+    @property
+    def link_ids(self):
+        return [pk for pk, _ in self.links]
+
+    @property
+    def satellite_ids(self):
+        return [pk for pk, _ in self.satellites]
+
+    @property
+    def pit_ids(self):
+        return [pk for pk, _ in self.pits]
+
+    @property
+    def bridge_ids(self):
+        return [pk for pk, _ in self.bridges]
+
+    @property
+    def total(self):
+        return len(self.hubs) + len(self.links) + len(self.satellites) + len(self.pits) + len(self.bridges)
+
+    @property
+    def sections(self):
+        """Dependentes por tipo para a prévia: [(rótulo, [(id, nome)])], sem as
+        entidades escolhidas e sem tipos vazios."""
+        sections = [
+            ('Hubs', [entry for entry in self.hubs if entry[0] not in self.roots['hub']]),
+            ('Links', [entry for entry in self.links if entry[0] not in self.roots['link']]),
+            ('Satellites', [entry for entry in self.satellites if entry[0] not in self.roots['satellite']]),
+            ('PITs', self.pits),
+            ('Bridges', self.bridges),
+        ]
+        return [(label, entries) for label, entries in sections if entries]
+
+    def targets(self):
+        """Querysets a remover, dos dependentes para os pais."""
+        if self.whole_project:
+            return project_targets(self.project)
+        Through = Link.hubs.through
+        plan = [
+            (SatelliteAttribute, 'satellite_id', self.satellite_ids),
+            (Satellite, 'pk', self.satellite_ids),
+            (PointInTime, 'pk', self.pit_ids),
+            (BridgeStep, 'bridge_id', self.bridge_ids),
+            (Bridge, 'pk', self.bridge_ids),
+            (Through, 'link_id', self.link_ids),
+            (Through, 'hub_id', self.hub_ids),
+            (Link, 'pk', self.link_ids),
+            (Hub, 'pk', self.hub_ids),
+        ]
+        return [
+            model.objects.filter(**{f'{field}__in': ids})
+            for model, field, ids in plan
+            for ids in chunks(ids)
+        ]
+
+    def delete(self):
+        """Remove tudo com DELETEs em conjunto, em uma transação.
+
+        Os DELETEs vão direto ao banco, sem o coletor do ORM nem signals por
+        objeto; a revisão do projeto é incrementada uma única vez.
+        """
+        if self.whole_project:
+            delete_project(self.project)
+            return
+        project = self.project
+        with transaction.atomic():
+            for queryset in self.targets():
+                raw_delete(queryset)
+            Project.objects.filter(pk=project.pk).bump_revision()
+        artifact_cache.invalidate(project.pk)
@@ -0,0 +1,399 @@
+# Tamanho do digest (em bytes) de cada algoritmo de hash
+HASH_ALGORITHMS = {
+    'md5': 16,
+    'sha1': 20,
+    'sha256': 32,
+}
+
+HASH_ALGORITHM_CHOICES = [
+    ('md5', 'MD5 (128 bits)'),
+    ('sha1', 'SHA-1 (160 bits)'),
+    ('sha256', 'SHA-256 (256 bits)'),
+]
+
+HASH_KEY_STORAGE_CHOICES = [
+    ('varchar', 'Hexadecimal (VARCHAR)'),
+    ('char', 'Hexadecimal de tamanho fixo (CHAR)'),
+    ('binary', 'Binário (BINARY / BYTEA)'),
+]
+
+PARTITION_SCHEME_CHOICES = [
+    ('none', 'Sem particionamento'),
+    ('range', 'Range por load_date'),
+    ('daily', 'Diário por load_date'),
+    ('monthly', 'Mensal por load_date'),
+]
+
+# Período de cada partição e quantas são criadas a partir do período
+# corrente, nos dialetos com partições declaradas (PostgreSQL, SQL Server);
+# 'range' usa faixas anuais
+PARTITION_PERIODS = {
+    'range': ('year', 5),
+    'daily': ('day', 31),
+    'monthly': ('month', 12),
+}
+
+DISTRIBUTION_CHOICES = [
+    ('auto', 'Automática (padrão do banco)'),
+    ('hash', 'Pela hash key'),
+    ('even', 'Uniforme (round robin)'),
+    ('all', 'Replicada em todos os nós'),
+]
+
+# Normalização das colunas antes do hash: delimitador entre colunas e
+# marcador de nulo (evita que 'A', NULL e NULL, 'A' gerem o mesmo hash)
+HASH_DELIMITER = '||'
+HASH_NULL_SENTINEL = '^^'
+
+# Tipos lógicos dos atributos de satellites e das chaves de negócio
+ATTRIBUTE_TYPE_CHOICES = [
+    ('string', 'String (VARCHAR)'),
+    ('char', 'Char (tamanho fixo)'),
+    ('smallint', 'SmallInt'),
+    ('integer', 'Integer'),
+    ('bigint', 'BigInt'),
+    ('decimal', 'Decimal'),
+    ('boolean', 'Boolean'),
+    ('date', 'Date'),
+    ('datetime', 'DateTime'),
+]
+BUSINESS_KEY_TYPE_CHOICES = [
+    (tipo, label) for tipo, label in ATTRIBUTE_TYPE_CHOICES if tipo not in ('decimal', 'boolean')
+]
+
+# Tamanho e precisão usados quando o atributo não os declara
+DEFAULT_LENGTH = 255
+DEFAULT_PRECISION = 18
+DEFAULT_SCALE = 2
+# Limites aceitos em qualquer dialeto
+MAX_PRECISION = 38
+
+# Mapeamento de tipos dos atributos para SQL (ANSI); 'float' é o nome antigo de decimal
+TYPE_MAPPING = {
+    'string': 'VARCHAR({length})',
+    'char': 'CHAR({length})',
+    'smallint': 'SMALLINT',
+    'integer': 'INTEGER',
+    'bigint': 'BIGINT',
+    'decimal': 'DECIMAL({precision},{scale})',
+    'float': 'DECIMAL({precision},{scale})',
+    'boolean': 'BOOLEAN',
+    'datetime': 'TIMESTAMP',
+    'date': 'DATE'
+}
+
+
+class Dialect:
+    """SQL genérico (ANSI). As subclasses sobrescrevem apenas o que difere."""
+    name = 'ansi'
+    label = 'SQL Genérico (ANSI)'
+    varchar_type = 'VARCHAR({size})'
+    char_type = 'CHAR({size})'
+    binary_type = 'BINARY({size})'
+    type_overrides = {}
+    # Maior tamanho declarável de VARCHAR/CHAR; acima dele usa max_varchar_type
+    max_length = 65535
+    max_varchar_type = 'VARCHAR({length})'
+    # Plataformas sem índices secundários (MPP/colunares) ignoram os CREATE INDEX
+    supports_indexes = True
+    # Opções físicas sem efeito no dialeto, ocultadas nos formulários
+    unsupported_options = ()
+    current_row_predicate = 'is_current = TRUE'
+    true_literal = 'TRUE'
+    false_literal = 'FALSE'
+    # Tipo usado para converter as colunas em texto antes do hash
+    text_type = 'VARCHAR'
+    # Funções de hash em hexadecimal e em binário; sem versão binária o
+    # dialeto usa a hexadecimal
+    hash_functions = {
+        'md5': 'MD5({expr})',
+        'sha1': 'SHA1({expr})',
+        'sha256': 'SHA2({expr}, 256)',
+    }
+    binary_hash_functions = {}
+
+    def column_type(self, tipo, length=None, precision=None, scale=None):
+        """Tipo SQL de um atributo ou coluna de controle.
+
+        Usa o tamanho e a precisão declarados (ou os padrões); tipos
+        desconhecidos viram string.
+        """
+        tipo = tipo.lower()
+        template = self.type_overrides.get(tipo) or TYPE_MAPPING.get(tipo) or TYPE_MAPPING['string']
+        length = length or DEFAULT_LENGTH
+        if length > self.max_length and '{length}' in template:
+            template = self.max_varchar_type
+        if precision is None:
+            scale = DEFAULT_SCALE if scale is None else scale
+            # Escala acima da precisão padrão (modelos antigos) alarga a precisão
+            precision = min(max(DEFAULT_PRECISION, scale), MAX_PRECISION)
+        return template.format(length=length, precision=precision, scale=min(scale or 0, precision))
+
+    def hash_key_type(self, algorithm='md5', storage='varchar'):
+        """Tipo SQL das colunas HK_* e HK_DIFF."""
+        digest_size = HASH_ALGORITHMS[algorithm]
+        if storage == 'binary':
+            return self.binary_type.format(size=digest_size)
+        if storage == 'char':
+            return self.char_type.format(size=digest_size * 2)
+        return self.varchar_type.format(size=digest_size * 2)
+
+    def concat(self, parts):
+        """Concatenação de expressões de texto."""
+        return ' || '.join(parts)
+
+    def hash_expression(self, columns, algorithm='md5', storage='varchar'):
+        """Expressão SQL da hash key (ou HK_DIFF) das colunas informadas.
+
+        Cada coluna é convertida em texto, aparada e posta em maiúsculas; nulos
+        viram HASH_NULL_SENTINEL e as colunas são unidas por HASH_DELIMITER.
+        """
+        parts = []
+        for column in columns:
+            if parts:
+                parts.append(f"'{HASH_DELIMITER}'")
+            parts.append(f"COALESCE(UPPER(TRIM(CAST({column} AS {self.text_type}))), '{HASH_NULL_SENTINEL}')")
+        functions = self.binary_hash_functions if storage == 'binary' else {}
+        template = functions.get(algorithm) or self.hash_functions[algorithm]
+        return template.format(expr=parts[0] if len(parts) == 1 else self.concat(parts))
+
+    def create_index(self, name, table, columns, where=None):
+        """CREATE INDEX, opcionalmente parcial/filtrado."""
+        statement = f'CREATE INDEX {name} ON {table} ({", ".join(columns)})'
+        if where:
+            statement += f' WHERE {where}'
+        return statement + ';'
+
+    def physical_options(self, table, hash_key, entity, key_has_load_date):
+        """Opções físicas (particionamento, clustering e distribuição) da tabela.
+
+        Retorna o sufixo do CREATE TABLE e os comandos adicionais a emitir
+        depois dele. O dialeto genérico não tem sintaxe para nenhuma delas.
+        """
+        return '', []
+
+    def table_setup(self, table, entity, key_has_load_date):
+        """Comandos a emitir antes do CREATE TABLE (ex.: esquemas de partição)."""
+        return []
+
+
+class PostgreSQLDialect(Dialect):
+    name = 'postgresql'
+    label = 'PostgreSQL'
+    binary_type = 'BYTEA'
+    type_overrides = {
+        'decimal': 'NUMERIC({precision},{scale})',
+        'float': 'NUMERIC({precision},{scale})',
+    }
+    max_length = 10485760
+    max_varchar_type = 'TEXT'
+    current_row_predicate = 'is_current'
+    # SHA-1 depende da extensão pgcrypto
+    hash_functions = {
+        'md5': 'MD5({expr})',
+        'sha1': "ENCODE(DIGEST({expr}, 'sha1'), 'hex')",
+        'sha256': "ENCODE(SHA256(CONVERT_TO({expr}, 'UTF8')), 'hex')",
+    }
+    binary_hash_functions = {
+        'md5': "DECODE(MD5({expr}), 'hex')",
+        'sha1': "DIGEST({expr}, 'sha1')",
+        'sha256': "SHA256(CONVERT_TO({expr}, 'UTF8'))",
+    }
+
+    partition_name_formats = {'year': 'YYYY', 'month': 'YYYYMM', 'day': 'YYYYMMDD'}
+
+    def partition_statements(self, table, scheme):
+        """Partição DEFAULT e as partições dos próximos períodos, criadas no
+        momento da execução a partir da data corrente."""
+        unit, count = PARTITION_PERIODS[scheme]
+        step = f"INTERVAL '1 {unit}'"
+        return [
+            f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT;',
+            f'-- Partições de {count} período(s) a partir do atual; reexecute o bloco para criar as seguintes',
+            'DO $$',
+            'DECLARE',
+            f"    period_start TIMESTAMP := DATE_TRUNC('{unit}', CURRENT_DATE);",
+            'BEGIN',
+            f'    FOR i IN 0..{count - 1} LOOP',
+            '        EXECUTE FORMAT(',
+            f"            'CREATE TABLE IF NOT EXISTS %s PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',",
+            f"            '{table}_' || TO_CHAR(period_start + i * {step}, '{self.partition_name_formats[unit]}'),",
+            f'            period_start + i * {step}, period_start + (i + 1) * {step}',
+            '        );',
+            '    END LOOP;',
+            'END $$;',
+        ]
+
+    def physical_options(self, table, hash_key, entity, key_has_load_date):
+        suffix, statements = '', []
+        # Tabelas particionadas exigem a coluna de partição na chave primária
+        if entity.partition_scheme != 'none' and key_has_load_date:
+            suffix = ' PARTITION BY RANGE (load_date)'
+            statements.extend(self.partition_statements(table, entity.partition_scheme))
+        if entity.cluster_by_hash_key:
+            statements.append(self.create_index(f'IX_{table}_cluster', table, [hash_key]))
+            if suffix:
+                statements.append('-- CLUSTER em tabela particionada exige PostgreSQL 15 ou superior')
+            statements.append(f'CLUSTER {table} USING IX_{table}_cluster;')
+        return suffix, statements
+
+
+class SQLServerDialect(Dialect):
+    name = 'sqlserver'
+    label = 'SQL Server'
+    type_overrides = {
+        'boolean': 'BIT',
+        'datetime': 'DATETIME2',
+    }
+    max_length = 8000
+    max_varchar_type = 'VARCHAR(MAX)'
+    current_row_predicate = 'is_current = 1'
+    true_literal = '1'
+    false_literal = '0'
+    text_type = 'VARCHAR(4000)'
+    hash_functions = {
+        'md5': "LOWER(CONVERT(VARCHAR(32), HASHBYTES('MD5', {expr}), 2))",
+        'sha1': "LOWER(CONVERT(VARCHAR(40), HASHBYTES('SHA1', {expr}), 2))",
+        'sha256': "LOWER(CONVERT(VARCHAR(64), HASHBYTES('SHA2_256', {expr}), 2))",
+    }
+    binary_hash_functions = {
+        'md5': "HASHBYTES('MD5', {expr})",
+        'sha1': "HASHBYTES('SHA1', {expr})",
+        'sha256': "HASHBYTES('SHA2_256', {expr})",
+    }
+
+    def concat(self, parts):
+        # O operador + propaga NULL e exige tipos compatíveis
+        return f'CONCAT({", ".join(parts)})'
+
+    # A PRIMARY KEY já é o índice clusterizado (começa pela hash key) e não
+    # há distribuição entre nós
+    unsupported_options = ('cluster_by_hash_key', 'distribution')
+    period_starts = {
+        'year': 'DATEFROMPARTS(YEAR(GETDATE()), 1, 1)',
+        'month': 'DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1)',
+        'day': 'CAST(GETDATE() AS DATE)',
+    }
+
+    def table_setup(self, table, entity, key_has_load_date):
+        """Cria a função e o esquema de partição PS_load_date_<esquema>, se
+        ainda não existirem, com limites a partir do período corrente."""
+        if entity.partition_scheme == 'none' or not key_has_load_date:
+            return []
+        scheme = entity.partition_scheme
+        unit, count = PARTITION_PERIODS[scheme]
+        # Variável com o nome da tabela: várias tabelas podem estar no mesmo lote
+        boundaries = f'@PF_{table}_boundaries'
+        return [
+            f"\nIF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = 'PF_load_date_{scheme}')",
+            'BEGIN',
+            f'    DECLARE {boundaries} NVARCHAR(MAX) = (',
+            f"        SELECT STRING_AGG('''' + CONVERT(VARCHAR(10), DATEADD({unit.upper()}, n, {self.period_starts[unit]}), 23) + '''', ', ')",
+            f'        FROM (SELECT TOP ({count + 1}) ROW_NUMBER() OVER (ORDER BY object_id) - 1 AS n FROM sys.all_objects) AS periods',
+            '    );',
+            f"    EXEC('CREATE PARTITION FUNCTION PF_load_date_{scheme} ({self.column_type('datetime')}) "
+            f"AS RANGE RIGHT FOR VALUES (' + {boundaries} + ')');",
+            f"    EXEC('CREATE PARTITION SCHEME PS_load_date_{scheme} AS PARTITION PF_load_date_{scheme} ALL TO ([PRIMARY])');",
+            'END;',
+        ]
+
+    def physical_options(self, table, hash_key, entity, key_has_load_date):
+        # O esquema PS_* é criado por table_setup
+        if entity.partition_scheme != 'none' and key_has_load_date:
+            return f' ON PS_load_date_{entity.partition_scheme} (load_date)', []
+        return '', []
+
+
+class SnowflakeDialect(Dialect):
+    name = 'snowflake'
+    label = 'Snowflake'
+    # Inteiros são NUMBER(38,0) internamente; a precisão declarada limita o valor
+    type_overrides = {
+        'smallint': 'NUMBER(5,0)',
+        'integer': 'NUMBER(10,0)',
+        'bigint': 'NUMBER(19,0)',
+        'decimal': 'NUMBER({precision},{scale})',
+        'float': 'NUMBER({precision},{scale})',
+        'datetime': 'TIMESTAMP_NTZ',
+    }
+    max_length = 16777216
+    supports_indexes = False
+    partition_expressions = {
+        'range': 'load_date',
+        'daily': 'TO_DATE(load_date)',
+        'monthly': "DATE_TRUNC('MONTH', load_date)",
+    }
+    binary_hash_functions = {
+        'md5': 'MD5_BINARY({expr})',
+        'sha1': 'SHA1_BINARY({expr})',
+        'sha256': 'SHA2_BINARY({expr}, 256)',
+    }
+
+    def physical_options(self, table, hash_key, entity, key_has_load_date):
+        # Micro-partições: o particionamento vira chave de clustering
+        keys = []
+        if entity.partition_scheme != 'none':
+            keys.append(self.partition_expressions[entity.partition_scheme])
+        if entity.cluster_by_hash_key:
+            keys.append(hash_key)
+        if keys:
+            return f' CLUSTER BY ({", ".join(keys)})', []
+        return '', []
+
+
+class RedshiftDialect(Dialect):
+    name = 'redshift'
+    label = 'Amazon Redshift'
+    binary_type = 'VARBYTE({size})'
+    max_varchar_type = 'VARCHAR(MAX)'
+    supports_indexes = False
+    distribution_styles = {
+        'auto': '',
+        'hash': ' DISTSTYLE KEY DISTKEY ({hash_key})',
+        'even': ' DISTSTYLE EVEN',
+        'all': ' DISTSTYLE ALL',
+    }
+    binary_hash_functions = {
+        'md5': "TO_VARBYTE(MD5({expr}), 'hex')",
+        'sha1': "TO_VARBYTE(SHA1({expr}), 'hex')",
+        'sha256': "TO_VARBYTE(SHA2({expr}, 256), 'hex')",
+    }
+
+    def physical_options(self, table, hash_key, entity, key_has_load_date):
+        suffix = self.distribution_styles[entity.distribution].format(hash_key=hash_key)
+        # Sem partições nativas: load_date e a hash key viram sort keys
+        sort_keys = []
+        if entity.partition_scheme != 'none':
+            sort_keys.append('load_date')
+        if entity.cluster_by_hash_key:
+            sort_keys.append(hash_key)
+        if sort_keys:
+            suffix += f' COMPOUND SORTKEY ({", ".join(sort_keys)})'
+        return suffix, []
+
+
+class SQLiteDialect(Dialect):
+    """Alvo local do carregador embutido (modeler.loader).
+
+    O SQLite não tem funções de hash: as hash keys são calculadas em Python
+    antes da inserção.
+    """
+    name = 'sqlite'
+    label = 'SQLite (desenvolvimento)'
+    binary_type = 'BLOB'
+    current_row_predicate = 'is_current = 1'
+    true_literal = '1'
+    false_literal = '0'
+
+
+DIALECTS = {
+    dialect.name: dialect()
+    for dialect in (Dialect, PostgreSQLDialect, SQLServerDialect, SnowflakeDialect, RedshiftDialect, SQLiteDialect)
+}
+
+DIALECT_CHOICES = [(name, dialect.label) for name, dialect in DIALECTS.items()]
+
+
+def get_dialect(name):
+    """Retorna o dialeto pelo nome, caindo no ANSI se for desconhecido."""
+    return DIALECTS.get(name, DIALECTS['ansi'])
@@ -0,0 +1,83 @@
+"""Exportação do modelo de um projeto em JSON, entidade por entidade.
+
+O documento tem o mesmo formato aceito por ``importer`` (listas ``hubs``,
+``links`` e ``satellites`` com referências pelo nome), mais as
+configurações do projeto em ``project``.
+"""
+import json
+from itertools import groupby
+from operator import itemgetter
+
+from .importer import ENTITY_FIELDS
+from .models import Hub, Link, Satellite
+
+PROJECT_FIELDS = ('name', 'description', 'target_dialect', 'hash_algorithm', 'hash_key_storage', 'generate_indexes')
+# Linhas lidas por vez de cada tabela
+CHUNK_SIZE = 2000
+
+
+def entity_record(instance, kind):
+    """Campos exportados de um Hub, Link, Satellite ou atributo."""
+    return {field: getattr(instance, field) for field in ENTITY_FIELDS[kind]}
+
+
+def iter_section(name, records, last=False):
+    """Pedaços de texto de uma lista do documento, um registro por linha."""
+    yield f'"{name}": ['
+    separator = '\n'
+    for record in records:
+        yield separator + json.dumps(record, ensure_ascii=False)
+        separator = ',\n'
+    yield '\n]' + ('' if last else ',\n')
+
+
+def iter_project_json(project, chunk_size=CHUNK_SIZE):
+    """Gera o JSON do projeto em pedaços, sem montar o grafo em memória.
+
+    Cada tabela é percorrida com ``iterator(chunk_size)``; os atributos dos
+    satellites são pré-carregados lote a lote.
+    """
+    settings = {field: getattr(project, field) for field in PROJECT_FIELDS}
+    yield '{"project": ' + json.dumps(settings, ensure_ascii=False) + ',\n'
+
+    hubs = Hub.objects.filter(project=project).order_by('id').iterator(chunk_size)
+    yield from iter_section('hubs', (entity_record(hub, 'hub') for hub in hubs))
+
+    # Hubs de cada link na ordem da tabela de ligação, lidos em paralelo aos links
+    links = Link.objects.filter(project=project).order_by('id').iterator(chunk_size)
+    memberships = groupby(
+        Link.hubs.through.objects.filter(link__project=project).order_by('link_id', 'id')
+        .values_list('link_id', 'hub__name').iterator(chunk_size),
+        key=itemgetter(0),
+    )
+
+    def link_records():
+        group = next(memberships, None)
+        for link in links:
+            hubs = []
+            if group is not None and group[0] == link.id:
+                hubs = [name for _, name in group[1]]
+                group = next(memberships, None)
+            yield dict(entity_record(link, 'link'), hubs=hubs)
+
+    yield from iter_section('links', link_records())
+
+    satellites = (
+        Satellite.objects.filter(project=project).order_by('id')
+        .select_related('hub', 'link').prefetch_related('columns')
+        .iterator(chunk_size)
+    )
+
+    def satellite_records():
+        for satellite in satellites:
+            record = entity_record(satellite, 'satellite')
+            record[satellite.parent_kind] = satellite.parent.name
+            record['attributes'] = [entity_record(column, 'attribute') for column in satellite.columns.all()]
+            for column in record['attributes']:
+                # 'float' é o nome antigo de decimal
+                if column['tipo'] == 'float':
+                    column['tipo'] = 'decimal'
+            yield record
+
+    yield from iter_section('satellites', satellite_records(), last=True)
+    yield '}\n'
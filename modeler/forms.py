@@ -1,38 +1,113 @@
+from collections import defaultdict
+
 from django import forms
-from .models import Hub, Link, Satellite, Project
-from django.contrib.contenttypes.models import ContentType
+from .models import Hub, Link, Satellite, Project, PointInTime, Bridge
+from .dialects import ATTRIBUTE_TYPE_CHOICES, DEFAULT_PRECISION, MAX_PRECISION, get_dialect
+
+def parent_choices(project):
+    """Opções de pai (Hub ou Link) no formato '<hub|link>-<id>'."""
+    # Busca Hubs do projeto
+    hubs = Hub.objects.filter(project=project).values_list('id', 'name')
+    hub_choices = [(f"hub-{hub_id}", f"Hub: {name}") for hub_id, name in hubs]
+    
+    # Busca Links do projeto
+    links = Link.objects.filter(project=project).values_list('id', 'name')
+    link_choices = [(f"link-{link_id}", f"Link: {name}") for link_id, name in links]
+    
+    return hub_choices + link_choices
+
+def column_type_errors(tipo, length=None, precision=None, scale=None):
+    """Valida tamanho e precisão declarados para o tipo; retorna {campo: mensagem}."""
+    errors = {}
+    if length and tipo not in ('string', 'char'):
+        errors['length'] = 'Tamanho só se aplica a String e Char.'
+    if (precision or scale is not None) and tipo != 'decimal':
+        errors['precision'] = 'Precisão e escala só se aplicam a Decimal.'
+    if precision and precision > MAX_PRECISION:
+        errors['precision'] = f'A precisão máxima é {MAX_PRECISION}.'
+    # Sem precisão declarada o DDL usa DEFAULT_PRECISION
+    if scale is not None and scale > (precision or DEFAULT_PRECISION):
+        errors['scale'] = f'A escala não pode ser maior que a precisão ({precision or DEFAULT_PRECISION}).'
+    return errors
+
+def hide_unsupported_options(form):
+    """Remove do formulário as opções físicas que o dialeto do projeto não suporta."""
+    project = form.initial.get('project') or form.data.get('project')
+    if not isinstance(project, Project):
+        if not str(project or '').isdigit():
+            return
+        project = Project.objects.filter(pk=project).only('target_dialect').first()
+        if project is None:
+            return
+    for option in get_dialect(project.target_dialect).unsupported_options:
+        form.fields.pop(option, None)
 
 class ProjectForm(forms.ModelForm):
     class Meta:
         model = Project
-        fields = ['name', 'description']
+        fields = ['name', 'description', 'target_dialect', 'hash_algorithm', 'hash_key_storage', 'generate_indexes']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'target_dialect': forms.Select(attrs={'class': 'form-control'}),
+            'hash_algorithm': forms.Select(attrs={'class': 'form-control'}),
+            'hash_key_storage': forms.Select(attrs={'class': 'form-control'}),
+            'generate_indexes': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
 
+class ProjectCloneForm(forms.Form):
+    name = forms.CharField(
+        max_length=100,
+        label='Nome da cópia',
+        widget=forms.TextInput(attrs={'class': 'form-control'})
+    )
+
 class HubForm(forms.ModelForm):
     class Meta:
         model = Hub
-        fields = ['project', 'name', 'business_key', 'load_date', 'record_source']
+        fields = ['project', 'name', 'business_key', 'business_key_type', 'business_key_length',
+                  'load_date', 'record_source', 'staging_table',
+                  'partition_scheme', 'cluster_by_hash_key', 'distribution']
         widgets = {
             'project': forms.HiddenInput(),
             'name': forms.TextInput(attrs={'class': 'form-control'}),
             'business_key': forms.TextInput(attrs={'class': 'form-control'}),
+            'business_key_type': forms.Select(attrs={'class': 'form-control'}),
+            'business_key_length': forms.NumberInput(attrs={'class': 'form-control', 'min': 1, 'placeholder': '255'}),
             'load_date': forms.TextInput(attrs={'class': 'form-control'}),
-            'record_source': forms.TextInput(attrs={'class': 'form-control'})
+            'record_source': forms.TextInput(attrs={'class': 'form-control'}),
+            'staging_table': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'STG_<nome>'}),
+            'partition_scheme': forms.Select(attrs={'class': 'form-control'}),
+            'cluster_by_hash_key': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'distribution': forms.Select(attrs={'class': 'form-control'})
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        hide_unsupported_options(self)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        errors = column_type_errors(cleaned_data.get('business_key_type'), cleaned_data.get('business_key_length'))
+        if 'length' in errors:
+            self.add_error('business_key_length', errors['length'])
+        return cleaned_data
+
 class LinkForm(forms.ModelForm):
     class Meta:
         model = Link
-        fields = ['project', 'name', 'hubs', 'load_date', 'record_source']
+        fields = ['project', 'name', 'hubs', 'load_date', 'record_source', 'staging_table',
+                  'partition_scheme', 'cluster_by_hash_key', 'distribution']
         widgets = {
             'project': forms.HiddenInput(),
             'name': forms.TextInput(attrs={'class': 'form-control'}),
             'hubs': forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'}),
             'load_date': forms.TextInput(attrs={'class': 'form-control'}),
-            'record_source': forms.TextInput(attrs={'class': 'form-control'})
+            'record_source': forms.TextInput(attrs={'class': 'form-control'}),
+            'staging_table': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'STG_<nome>'}),
+            'partition_scheme': forms.Select(attrs={'class': 'form-control'}),
+            'cluster_by_hash_key': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'distribution': forms.Select(attrs={'class': 'form-control'})
         }
     
     def __init__(self, *args, **kwargs):
@@ -40,6 +115,7 @@ class LinkForm(forms.ModelForm):
         if 'initial' in kwargs and 'project' in kwargs['initial']:
             project = kwargs['initial']['project']
             self.fields['hubs'].queryset = Hub.objects.filter(project=project)
+        hide_unsupported_options(self)
 
 class AttributeForm(forms.Form):
     name = forms.CharField(
@@ -50,15 +126,125 @@ class AttributeForm(forms.Form):
         })
     )
     tipo = forms.ChoiceField(
-        choices=[
-            ('string', 'String'),
-            ('integer', 'Integer'),
-            ('decimal', 'Decimal'),
-            ('datetime', 'DateTime'),
-            ('boolean', 'Boolean')
-        ],
+        choices=ATTRIBUTE_TYPE_CHOICES,
         widget=forms.Select(attrs={'class': 'form-control'})
     )
+    length = forms.IntegerField(
+        required=False,
+        min_value=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Tamanho'})
+    )
+    precision = forms.IntegerField(
+        required=False,
+        min_value=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Precisão'})
+    )
+    scale = forms.IntegerField(
+        required=False,
+        min_value=0,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Escala'})
+    )
+    not_null = forms.BooleanField(
+        required=False,
+        label='NOT NULL',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        errors = column_type_errors(
+            cleaned_data.get('tipo'), cleaned_data.get('length'),
+            cleaned_data.get('precision'), cleaned_data.get('scale'),
+        )
+        for field, message in errors.items():
+            self.add_error(field, message)
+        return cleaned_data
+
+class SampleFileForm(forms.Form):
+    """Arquivo de amostra (CSV ou JSON lines) para inferir tipos e tamanhos."""
+    sample = forms.FileField(
+        label='Arquivo de amostra',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.jsonl,.ndjson'})
+    )
+
+    def clean_sample(self):
+        sample = self.cleaned_data['sample']
+        if not sample.name.lower().endswith(('.csv', '.jsonl', '.ndjson')):
+            raise forms.ValidationError('Envie um arquivo .csv, .jsonl ou .ndjson.')
+        return sample
+
+class ModelFileForm(forms.Form):
+    """Arquivo de modelo declarativo para importação em lote."""
+    model_file = forms.FileField(
+        label='Arquivo do modelo',
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control', 'accept': '.json,.jsonl,.ndjson,.yaml,.yml,.csv'
+        })
+    )
+
+    def clean_model_file(self):
+        model_file = self.cleaned_data['model_file']
+        if not model_file.name.lower().endswith(('.json', '.jsonl', '.ndjson', '.yaml', '.yml', '.csv')):
+            raise forms.ValidationError('Envie um arquivo .json, .jsonl, .ndjson, .yaml, .yml ou .csv.')
+        return model_file
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+class MultipleFileField(forms.FileField):
+    """Campo que aceita vários arquivos de uma vez."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        single_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_clean(item, initial) for item in data]
+        return [single_clean(data, initial)]
+
+class SnapshotFilesForm(forms.Form):
+    """Dois ou mais snapshots da origem (CSV ou JSON lines), em ordem de nome."""
+    snapshots = MultipleFileField(
+        label='Snapshots da origem',
+        widget=MultipleFileInput(attrs={'class': 'form-control', 'accept': '.csv,.jsonl,.ndjson'})
+    )
+
+    def clean_snapshots(self):
+        snapshots = self.cleaned_data['snapshots']
+        if len(snapshots) < 2:
+            raise forms.ValidationError('Envie ao menos dois snapshots para comparar.')
+        for snapshot in snapshots:
+            if not snapshot.name.lower().endswith(('.csv', '.jsonl', '.ndjson')):
+                raise forms.ValidationError(f'{snapshot.name}: envie arquivos .csv, .jsonl ou .ndjson.')
+        return sorted(snapshots, key=lambda snapshot: snapshot.name)
+
+class DiagramScopeForm(forms.Form):
+    """Recorte do diagrama: vizinhança de um Hub ou Link (``hub:<id>`` ou
+    ``link:<id>``) e filtros de exibição."""
+    focus = forms.RegexField(regex=r'^(hub|link):\d+$', required=False, widget=forms.HiddenInput)
+    depth = forms.TypedChoiceField(
+        label='Distância', choices=[(n, f'{n} link(s)') for n in range(0, 4)], coerce=int,
+        required=False, empty_value=1, widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+    )
+    hide_satellites = forms.BooleanField(
+        label='Ocultar satellites', required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    hide_attributes = forms.BooleanField(
+        label='Recolher atributos', required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    # Diagrama completo mesmo acima do limite de entidades
+    full = forms.BooleanField(required=False)
+
+    def clean_focus(self):
+        focus = self.cleaned_data['focus']
+        if not focus:
+            return None
+        kind, entity_id = focus.split(':')
+        return kind, int(entity_id)
 
 class SatelliteForm(forms.ModelForm):
     parent = forms.ChoiceField(
@@ -69,12 +255,17 @@ class SatelliteForm(forms.ModelForm):
 
     class Meta:
         model = Satellite
-        fields = ['project', 'name', 'load_date', 'record_source']
+        fields = ['project', 'name', 'load_date', 'record_source', 'staging_table',
+                  'partition_scheme', 'cluster_by_hash_key', 'distribution']
         widgets = {
             'project': forms.HiddenInput(),
             'name': forms.TextInput(attrs={'class': 'form-control'}),
             'load_date': forms.TextInput(attrs={'class': 'form-control'}),
-            'record_source': forms.TextInput(attrs={'class': 'form-control'})
+            'record_source': forms.TextInput(attrs={'class': 'form-control'}),
+            'staging_table': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'STG_<nome>'}),
+            'partition_scheme': forms.Select(attrs={'class': 'form-control'}),
+            'cluster_by_hash_key': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'distribution': forms.Select(attrs={'class': 'form-control'})
         }
         labels = {
             'load_date': 'Data de Carga',
@@ -85,15 +276,101 @@ class SatelliteForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         if 'initial' in kwargs and 'project' in kwargs['initial']:
             project = kwargs['initial']['project']
-            # Busca Hubs do projeto
-            hub_ct = ContentType.objects.get_for_model(Hub)
-            hubs = Hub.objects.filter(project=project)
-            hub_choices = [(f"{hub_ct.id}-{hub.id}", f"Hub: {hub.name}") for hub in hubs]
-            
-            # Busca Links do projeto
-            link_ct = ContentType.objects.get_for_model(Link)
-            links = Link.objects.filter(project=project)
-            link_choices = [(f"{link_ct.id}-{link.id}", f"Link: {link.name}") for link in links]
-            
             # Combina as escolhas
-            self.fields['parent'].choices = [('', '-- Selecione --')] + hub_choices + link_choices 
\ No newline at end of file
+            self.fields['parent'].choices = [('', '-- Selecione --')] + parent_choices(project)
+        hide_unsupported_options(self)
+
+class PointInTimeForm(forms.ModelForm):
+    parent = forms.ChoiceField(
+        choices=[],
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        label='Hub ou Link Pai'
+    )
+
+    class Meta:
+        model = PointInTime
+        fields = ['project', 'name', 'snapshot_table', 'snapshot_column']
+        widgets = {
+            'project': forms.HiddenInput(),
+            'name': forms.TextInput(attrs={'class': 'form-control'}),
+            'snapshot_table': forms.TextInput(attrs={'class': 'form-control'}),
+            'snapshot_column': forms.TextInput(attrs={'class': 'form-control'})
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'initial' in kwargs and 'project' in kwargs['initial']:
+            project = kwargs['initial']['project']
+            self.fields['parent'].choices = [('', '-- Selecione --')] + parent_choices(project)
+
+class BridgeForm(forms.ModelForm):
+    class Meta:
+        model = Bridge
+        fields = ['project', 'name', 'start_hub', 'snapshot_table', 'snapshot_column']
+        widgets = {
+            'project': forms.HiddenInput(),
+            'name': forms.TextInput(attrs={'class': 'form-control'}),
+            'start_hub': forms.Select(attrs={'class': 'form-control'}),
+            'snapshot_table': forms.TextInput(attrs={'class': 'form-control'}),
+            'snapshot_column': forms.TextInput(attrs={'class': 'form-control'})
+        }
+        labels = {
+            'start_hub': 'Hub Inicial'
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'initial' in kwargs and 'project' in kwargs['initial']:
+            project = kwargs['initial']['project']
+            self.fields['start_hub'].queryset = Hub.objects.filter(project=project)
+
+class BridgeStepForm(forms.Form):
+    link = forms.ModelChoiceField(
+        queryset=Link.objects.none(),
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        label='Link'
+    )
+    hub = forms.ModelChoiceField(
+        queryset=Hub.objects.none(),
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        label='Hub Alcançado'
+    )
+
+    def __init__(self, *args, project=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if project is not None:
+            self.fields['link'].queryset = Link.objects.filter(project=project)
+            self.fields['hub'].queryset = Hub.objects.filter(project=project)
+
+def bridge_path_errors(start_hub, steps):
+    """Valida o caminho hub -> link -> hub da Bridge.
+
+    Cada link deve conter o hub de onde o passo parte e o hub alcançado, e
+    nenhum hub ou link pode se repetir (as colunas da Bridge levam o nome da
+    entidade). Retorna a lista de mensagens de erro (vazia se o caminho for
+    válido).
+    """
+    if not steps:
+        return ['Informe ao menos um passo (link e hub alcançado).']
+    # Hubs de todos os links do caminho em uma única consulta
+    link_hub_ids = defaultdict(set)
+    memberships = Link.hubs.through.objects.filter(link__in={link.id for link, hub in steps})
+    for link_id, hub_id in memberships.values_list('link_id', 'hub_id'):
+        link_hub_ids[link_id].add(hub_id)
+
+    errors = []
+    current = start_hub
+    seen_hubs, seen_links = {start_hub.id}, set()
+    for position, (link, hub) in enumerate(steps, start=1):
+        if link.id in seen_links:
+            errors.append(f'Passo {position}: o link {link.name} já aparece no caminho.')
+        if hub.id in seen_hubs:
+            errors.append(f'Passo {position}: o hub {hub.name} já aparece no caminho.')
+        if current.id not in link_hub_ids[link.id]:
+            errors.append(f'Passo {position}: o link {link.name} não contém o hub {current.name}.')
+        if hub.id not in link_hub_ids[link.id]:
+            errors.append(f'Passo {position}: o link {link.name} não contém o hub {hub.name}.')
+        seen_links.add(link.id)
+        seen_hubs.add(hub.id)
+        current = hub
+    return errors
@@ -0,0 +1,194 @@
+from collections import defaultdict
+
+from django.db.models import Q
+
+from .models import Hub, Link, Satellite, PointInTime, Bridge, BridgeStep
+
+
+class ProjectGraph:
+    """Grafo em memória de um projeto Data Vault.
+
+    Carrega hubs, links, a tabela de associação link-hub, satellites, PITs e
+    Bridges com um número fixo de queries, independente do tamanho do projeto, e
+    expõe mapas id -> entidade e listas de adjacência.
+    """
+
+    def __init__(self, project, hubs, links, link_hub_pairs, satellites, pits=(),
+                 bridges=(), bridge_steps=(), satellite_queryset=None, satellite_index=None):
+        self.project = project
+        # Quando informado, os satellites não ficam em memória e são lidos sob demanda
+        self.satellite_queryset = satellite_queryset
+        self.hubs = {hub.id: hub for hub in hubs}
+        self.links = {link.id: link for link in links}
+        self.satellites = {satellite.id: satellite for satellite in satellites}
+        self.pits = {pit.id: pit for pit in pits}
+        self.bridges = {bridge.id: bridge for bridge in bridges}
+
+        # Caminho de cada Bridge: lista ordenada de (link_id, hub_id)
+        self.bridge_steps = defaultdict(list)
+        for bridge_id, link_id, hub_id in bridge_steps:
+            self.bridge_steps[bridge_id].append((link_id, hub_id))
+
+        # Adjacência link <-> hub
+        self.link_hubs = defaultdict(list)
+        self.hub_links = defaultdict(list)
+        for link_id, hub_id in link_hub_pairs:
+            self.link_hubs[link_id].append(hub_id)
+            self.hub_links[hub_id].append(link_id)
+
+        # Satellites agrupados pelo pai: (id, nome, id do hub, id do link)
+        if satellite_index is None:
+            satellite_index = [
+                (satellite.id, satellite.name, satellite.hub_id, satellite.link_id)
+                for satellite in self.satellites.values()
+            ]
+        self.satellite_names = {}
+        self.hub_satellites = defaultdict(list)
+        self.link_satellites = defaultdict(list)
+        for satellite_id, name, hub_id, link_id in satellite_index:
+            self.satellite_names[satellite_id] = name
+            if hub_id is not None:
+                self.hub_satellites[hub_id].append(satellite_id)
+            elif link_id is not None:
+                self.link_satellites[link_id].append(satellite_id)
+
+    def iter_satellites(self, chunk_size=2000):
+        """Itera os satellites do projeto, lendo-os do banco em blocos se não
+        tiverem sido carregados."""
+        if self.satellite_queryset is None:
+            yield from self.satellites.values()
+        else:
+            yield from self.satellite_queryset.iterator(chunk_size=chunk_size)
+
+    def hubs_of(self, link):
+        """Retorna os hubs referenciados por um link."""
+        return [self.hubs[hub_id] for hub_id in self.link_hubs.get(link.id, ()) if hub_id in self.hubs]
+
+    def parent_of(self, entity):
+        """Retorna a tupla (tipo, entidade) do pai de um satellite ou PIT, ou (None, None)."""
+        if entity.hub_id is not None:
+            kind, parent = 'hub', self.hubs.get(entity.hub_id)
+        else:
+            kind, parent = 'link', self.links.get(entity.link_id)
+        if parent is None:
+            return None, None
+        return kind, parent
+
+    def bridge_path(self, bridge):
+        """Retorna o caminho da Bridge como lista de (link, hub), ou None se
+        alguma entidade do caminho não existir mais."""
+        path = []
+        for link_id, hub_id in self.bridge_steps.get(bridge.id, ()):
+            if link_id not in self.links or hub_id not in self.hubs:
+                return None
+            path.append((self.links[link_id], self.hubs[hub_id]))
+        return path
+
+    def neighborhood(self, kind, entity_id, depth):
+        """Ids (hubs, links) a até ``depth`` links de distância de um Hub ou Link.
+
+        Usa apenas a adjacência: cada link visitado entra com todos os seus
+        hubs, e os links entre hubs já incluídos também entram, para que o
+        recorte não tenha relacionamentos pela metade.
+        """
+        if kind == 'hub':
+            hub_ids, link_ids = {entity_id}, set()
+            frontier = [entity_id]
+        else:
+            link_ids = {entity_id}
+            hub_ids = set(self.link_hubs.get(entity_id, ()))
+            frontier = list(hub_ids)
+        for _ in range(depth):
+            next_frontier = []
+            for hub_id in frontier:
+                for link_id in self.hub_links.get(hub_id, ()):
+                    if link_id in link_ids:
+                        continue
+                    link_ids.add(link_id)
+                    for neighbor in self.link_hubs[link_id]:
+                        if neighbor not in hub_ids:
+                            hub_ids.add(neighbor)
+                            next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        for hub_id in hub_ids:
+            for link_id in self.hub_links.get(hub_id, ()):
+                if link_id not in link_ids and all(hub in hub_ids for hub in self.link_hubs[link_id]):
+                    link_ids.add(link_id)
+        return hub_ids, link_ids
+
+    def satellite_ids_of(self, kind, parent):
+        """Ids dos satellites de um Hub ou Link."""
+        if kind == 'hub':
+            return self.hub_satellites.get(parent.id, [])
+        return self.link_satellites.get(parent.id, [])
+
+
+def load_project_graph(project, stream_satellites=False):
+    """Carrega o grafo completo do projeto em oito queries (a última traz o
+    catálogo de atributos dos satellites).
+
+    Com ``stream_satellites=True`` os satellites (a maior parte do projeto)
+    não são materializados: ``iter_satellites`` os lê do banco em blocos e o
+    mapa ``satellites`` fica vazio; apenas um índice compacto (id, nome e
+    pai) é carregado, com uma query a mais; o catálogo de atributos vem
+    junto de cada bloco.
+    """
+    hubs = list(Hub.objects.filter(project=project).order_by('id'))
+    links = list(Link.objects.filter(project=project).order_by('id'))
+    link_hub_pairs = list(
+        Link.hubs.through.objects
+        .filter(link__project=project)
+        .order_by('id')
+        .values_list('link_id', 'hub_id')
+    )
+    pits = list(PointInTime.objects.filter(project=project).order_by('id'))
+    bridges = list(Bridge.objects.filter(project=project).order_by('id'))
+    bridge_steps = list(
+        BridgeStep.objects
+        .filter(bridge__project=project)
+        .order_by('bridge_id', 'position')
+        .values_list('bridge_id', 'link_id', 'hub_id')
+    )
+    satellites = Satellite.objects.filter(project=project).order_by('id')
+    if stream_satellites:
+        satellite_index = satellites.values_list('id', 'name', 'hub_id', 'link_id')
+        return ProjectGraph(
+            project, hubs, links, link_hub_pairs, [], pits, bridges, bridge_steps,
+            satellite_queryset=satellites.prefetch_related('columns'), satellite_index=satellite_index,
+        )
+    satellites = list(satellites.prefetch_related('columns'))
+    return ProjectGraph(project, hubs, links, link_hub_pairs, satellites, pits, bridges, bridge_steps)
+
+
+def load_neighborhood_graph(project, kind, entity_id, depth=1, satellites=True):
+    """Carrega só a vizinhança de um Hub ou Link (ver ``neighborhood``).
+
+    A vizinhança é calculada sobre o índice de adjacência (pares link-hub,
+    apenas ids); depois são lidos só os hubs, links e satellites do recorte,
+    em um número fixo de queries. Retorna None se a entidade não existir no
+    projeto.
+    """
+    link_hub_pairs = list(
+        Link.hubs.through.objects
+        .filter(link__project=project)
+        .order_by('id')
+        .values_list('link_id', 'hub_id')
+    )
+    adjacency = ProjectGraph(project, [], [], link_hub_pairs, [])
+    hub_ids, link_ids = adjacency.neighborhood(kind, entity_id, depth)
+    hubs = list(Hub.objects.filter(project=project, pk__in=hub_ids).order_by('id'))
+    links = list(Link.objects.filter(project=project, pk__in=link_ids).order_by('id')) if link_ids else []
+    focus_ids = {hub.id for hub in hubs} if kind == 'hub' else {link.id for link in links}
+    if entity_id not in focus_ids:
+        return None
+    neighborhood_satellites = []
+    if satellites:
+        neighborhood_satellites = list(
+            Satellite.objects.filter(project=project)
+            .filter(Q(hub__in=hub_ids) | Q(link__in=link_ids))
+            .order_by('id').prefetch_related('columns')
+        )
+    pairs = [(link_id, hub_id) for link_id, hub_id in link_hub_pairs if link_id in link_ids]
+    return ProjectGraph(project, hubs, links, pairs, neighborhood_satellites)
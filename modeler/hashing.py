@@ -0,0 +1,121 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from .dialects import HASH_DELIMITER, HASH_NULL_SENTINEL
+
+HASH_CONSTRUCTORS = {
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha256': hashlib.sha256,
+}
+
+# Abaixo deste número de linhas o custo de enviar o lote aos processos
+# supera o ganho do paralelismo
+PARALLEL_BATCH_SIZE = 50000
+
+
+def normalize(value):
+    """Normaliza um valor como o SQL de carga: texto, sem os espaços das
+    pontas (como TRIM, que mantém tabulações e quebras de linha) e em
+    maiúsculas, com nulos trocados por HASH_NULL_SENTINEL."""
+    if value is None:
+        return HASH_NULL_SENTINEL
+    return str(value).strip(' ').upper()
+
+
+def hash_values(values, algorithm='md5', storage='varchar'):
+    """Hash key (ou HK_DIFF) de uma sequência de valores.
+
+    Retorna o digest em hexadecimal minúsculo, ou em bytes quando as hash
+    keys do projeto são armazenadas em binário.
+    """
+    return hash_batch([[value] for value in values], algorithm, storage)[0]
+
+
+def hash_batch(columns, algorithm='md5', storage='varchar'):
+    """Hash de um lote orientado a colunas (``columns[i][j]`` é o valor da
+    coluna i na linha j), retornando um hash por linha.
+
+    Cada coluna é normalizada de uma vez e as linhas são montadas com
+    ``zip``, evitando o custo de chamadas por valor.
+    """
+    constructor = HASH_CONSTRUCTORS[algorithm]
+    sentinel = HASH_NULL_SENTINEL
+    normalized = [
+        [sentinel if value is None else str(value).strip(' ').upper() for value in column]
+        for column in columns
+    ]
+    if len(normalized) == 1:
+        payloads = normalized[0]
+    else:
+        payloads = map(HASH_DELIMITER.join, zip(*normalized))
+    if storage == 'binary':
+        return [constructor(payload.encode('utf-8')).digest() for payload in payloads]
+    return [constructor(payload.encode('utf-8')).hexdigest() for payload in payloads]
+
+
+def split_batches(columns, batch_size):
+    """Fatia um lote orientado a colunas em lotes menores de mesma forma."""
+    rows = len(columns[0]) if columns else 0
+    for start in range(0, rows, batch_size):
+        yield [column[start:start + batch_size] for column in columns]
+
+
+class BatchHasher:
+    """Calcula hash keys e HK_DIFF em lotes, com as regras do projeto.
+
+    Lotes maiores que ``batch_size`` são divididos entre ``workers``
+    processos, limitados ao número de CPUs; com um só processo, ou lotes
+    pequenos, o hash é calculado no próprio processo. O pool é criado sob
+    demanda e reaproveitado entre lotes; use a instância como context
+    manager para encerrá-lo.
+    """
+
+    def __init__(self, algorithm='md5', storage='varchar', workers=1, batch_size=PARALLEL_BATCH_SIZE):
+        self.algorithm = algorithm
+        self.storage = storage
+        # Mais processos que CPUs só somam o custo de enviar os lotes
+        self.workers = min(workers, os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self._pool = None
+
+    @classmethod
+    def for_project(cls, project, **kwargs):
+        return cls(project.hash_algorithm, project.hash_key_storage, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def hash(self, columns):
+        """Um hash por linha do lote orientado a colunas."""
+        rows = len(columns[0]) if columns else 0
+        if self.workers <= 1 or rows <= self.batch_size:
+            return hash_batch(columns, self.algorithm, self.storage)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        results = self._pool.map(
+            hash_batch, split_batches(columns, self.batch_size), repeat(self.algorithm), repeat(self.storage)
+        )
+        return [digest for result in results for digest in result]
+
+    def hash_records(self, records, names):
+        """Hash das colunas ``names`` de uma lista de registros (dicts)."""
+        return self.hash([[record.get(name) for record in records] for name in names])
+
+    def hub_keys(self, hub, records):
+        """HK do Hub a partir da chave de negócio dos registros."""
+        return self.hash_records(records, [hub.business_key])
+
+    def hashdiffs(self, satellite, records):
+        """HK_DIFF dos registros a partir dos atributos do Satellite."""
+        return self.hash_records(records, list(satellite.attributes))
@@ -0,0 +1,381 @@
+"""Importação em lote de um modelo declarativo (JSON, JSON lines, YAML ou CSV).
+
+Cada entidade é um registro com ``kind`` (hub, link, satellite ou
+attribute) e os campos do modelo; as referências são feitas pelo nome::
+
+    {"kind": "hub", "name": "Cliente", "business_key": "cpf"}
+    {"kind": "link", "name": "Cliente Pedido", "hubs": ["Cliente", "Pedido"]}
+    {"kind": "satellite", "name": "Cliente Dados", "hub": "Cliente",
+     "attributes": [{"name": "nome", "tipo": "string", "length": 100}]}
+    {"kind": "attribute", "satellite": "Cliente Dados", "name": "email", "tipo": "string"}
+
+JSON e YAML também aceitam um documento com as listas ``hubs``, ``links``
+e ``satellites`` (sem ``kind``). No CSV, os hubs de um link são separados
+por ``|`` e os atributos vêm em linhas ``attribute``.
+"""
+import csv
+import io
+import json
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .dialects import ATTRIBUTE_TYPE_CHOICES
+from .forms import column_type_errors
+from .models import Hub, Link, Satellite, SatelliteAttribute
+from .signals import project_changed
+
+# Extensão do arquivo -> formato
+MODEL_FORMATS = {
+    '.json': 'json', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.yaml': 'yaml', '.yml': 'yaml', '.csv': 'csv',
+}
+# Listas de um documento JSON/YAML -> tipo dos registros
+DOCUMENT_SECTIONS = {'hubs': 'hub', 'links': 'link', 'satellites': 'satellite'}
+PHYSICAL_FIELDS = ('load_date', 'record_source', 'staging_table', 'partition_scheme', 'cluster_by_hash_key',
+                   'distribution')
+# Campos aceitos em cada tipo de registro, além das referências
+ENTITY_FIELDS = {
+    'hub': ('name', 'business_key', 'business_key_type', 'business_key_length') + PHYSICAL_FIELDS,
+    'link': ('name',) + PHYSICAL_FIELDS,
+    'satellite': ('name',) + PHYSICAL_FIELDS,
+    'attribute': ('name', 'tipo', 'length', 'precision', 'scale', 'nullable'),
+}
+REFERENCE_FIELDS = {'hub': (), 'link': ('hubs',), 'satellite': ('hub', 'link', 'attributes'), 'attribute': ('satellite',)}
+ATTRIBUTE_TYPES = {tipo for tipo, _ in ATTRIBUTE_TYPE_CHOICES}
+BATCH_SIZE = 2000
+# Erros guardados para exibição (os demais só são contados)
+MAX_ERRORS = 50
+
+
+class ModelImportError(ValueError):
+    """Modelo inválido; ``errors`` traz as primeiras mensagens."""
+
+    def __init__(self, errors, total=None):
+        self.errors = errors
+        self.total = total or len(errors)
+        super().__init__(f'{self.total} erro(s) no arquivo do modelo.')
+
+
+def non_scalar_fields(record, fields):
+    """Campos de ``fields`` que trazem listas ou objetos onde se espera um valor simples."""
+    return sorted(field for field in fields if isinstance(record.get(field), (dict, list)))
+
+
+def entity_label(record):
+    """Nome do registro para as mensagens de erro."""
+    name = record.get('name')
+    return name if isinstance(name, str) else '(sem nome)'
+
+
+def model_format(name):
+    """Formato do arquivo de modelo pela extensão (ou None se não suportado)."""
+    return MODEL_FORMATS.get(Path(name).suffix.lower())
+
+
+def iter_model_records(handle, fmt):
+    """Registros de um arquivo de modelo aberto em modo texto.
+
+    JSON lines e CSV são lidos linha a linha; JSON e YAML são documentos
+    e precisam ser lidos inteiros.
+    """
+    if fmt == 'jsonl':
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+    elif fmt == 'csv':
+        for row in csv.DictReader(handle):
+            # Células vazias equivalem a campos ausentes
+            yield {column: value for column, value in row.items() if value not in (None, '')}
+    else:
+        if fmt == 'yaml':
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError('Instale o PyYAML para importar modelos em YAML.')
+            try:
+                document = yaml.safe_load(handle)
+            except yaml.YAMLError as error:
+                raise ValueError(f'YAML inválido: {error}')
+        else:
+            document = json.load(handle)
+        if isinstance(document, list):
+            yield from document
+            return
+        if not isinstance(document, dict):
+            raise ValueError('O modelo deve ser uma lista de registros ou um objeto com hubs, links e satellites.')
+        for section, kind in DOCUMENT_SECTIONS.items():
+            for record in document.get(section) or []:
+                yield dict(record, kind=kind) if isinstance(record, dict) else record
+
+
+class ModelImport:
+    """Acumula e valida em memória as entidades de um modelo e as grava em lote.
+
+    Os nomes já existentes no projeto são lidos uma única vez; links e
+    satellites podem referenciar hubs e links do arquivo ou do projeto, em
+    qualquer ordem, pois as referências só são resolvidas em ``save``.
+    """
+
+    def __init__(self, project):
+        self.project = project
+        self.count = 0
+        # (posição do registro, mensagem)
+        self.problems = []
+        self.error_total = 0
+        self.hubs = {}
+        # nome -> (Link, [nomes dos hubs], posição do registro)
+        self.links = {}
+        # nome -> (Satellite, 'hub' ou 'link', nome do pai, posição do registro)
+        self.satellites = {}
+        # nome do satellite -> [(posição do registro, SatelliteAttribute)]
+        self.attributes = {}
+        self.existing_hubs = dict(Hub.objects.filter(project=project).values_list('name', 'id'))
+        self.existing_links = dict(Link.objects.filter(project=project).values_list('name', 'id'))
+        self.existing_satellites = set(Satellite.objects.filter(project=project).values_list('name', flat=True))
+        # Ids das entidades criadas por tipo, preenchidos em ``write``
+        self.ids = {}
+
+    def error(self, message, position=None):
+        self.error_total += 1
+        if len(self.problems) < MAX_ERRORS:
+            self.problems.append((position or self.count, message))
+
+    @property
+    def errors(self):
+        return [f'Registro {position}: {message}' for position, message in self.problems]
+
+    def add(self, record):
+        """Valida um registro e o acumula para a gravação."""
+        self.count += 1
+        if not isinstance(record, dict):
+            self.error('cada registro deve ser um objeto.')
+            return
+        kind = record.get('kind')
+        if not isinstance(kind, str) or kind not in ENTITY_FIELDS:
+            self.error(f'tipo "{kind}" desconhecido (use hub, link, satellite ou attribute).')
+            return
+        unknown = set(record) - set(ENTITY_FIELDS[kind]) - set(REFERENCE_FIELDS[kind]) - {'kind'}
+        if unknown:
+            self.error(f'campo(s) desconhecido(s) em {kind}: {", ".join(sorted(unknown))}.')
+            return
+        getattr(self, f'add_{kind}')(record)
+
+    def build(self, model, kind, record, **extra):
+        """Instância validada (sem queries) com os campos do registro, ou None."""
+        nested = non_scalar_fields(record, ENTITY_FIELDS[kind])
+        if nested:
+            self.error(f'{kind} {entity_label(record)}: {", ".join(nested)} deve(m) ser um valor simples.')
+            return None
+        values = {field: record[field] for field in ENTITY_FIELDS[kind] if record.get(field) not in (None, '')}
+        instance = model(**values, **extra)
+        try:
+            instance.clean_fields(exclude=['project', 'hub', 'link', 'satellite'])
+        except ValidationError as error:
+            for field, messages in error.message_dict.items():
+                self.error(f'{kind} {values.get("name", "")}: {field}: {" ".join(messages)}')
+            return None
+        return instance
+
+    def add_hub(self, record):
+        hub = self.build(Hub, 'hub', record, project=self.project)
+        if hub is None:
+            return
+        errors = column_type_errors(hub.business_key_type, hub.business_key_length)
+        if 'length' in errors:
+            self.error(f'hub {hub.name}: {errors["length"]}')
+        elif hub.name in self.hubs or hub.name in self.existing_hubs:
+            self.error(f'hub {hub.name} duplicado.')
+        else:
+            self.hubs[hub.name] = hub
+
+    def add_link(self, record):
+        hubs = record.get('hubs') or []
+        if isinstance(hubs, str):
+            hubs = [name.strip() for name in hubs.split('|') if name.strip()]
+        link = self.build(Link, 'link', record, project=self.project)
+        if link is None:
+            return
+        if not hubs or not isinstance(hubs, list):
+            self.error(f'link {link.name}: informe a lista de hubs.')
+        elif not all(isinstance(hub, str) for hub in hubs):
+            self.error(f'link {link.name}: os hubs devem ser informados pelo nome.')
+        elif link.name in self.links or link.name in self.existing_links:
+            self.error(f'link {link.name} duplicado.')
+        else:
+            self.links[link.name] = (link, hubs, self.count)
+
+    def add_satellite(self, record):
+        satellite = self.build(Satellite, 'satellite', record, project=self.project)
+        if satellite is None:
+            return
+        parents = [kind for kind in ('hub', 'link') if record.get(kind)]
+        if len(parents) != 1:
+            self.error(f'satellite {satellite.name}: informe exatamente um pai (hub ou link).')
+            return
+        if not isinstance(record[parents[0]], str):
+            self.error(f'satellite {satellite.name}: o {parents[0]} deve ser informado pelo nome.')
+            return
+        if satellite.name in self.satellites or satellite.name in self.existing_satellites:
+            self.error(f'satellite {satellite.name} duplicado.')
+            return
+        self.satellites[satellite.name] = (satellite, parents[0], record[parents[0]], self.count)
+        for attribute in self.attribute_records(satellite.name, record.get('attributes')):
+            self.add_attribute(attribute)
+
+    def attribute_records(self, satellite, attributes):
+        """Registros dos atributos declarados em um satellite (lista de objetos
+        ou ``{nome: tipo}``, o formato de Satellite.attributes)."""
+        attributes = attributes or []
+        if isinstance(attributes, dict):
+            attributes = [{'name': name, 'tipo': tipo} for name, tipo in attributes.items()]
+        if not isinstance(attributes, list):
+            self.error(f'satellite {satellite}: attributes deve ser uma lista.')
+            return []
+        records = []
+        for attribute in attributes:
+            if not isinstance(attribute, dict):
+                self.error(f'satellite {satellite}: cada atributo deve ser um objeto.')
+                continue
+            unknown = set(attribute) - set(ENTITY_FIELDS['attribute']) - {'satellite'}
+            if unknown:
+                self.error(f'atributo de {satellite}: campo(s) desconhecido(s): {", ".join(sorted(unknown))}.')
+            else:
+                records.append(dict(attribute, satellite=satellite))
+        return records
+
+    def attribute_column(self, record):
+        """SatelliteAttribute validado (sem o satellite) ou None."""
+        column = self.build(SatelliteAttribute, 'attribute', record)
+        if column is None:
+            return None
+        label = f'atributo {record.get("satellite")}.{column.name}'
+        errors = column_type_errors(column.tipo, column.length, column.precision, column.scale)
+        if column.tipo not in ATTRIBUTE_TYPES:
+            self.error(f'{label}: tipo "{column.tipo}" inválido.')
+        elif errors:
+            self.error(f'{label}: {" ".join(errors.values())}')
+        else:
+            return column
+        return None
+
+    def add_attribute(self, record):
+        if not isinstance(record.get('satellite'), str):
+            self.error(f'atributo {entity_label(record)}: informe o satellite pelo nome.')
+            return
+        column = self.attribute_column(record)
+        if column is not None:
+            self.attributes.setdefault(record.get('satellite'), []).append((self.count, column))
+
+    def resolve(self):
+        """Confere as referências entre as entidades acumuladas."""
+        hub_names = set(self.hubs) | set(self.existing_hubs)
+        link_names = set(self.links) | set(self.existing_links)
+        for name, (_, hubs, position) in self.links.items():
+            missing = [hub for hub in hubs if hub not in hub_names]
+            if missing:
+                self.error(f'link {name}: hub(s) inexistente(s): {", ".join(missing)}.', position)
+        for name, (_, kind, parent, position) in self.satellites.items():
+            if parent not in (hub_names if kind == 'hub' else link_names):
+                self.error(f'satellite {name}: {kind} {parent} inexistente.', position)
+        for satellite, columns in self.attributes.items():
+            if satellite not in self.satellites:
+                self.error(f'atributos de {satellite}: satellite não declarado no arquivo.', columns[0][0])
+                continue
+            names = set()
+            for position, column in columns:
+                if column.name in names:
+                    self.error(f'atributo {satellite}.{column.name} duplicado.', position)
+                names.add(column.name)
+
+    def save(self):
+        """Confere as referências e grava tudo em uma transação.
+
+        Levanta ``ModelImportError`` (sem gravar nada) se houver erros.
+        Retorna as contagens por tipo de entidade.
+        """
+        self.resolve()
+        if self.error_total:
+            raise ModelImportError(self.errors, self.error_total)
+        return self.write()
+
+    def write(self):
+        """Grava as entidades validadas com inserções em lote."""
+        project = self.project
+        with transaction.atomic():
+            Hub.objects.bulk_create(self.hubs.values(), batch_size=BATCH_SIZE)
+            hub_ids = dict(Hub.objects.filter(project=project).values_list('name', 'id'))
+
+            Link.objects.bulk_create([link for link, _, _ in self.links.values()], batch_size=BATCH_SIZE)
+            link_ids = dict(Link.objects.filter(project=project).values_list('name', 'id'))
+            Through = Link.hubs.through
+            Through.objects.bulk_create(
+                [
+                    Through(link_id=link_ids[name], hub_id=hub_ids[hub])
+                    for name, (_, hubs, _) in self.links.items()
+                    for hub in dict.fromkeys(hubs)
+                ],
+                batch_size=BATCH_SIZE,
+            )
+
+            for satellite, kind, parent, _ in self.satellites.values():
+                if kind == 'hub':
+                    satellite.hub_id = hub_ids[parent]
+                else:
+                    satellite.link_id = link_ids[parent]
+            Satellite.objects.bulk_create(
+                [satellite for satellite, _, _, _ in self.satellites.values()], batch_size=BATCH_SIZE
+            )
+            satellite_ids = {
+                name: satellite_id
+                for name, satellite_id in Satellite.objects.filter(project=project).values_list('name', 'id')
+                if name in self.satellites
+            }
+            columns = []
+            for satellite, entries in self.attributes.items():
+                for ordinal, (_, column) in enumerate(entries):
+                    column.satellite_id = satellite_ids[satellite]
+                    column.ordinal = ordinal
+                    columns.append(column)
+            SatelliteAttribute.objects.bulk_create(columns, batch_size=BATCH_SIZE)
+            # As inserções em lote não disparam signals
+            project_changed(project.pk)
+        self.ids = {
+            'hub': {name: hub_ids[name] for name in self.hubs},
+            'link': {name: link_ids[name] for name in self.links},
+            'satellite': satellite_ids,
+        }
+        return {
+            'hubs': len(self.hubs),
+            'links': len(self.links),
+            'satellites': len(self.satellites),
+            'attributes': len(columns),
+        }
+
+
+def import_model(project, records):
+    """Valida e grava no projeto os registros de um modelo (iterável de dicts)."""
+    model_import = ModelImport(project)
+    for record in records:
+        model_import.add(record)
+    return model_import.save()
+
+
+def import_model_file(project, handle, fmt):
+    """Importa um arquivo de modelo já aberto em modo texto."""
+    try:
+        return import_model(project, iter_model_records(handle, fmt))
+    except ModelImportError:
+        raise
+    except (ValueError, csv.Error) as error:
+        raise ModelImportError([f'Não foi possível ler o arquivo: {error}'])
+
+
+def import_model_upload(project, upload):
+    """Importa um arquivo de modelo enviado, sem salvá-lo."""
+    handle = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+    try:
+        return import_model_file(project, handle, model_format(upload.name))
+    finally:
+        # Não fecha o arquivo do upload junto com o wrapper
+        handle.detach()
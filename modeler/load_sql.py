@@ -0,0 +1,260 @@
+from .ddl import DDLStyle, bridge_columns, pit_satellites, safe_identifier
+
+
+def staging_table_of(entity):
+    """Tabela de staging declarada na entidade ou STG_<nome>."""
+    return entity.staging_table or f'STG_{safe_identifier(entity.name)}'
+
+
+def hash_of(style, project, columns, alias='s'):
+    """Expressão de hash das colunas da staging no dialeto do projeto."""
+    return style.dialect.hash_expression(
+        [f'{alias}.{column}' for column in columns], project.hash_algorithm, project.hash_key_storage
+    )
+
+
+def hub_load_sql(graph, hub, style):
+    """INSERT ... SELECT que carrega apenas as hash keys ainda não vistas no Hub."""
+    project = graph.project
+    safe_name = safe_identifier(hub.name)
+    hash_key = f'HK_{safe_name}'
+    return [
+        f'\n-- H_{safe_name} a partir de {staging_table_of(hub)}',
+        f'INSERT INTO H_{safe_name} ({hash_key}, {hub.business_key}, load_date, record_source)',
+        f'SELECT stg.{hash_key}, MIN(stg.{hub.business_key}), MIN(stg.load_date), MIN(stg.record_source)',
+        'FROM (',
+        f'    SELECT {hash_of(style, project, [hub.business_key])} AS {hash_key},',
+        f'           s.{hub.business_key}, s.{hub.load_date} AS load_date, s.{hub.record_source} AS record_source',
+        f'    FROM {staging_table_of(hub)} s',
+        f'    WHERE s.{hub.business_key} IS NOT NULL',
+        ') stg',
+        f'WHERE NOT EXISTS (SELECT 1 FROM H_{safe_name} h WHERE h.{hash_key} = stg.{hash_key})',
+        f'GROUP BY stg.{hash_key};',
+    ]
+
+
+def link_load_sql(graph, link, style):
+    """INSERT ... SELECT que carrega o Link deduplicado pela chave combinada."""
+    project = graph.project
+    safe_name = safe_identifier(link.name)
+    hash_key = f'HK_{safe_name}'
+    hubs = graph.hubs_of(link)
+    if not hubs:
+        return [f'\n-- L_{safe_name} ignorado: link sem hubs']
+    business_keys = [hub.business_key for hub in hubs]
+    hub_keys = [f'HK_{safe_identifier(hub.name)}' for hub in hubs]
+
+    lines = [
+        f'\n-- L_{safe_name} a partir de {staging_table_of(link)}',
+        f'INSERT INTO L_{safe_name} ({hash_key}, {", ".join(hub_keys)}, load_date, record_source)',
+        f'SELECT stg.{hash_key}, ' + ''.join(f'MIN(stg.{key}), ' for key in hub_keys)
+        + 'MIN(stg.load_date), MIN(stg.record_source)',
+        'FROM (',
+        f'    SELECT {hash_of(style, project, business_keys)} AS {hash_key},',
+    ]
+    for business_key, hub_key in zip(business_keys, hub_keys):
+        lines.append(f'           {hash_of(style, project, [business_key])} AS {hub_key},')
+    lines.extend([
+        f'           s.{link.load_date} AS load_date, s.{link.record_source} AS record_source',
+        f'    FROM {staging_table_of(link)} s',
+        '    WHERE ' + ' AND '.join(f's.{business_key} IS NOT NULL' for business_key in business_keys),
+        ') stg',
+        f'WHERE NOT EXISTS (SELECT 1 FROM L_{safe_name} l WHERE l.{hash_key} = stg.{hash_key})',
+        f'GROUP BY stg.{hash_key};',
+    ])
+    return lines
+
+
+def satellite_load_sql(graph, satellite, style):
+    """Carga incremental do Satellite em uma transação.
+
+    Insere apenas as linhas cujo HK_DIFF difere da versão anterior (a do
+    próprio lote ou, na primeira, a linha corrente do pai) e cujo (chave,
+    load_date) ainda não foi carregado, uma por chave e load_date, de modo
+    que recarregar o mesmo lote não altera nada; em seguida encerra a
+    vigência (valid_to/is_current) das linhas que ganharam uma versão mais
+    nova.
+    """
+    project = graph.project
+    dialect = style.dialect
+    safe_name = safe_identifier(satellite.name)
+    table = f'S_{safe_name}'
+    parent_kind, parent = graph.parent_of(satellite)
+    if parent is None:
+        return [f'\n-- {table} ignorado: pai inexistente']
+    parent_key = f'HK_{safe_identifier(parent.name)}'
+    if parent_kind == 'hub':
+        business_keys = [parent.business_key]
+    else:
+        business_keys = [hub.business_key for hub in graph.hubs_of(parent)]
+    attributes = [safe_identifier(name) for name in satellite.attributes]
+
+    columns = [parent_key, 'HK_DIFF', 'valid_from', 'valid_to', 'is_current'] + attributes + ['load_date', 'record_source']
+    lines = [
+        f'\n-- {table} a partir de {staging_table_of(satellite)}',
+        'BEGIN TRANSACTION;',
+        f'INSERT INTO {table} ({", ".join(columns)})',
+        f'SELECT stg.{parent_key}, stg.HK_DIFF, stg.load_date, NULL, {dialect.true_literal}, '
+        + ''.join(f'stg.{attribute}, ' for attribute in attributes)
+        + 'stg.load_date, stg.record_source',
+        'FROM (',
+        # Versões consecutivas iguais no lote: fica só a primeira
+        f'    SELECT v.*, LAG(v.HK_DIFF) OVER (PARTITION BY v.{parent_key} ORDER BY v.load_date) AS previous_diff',
+        '    FROM (',
+        # Uma linha por chave e load_date (a PK do satellite)
+        f'        SELECT h.*, ROW_NUMBER() OVER (PARTITION BY h.{parent_key}, h.load_date ORDER BY h.HK_DIFF DESC) AS version_rank',
+        '        FROM (',
+        f'            SELECT {hash_of(style, project, business_keys)} AS {parent_key},',
+        f'                   {hash_of(style, project, attributes or business_keys)} AS HK_DIFF,',
+    ]
+    for attribute in attributes:
+        lines.append(f'                   s.{attribute},')
+    lines.extend([
+        f'                   s.{satellite.load_date} AS load_date, s.{satellite.record_source} AS record_source',
+        f'            FROM {staging_table_of(satellite)} s',
+        '            WHERE ' + ' AND '.join(f's.{business_key} IS NOT NULL' for business_key in business_keys),
+        '        ) h',
+        '    ) v',
+        '    WHERE v.version_rank = 1',
+        ') stg',
+        # A primeira versão do lote é comparada com a linha corrente; as
+        # seguintes, com a versão anterior do próprio lote
+        'WHERE (stg.previous_diff <> stg.HK_DIFF OR (stg.previous_diff IS NULL AND NOT EXISTS (',
+        f'    SELECT 1 FROM {table} cur',
+        f'    WHERE cur.{parent_key} = stg.{parent_key} AND cur.{dialect.current_row_predicate}'
+        ' AND cur.HK_DIFF = stg.HK_DIFF',
+        '))) AND NOT EXISTS (',
+        # Recarga do mesmo lote: a versão daquele load_date já foi gravada
+        f'    SELECT 1 FROM {table} t',
+        f'    WHERE t.{parent_key} = stg.{parent_key} AND t.load_date = stg.load_date',
+        ');',
+        # Versões substituídas: vigência até o valid_from da próxima versão
+        f'UPDATE {table}',
+        'SET valid_to = (',
+        f'        SELECT MIN(n.valid_from) FROM {table} n',
+        f'        WHERE n.{parent_key} = {table}.{parent_key} AND n.valid_from > {table}.valid_from',
+        '    ),',
+        f'    is_current = {dialect.false_literal}',
+        f'WHERE {dialect.current_row_predicate} AND EXISTS (',
+        f'    SELECT 1 FROM {table} n',
+        f'    WHERE n.{parent_key} = {table}.{parent_key} AND n.valid_from > {table}.valid_from',
+        ');',
+        'COMMIT;',
+    ])
+    return lines
+
+
+def pit_population_sql(graph, pit):
+    """INSERT ... SELECT que popula a PIT para as datas do calendário de snapshots.
+
+    Para cada chave do pai e cada data do calendário ainda não carregada,
+    busca a linha vigente de cada satellite pelo intervalo valid_from/valid_to,
+    de forma que as consultas posteriores virem equi-joins por (HK, load_date).
+    """
+    safe_name = safe_identifier(pit.name)
+    parent_kind, parent = graph.parent_of(pit)
+    if parent is None:
+        return [f'\n-- PIT_{safe_name} ignorada: pai inexistente']
+    safe_parent = safe_identifier(parent.name)
+    parent_key = f'HK_{safe_parent}'
+    parent_table = f'{"H_" if parent_kind == "hub" else "L_"}{safe_parent}'
+    satellites = pit_satellites(graph, parent_kind, parent)
+
+    columns = [parent_key, 'snapshot_date'] + [f'S_{satellite}_load_date' for satellite in satellites]
+    lines = [
+        f'\n-- PIT_{safe_name}: snapshots de {pit.snapshot_table} ainda não carregados',
+        f'INSERT INTO PIT_{safe_name} ({", ".join(columns)})',
+        f'SELECT p.{parent_key}, c.{pit.snapshot_column}' + ''.join(
+            f', s{i}.load_date' for i in range(len(satellites))
+        ),
+        f'FROM {parent_table} p',
+        f'INNER JOIN {pit.snapshot_table} c ON c.{pit.snapshot_column} >= p.load_date',
+    ]
+    for i, satellite in enumerate(satellites):
+        lines.append(
+            f'LEFT JOIN S_{satellite} s{i} ON s{i}.{parent_key} = p.{parent_key}'
+            f' AND s{i}.valid_from <= c.{pit.snapshot_column}'
+            f' AND (s{i}.valid_to IS NULL OR s{i}.valid_to > c.{pit.snapshot_column})'
+        )
+    lines.append('WHERE NOT EXISTS (')
+    lines.append(f'    SELECT 1 FROM PIT_{safe_name} t')
+    lines.append(f'    WHERE t.{parent_key} = p.{parent_key} AND t.snapshot_date = c.{pit.snapshot_column}')
+    lines.append(');')
+    return lines
+
+
+def bridge_population_sql(graph, bridge):
+    """INSERT ... SELECT incremental que percorre o caminho da Bridge.
+
+    Cada link do caminho entra com as linhas já carregadas até a data do
+    snapshot, encadeado ao anterior pela hash key do hub em comum; apenas
+    datas do calendário ainda não presentes na Bridge são carregadas.
+    """
+    safe_name = safe_identifier(bridge.name)
+    columns = bridge_columns(graph, bridge)
+    if columns is None:
+        return [f'\n-- BR_{safe_name} ignorada: caminho vazio, repetido ou com entidades inexistentes']
+    snapshot = f'c.{bridge.snapshot_column}'
+    links = [safe_identifier(link.name) for link, hub in graph.bridge_path(bridge)]
+
+    # Cada coluna vem do link em que aparece primeiro: hub inicial e link 1
+    # de l0, depois o link i e o hub alcançado por ele de l{i}
+    selected = [f'l0.{columns[0]}']
+    for i in range(len(links)):
+        selected.append(f'l{i}.{columns[2 * i + 1]}')
+        selected.append(f'l{i}.{columns[2 * i + 2]}')
+
+    lines = [
+        f'\n-- BR_{safe_name}: snapshots de {bridge.snapshot_table} ainda não carregados',
+        f'INSERT INTO BR_{safe_name} (snapshot_date, {", ".join(columns)})',
+        f'SELECT {snapshot}, {", ".join(selected)}',
+        f'FROM {bridge.snapshot_table} c',
+        f'INNER JOIN L_{links[0]} l0 ON l0.load_date <= {snapshot}',
+    ]
+    for i in range(1, len(links)):
+        shared_hub = columns[2 * i]
+        lines.append(
+            f'INNER JOIN L_{links[i]} l{i} ON l{i}.{shared_hub} = l{i - 1}.{shared_hub}'
+            f' AND l{i}.load_date <= {snapshot}'
+        )
+    lines.append('WHERE NOT EXISTS (')
+    lines.append(f'    SELECT 1 FROM BR_{safe_name} t WHERE t.snapshot_date = {snapshot}')
+    lines.append(');')
+    return lines
+
+
+def iter_load_sql_blocks(graph):
+    """Gera o SQL de carga do projeto como blocos de linhas.
+
+    A ordem respeita as dependências: hubs, links, satellites e por fim as
+    estruturas de consulta (PITs e Bridges).
+    """
+    style = DDLStyle(graph.project)
+    yield [f'-- SQL de carga gerado automaticamente para o projeto: {graph.project.name}']
+
+    yield ['\n-- Carga dos Hubs']
+    for hub in graph.hubs.values():
+        yield hub_load_sql(graph, hub, style)
+
+    yield ['\n-- Carga dos Links']
+    for link in graph.links.values():
+        yield link_load_sql(graph, link, style)
+
+    yield ['\n-- Carga dos Satellites']
+    for satellite in graph.iter_satellites():
+        yield satellite_load_sql(graph, satellite, style)
+
+    if graph.pits:
+        yield ['\n-- Carga das PITs (Point-in-Time)']
+        for pit in graph.pits.values():
+            yield pit_population_sql(graph, pit)
+
+    if graph.bridges:
+        yield ['\n-- Carga das Bridges']
+        for bridge in graph.bridges.values():
+            yield bridge_population_sql(graph, bridge)
+
+
+def build_load_sql(graph):
+    """Monta o SQL de carga completo a partir do grafo do projeto."""
+    return '\n'.join('\n'.join(block) for block in iter_load_sql_blocks(graph))
@@ -0,0 +1,10 @@
+"""Carregador embutido: executa o vault modelado contra um SQLite local."""
+
+from .engine import LoadStats, VaultLoader
+from .readers import find_staging_file, iter_chunks, iter_handle_records, iter_records, iter_upload_records
+from .state import CurrentStateIndex
+
+__all__ = [
+    'CurrentStateIndex', 'LoadStats', 'VaultLoader', 'find_staging_file', 'iter_chunks', 'iter_handle_records',
+    'iter_records', 'iter_upload_records',
+]
@@ -0,0 +1,217 @@
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from ..ddl import build_ddl, safe_identifier
+from ..dialects import HASH_ALGORITHMS
+from ..graph import load_project_graph
+from ..hashing import BatchHasher
+from ..load_sql import staging_table_of
+from .readers import find_staging_file, iter_chunks
+from .state import CurrentStateIndex
+
+class LoadStats:
+    """Resultado da carga de uma entidade."""
+
+    def __init__(self, table, staging_file):
+        self.table = table
+        self.staging_file = staging_file
+        self.rows_read = 0
+        self.rows_written = 0
+        # Versões de satellite anteriores à linha corrente, ignoradas
+        self.rows_stale = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+
+class VaultLoader:
+    """Carrega arquivos de staging nas tabelas do projeto em um SQLite local.
+
+    Os arquivos são lidos em blocos; para cada bloco as hash keys e HK_DIFF
+    são calculados em lote (em ``workers`` processos para blocos grandes) e
+    gravados com ``executemany`` em uma única transação. A ordem de carga é
+    hubs, links e satellites.
+
+    A detecção de mudanças dos satellites usa um CurrentStateIndex por
+    tabela; com ``state_dir`` o índice é persistido entre cargas e a tabela
+    não precisa ser relida (o snapshot deve acompanhar o banco de destino).
+    """
+
+    def __init__(self, project, connection, staging_dir, chunk_size=10000, workers=1, state_dir=None):
+        self.project = project
+        self.connection = connection
+        self.staging_dir = staging_dir
+        self.chunk_size = chunk_size
+        self.graph = load_project_graph(project)
+        self.hasher = BatchHasher.for_project(project, workers=workers)
+        self.state_dir = state_dir
+        self.states = {}
+
+    def create_target(self):
+        """Cria as tabelas a partir do DDL gerado se o banco ainda estiver vazio."""
+        exists = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1"
+        ).fetchone()
+        if not exists:
+            self.connection.executescript(build_ddl(self.graph, dialect='sqlite'))
+
+    def load(self):
+        """Carrega todas as entidades, gerando as estatísticas de cada uma."""
+        self.create_target()
+        with self.hasher:
+            for hub in self.graph.hubs.values():
+                yield self.run(hub, f'H_{safe_identifier(hub.name)}', self.hub_rows)
+            for link in self.graph.links.values():
+                yield self.run(link, f'L_{safe_identifier(link.name)}', self.link_rows)
+            for satellite in self.graph.iter_satellites():
+                table = f'S_{safe_identifier(satellite.name)}'
+                stats = self.run(satellite, table, self.satellite_rows)
+                self.save_state(table)
+                # Libera o índice antes do próximo satellite
+                self.states.pop(table, None)
+                yield stats
+
+    def run(self, entity, table, write_chunk):
+        """Lê o staging da entidade em blocos e grava cada bloco em uma transação."""
+        stats = LoadStats(table, find_staging_file(self.staging_dir, staging_table_of(entity)))
+        if stats.staging_file is None:
+            return stats
+        started = time.perf_counter()
+        for chunk in iter_chunks(stats.staging_file, self.chunk_size):
+            changes = self.connection.total_changes
+            with self.connection:
+                change_set = write_chunk(entity, table, chunk)
+            if change_set is not None:
+                # O índice só acompanha o banco depois do commit do bloco
+                self.states[table].apply(change_set)
+                stats.rows_stale += change_set.stale
+            stats.rows_read += len(chunk)
+            stats.rows_written += self.connection.total_changes - changes
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def hub_rows(self, hub, table, chunk):
+        hash_key = f'HK_{safe_identifier(hub.name)}'
+        records = [record for record in chunk if record.get(hub.business_key) is not None]
+        rows = {}
+        for key, record in zip(self.hasher.hub_keys(hub, records), records):
+            if key not in rows:
+                rows[key] = (key, record[hub.business_key], record.get(hub.load_date), record.get(hub.record_source))
+        # A PK descarta as chaves já vistas em cargas anteriores
+        self.connection.executemany(
+            f'INSERT OR IGNORE INTO {table} ({hash_key}, {hub.business_key}, load_date, record_source) '
+            'VALUES (?, ?, ?, ?)',
+            rows.values(),
+        )
+
+    def link_rows(self, link, table, chunk):
+        hubs = self.graph.hubs_of(link)
+        if not hubs:
+            return
+        columns = [f'HK_{safe_identifier(link.name)}'] + [f'HK_{safe_identifier(hub.name)}' for hub in hubs]
+        business_keys = [hub.business_key for hub in hubs]
+        records = [
+            record for record in chunk
+            if all(record.get(business_key) is not None for business_key in business_keys)
+        ]
+        link_keys = self.hasher.hash_records(records, business_keys)
+        hub_keys = [self.hasher.hub_keys(hub, records) for hub in hubs]
+        rows = {}
+        for index, (key, record) in enumerate(zip(link_keys, records)):
+            if key not in rows:
+                rows[key] = (
+                    key, *(keys[index] for keys in hub_keys),
+                    record.get(link.load_date), record.get(link.record_source),
+                )
+        placeholders = ', '.join('?' for _ in range(len(columns) + 2))
+        self.connection.executemany(
+            f'INSERT OR IGNORE INTO {table} ({", ".join(columns)}, load_date, record_source) '
+            f'VALUES ({placeholders})',
+            rows.values(),
+        )
+
+    def parent_business_keys(self, satellite):
+        kind, parent = self.graph.parent_of(satellite)
+        if parent is None:
+            return None, []
+        hubs = [parent] if kind == 'hub' else self.graph.hubs_of(parent)
+        return f'HK_{safe_identifier(parent.name)}', [hub.business_key for hub in hubs]
+
+    def current_state(self, table, parent_key):
+        """Índice de estado corrente do Satellite, lido do snapshot em
+        ``state_dir`` se existir ou da própria tabela."""
+        if table not in self.states:
+            size = HASH_ALGORITHMS[self.project.hash_algorithm]
+            snapshot = self.snapshot_path(table)
+            try:
+                state = CurrentStateIndex.load(snapshot) if snapshot is not None and snapshot.exists() else None
+            except ValueError:
+                # Snapshot de outra versão ou corrompido: relê a tabela
+                state = None
+            if state is None:
+                state = CurrentStateIndex.from_table(
+                    self.connection, table, parent_key, key_size=size, diff_size=size
+                )
+            self.states[table] = state
+        return self.states[table]
+
+    def snapshot_path(self, table):
+        return Path(self.state_dir) / f'{table}.state' if self.state_dir else None
+
+    def save_state(self, table):
+        """Grava o snapshot do estado corrente para a próxima carga."""
+        snapshot = self.snapshot_path(table)
+        if snapshot is not None and table in self.states:
+            snapshot.parent.mkdir(parents=True, exist_ok=True)
+            self.states[table].save(snapshot)
+
+    def satellite_rows(self, satellite, table, chunk):
+        """Grava as versões novas do bloco e retorna o ChangeSet, a aplicar
+        ao índice de estado corrente após o commit."""
+        parent_key, business_keys = self.parent_business_keys(satellite)
+        if parent_key is None:
+            return
+        attributes = list(satellite.attributes)
+
+        records = [
+            record for record in chunk
+            if all(record.get(business_key) is not None for business_key in business_keys)
+        ]
+        keys = self.hasher.hash_records(records, business_keys)
+        # Sem atributos o HK_DIFF cai na chave, como no SQL de carga
+        hashdiffs = self.hasher.hashdiffs(satellite, records) if attributes else keys
+
+        # Versões de cada chave no bloco, em ordem de load_date
+        versions = defaultdict(list)
+        for key, hashdiff, record in zip(keys, hashdiffs, records):
+            versions[key].append((
+                record.get(satellite.load_date), hashdiff,
+                ([record.get(attribute) for attribute in attributes], record.get(satellite.record_source)),
+            ))
+
+        # Só as versões novas ou alteradas chegam ao banco
+        changes = self.current_state(table, parent_key).detect_changes(versions)
+        inserts = [
+            (key, hashdiff, valid_from, valid_to, int(is_current), *values, valid_from, record_source)
+            for key, hashdiff, valid_from, valid_to, is_current, (values, record_source) in changes.inserts
+        ]
+
+        self.connection.executemany(
+            f'UPDATE {table} SET valid_to = ?, is_current = 0 WHERE {parent_key} = ? AND is_current = 1',
+            changes.end_dates,
+        )
+        # Só a linha corrente é substituída; a história nunca é reescrita
+        self.connection.executemany(
+            f'DELETE FROM {table} WHERE {parent_key} = ? AND load_date = ? AND is_current = 1',
+            changes.replacements,
+        )
+        columns = [parent_key, 'HK_DIFF', 'valid_from', 'valid_to', 'is_current']
+        columns += [safe_identifier(attribute) for attribute in attributes] + ['load_date', 'record_source']
+        self.connection.executemany(
+            f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)})',
+            inserts,
+        )
+        return changes
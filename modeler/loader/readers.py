@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from pathlib import Path
+
+# Extensões aceitas para os arquivos de staging, em ordem de preferência
+STAGING_EXTENSIONS = ('.csv', '.jsonl', '.ndjson')
+
+
+def find_staging_file(staging_dir, table):
+    """Localiza o arquivo de staging de uma tabela (<tabela>.csv ou .jsonl)."""
+    staging_dir = Path(staging_dir)
+    for name in (table, table.lower()):
+        for extension in STAGING_EXTENSIONS:
+            path = staging_dir / f'{name}{extension}'
+            if path.exists():
+                return path
+    return None
+
+
+def iter_records(path):
+    """Lê os registros do arquivo um a um, sem carregá-lo inteiro em memória.
+
+    No CSV, campos vazios viram None (o CSV não distingue nulo de vazio).
+    """
+    path = Path(path)
+    with path.open(newline='', encoding='utf-8') as handle:
+        yield from iter_handle_records(handle, 'csv' if path.suffix == '.csv' else 'jsonl')
+
+
+def iter_handle_records(handle, fmt):
+    """Lê os registros de um arquivo já aberto em modo texto ('csv' ou 'jsonl')."""
+    if fmt == 'csv':
+        for row in csv.DictReader(handle):
+            yield {column: (value if value != '' else None) for column, value in row.items()}
+    else:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_upload_records(upload):
+    """Lê os registros de um arquivo enviado (CSV ou JSON lines) sem salvá-lo."""
+    fmt = 'csv' if upload.name.lower().endswith('.csv') else 'jsonl'
+    handle = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+    try:
+        yield from iter_handle_records(handle, fmt)
+    finally:
+        # Não fecha o arquivo do upload junto com o wrapper
+        handle.detach()
+
+
+def iter_chunks(path, chunk_size=10000):
+    """Agrupa os registros do arquivo em listas de até ``chunk_size``."""
+    chunk = []
+    for record in iter_records(path):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
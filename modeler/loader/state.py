@@ -0,0 +1,282 @@
+import struct
+from pathlib import Path
+
+# Cabeçalho do snapshot: marca, versão, tamanho da chave, do HK_DIFF, do
+# valid_from e nº de chaves
+SNAPSHOT_HEADER = struct.Struct('<4sBHHHQ')
+SNAPSHOT_MAGIC = b'DVCS'
+SNAPSHOT_VERSION = 2
+
+# Bytes reservados ao valid_from (texto ISO) de cada chave
+DATE_SIZE = 32
+
+# Linhas lidas por vez ao montar o índice a partir da tabela
+FETCH_SIZE = 50000
+
+
+def to_bytes(value):
+    """Hash key em bytes: digests binários passam direto, hexadecimais são decodificados."""
+    return value if isinstance(value, bytes) else bytes.fromhex(value)
+
+
+def encode_date(value, size=DATE_SIZE):
+    """valid_from em largura fixa (completado com zeros); None vira vazio."""
+    data = b'' if value is None else str(value).encode()
+    if len(data) > size:
+        raise ValueError(f'load_date {value!r} passa de {size} bytes.')
+    return data.ljust(size, b'\0')
+
+
+def decode_date(data):
+    return data.rstrip(b'\0').decode() or None
+
+
+class ChangeSet:
+    """Gravações de um lote de Satellite calculadas por ``detect_changes``."""
+
+    def __init__(self):
+        # (key, hashdiff, valid_from, valid_to, is_current, payload)
+        self.inserts = []
+        # (valid_to, key): linhas correntes encerradas pelas novas versões
+        self.end_dates = []
+        # (key, valid_from): linhas correntes substituídas por uma versão do mesmo load_date
+        self.replacements = []
+        # Versões anteriores à linha corrente, ignoradas
+        self.stale = 0
+        # key -> (hashdiff, valid_from): novo estado corrente, aplicado ao
+        # índice com ``apply`` só depois que o lote for gravado
+        self.state = {}
+
+
+class CurrentStateIndex:
+    """Índice compacto hash key do pai -> (HK_DIFF, valid_from) da linha
+    corrente de um Satellite.
+
+    As chaves ficam ordenadas em um único buffer de bytes de largura fixa,
+    com HK_DIFF + valid_from em um buffer paralelo, e são localizadas por
+    busca binária: cada entrada ocupa apenas ``key_size + diff_size +
+    date_size`` bytes, o que permite dezenas de milhões de chaves em
+    memória. Alterações vão para um dicionário pequeno, incorporado aos
+    buffers (merge ordenado) quando passa de ``compact_threshold`` entradas.
+    """
+
+    def __init__(self, key_size=16, diff_size=16, keys=b'', diffs=b'', compact_threshold=100000,
+                 date_size=DATE_SIZE):
+        self.key_size = key_size
+        self.diff_size = diff_size
+        self.date_size = date_size
+        # Largura de cada valor no buffer paralelo: HK_DIFF + valid_from
+        self.value_size = diff_size + date_size
+        self.compact_threshold = compact_threshold
+        self._keys = bytes(keys)
+        self._diffs = bytes(diffs)
+        self._count = len(self._keys) // key_size
+        self._pending = {}
+
+    def __len__(self):
+        self.compact()
+        return self._count
+
+    @property
+    def nbytes(self):
+        """Bytes ocupados pelos buffers compactados."""
+        return len(self._keys) + len(self._diffs)
+
+    def _position(self, key):
+        """Posição de ``key`` (ou onde entraria) no buffer ordenado."""
+        keys, size = self._keys, self.key_size
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if keys[middle * size:(middle + 1) * size] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _value(self, key):
+        """HK_DIFF + valid_from da chave em bytes, ou None."""
+        key = to_bytes(key)
+        if key in self._pending:
+            return self._pending[key]
+        position = self._position(key)
+        start = position * self.key_size
+        if position < self._count and self._keys[start:start + self.key_size] == key:
+            return self._diffs[position * self.value_size:(position + 1) * self.value_size]
+        return None
+
+    def _split(self, value):
+        return value[:self.diff_size], decode_date(value[self.diff_size:])
+
+    def lookup(self, key):
+        """(HK_DIFF em bytes, valid_from) da linha corrente da chave, ou None."""
+        value = self._value(key)
+        return None if value is None else self._split(value)
+
+    def get(self, key):
+        """HK_DIFF corrente da chave (em bytes) ou None."""
+        value = self._value(key)
+        return None if value is None else value[:self.diff_size]
+
+    def set(self, key, hashdiff, valid_from=None):
+        self._pending[to_bytes(key)] = to_bytes(hashdiff) + encode_date(valid_from, self.date_size)
+        if len(self._pending) >= self.compact_threshold:
+            self.compact()
+
+    def compact(self):
+        """Incorpora as alterações pendentes aos buffers ordenados."""
+        if not self._pending:
+            return
+        key_size, value_size = self.key_size, self.value_size
+        old_keys, old_diffs = self._keys, self._diffs
+        keys, diffs = bytearray(), bytearray()
+        index = 0
+        for key in sorted(self._pending):
+            position = self._position(key)
+            # Copia em bloco o trecho anterior à chave
+            keys += old_keys[index * key_size:position * key_size]
+            diffs += old_diffs[index * value_size:position * value_size]
+            keys += key
+            diffs += self._pending[key]
+            index = position
+            if position < self._count and old_keys[position * key_size:(position + 1) * key_size] == key:
+                index += 1
+        keys += old_keys[index * key_size:]
+        diffs += old_diffs[index * value_size:]
+        self._keys, self._diffs = bytes(keys), bytes(diffs)
+        self._count = len(self._keys) // key_size
+        self._pending = {}
+
+    def items(self):
+        """Trios (chave, HK_DIFF, valid_from), na ordem das chaves."""
+        self.compact()
+        for position in range(self._count):
+            yield (
+                self._keys[position * self.key_size:(position + 1) * self.key_size],
+                *self._split(self._diffs[position * self.value_size:(position + 1) * self.value_size]),
+            )
+
+    def detect_changes(self, versions):
+        """Separa as linhas novas ou alteradas de um lote.
+
+        ``versions`` mapeia a hash key do pai para suas versões no lote, como
+        tuplas ``(load_date, hashdiff, payload)``. Entre versões com o mesmo
+        load_date vale a última do lote (a PK do satellite é chave +
+        load_date) e versões iguais à anterior (no índice ou no próprio lote)
+        são descartadas. Versões anteriores ao valid_from da linha corrente
+        não entram: a história já gravada não é reescrita. Uma versão
+        diferente no mesmo load_date da linha corrente a substitui.
+
+        Retorna um ChangeSet; o índice não muda até ``apply``, de modo que
+        uma transação desfeita não o deixa à frente do banco.
+        """
+        changes = ChangeSet()
+        for key, rows in versions.items():
+            rows = sorted(rows, key=lambda row: row[0] or '')
+            rows = [
+                row for position, row in enumerate(rows, 1)
+                if position == len(rows) or rows[position][0] != row[0]
+            ]
+            current = self.lookup(key)
+            previous, current_from = current if current is not None else (None, None)
+            changed = []
+            replaces_current = False
+            for row in rows:
+                load_date, hashdiff = row[0], to_bytes(row[1])
+                if current is not None and (load_date or '') < (current_from or ''):
+                    changes.stale += 1
+                    continue
+                if current is not None and not changed and load_date == current_from:
+                    if hashdiff != previous:
+                        replaces_current = True
+                        changed.append(row)
+                        previous = hashdiff
+                    continue
+                if hashdiff != previous:
+                    changed.append(row)
+                    previous = hashdiff
+            if not changed:
+                continue
+            if replaces_current:
+                changes.replacements.append((key, current_from))
+            elif current is not None:
+                changes.end_dates.append((changed[0][0], key))
+            for position, (load_date, hashdiff, payload) in enumerate(changed):
+                is_last = position == len(changed) - 1
+                valid_to = None if is_last else changed[position + 1][0]
+                changes.inserts.append((key, hashdiff, load_date, valid_to, is_last, payload))
+            changes.state[to_bytes(key)] = (previous, changed[-1][0])
+        return changes
+
+    def apply(self, changes):
+        """Incorpora o estado corrente de um ChangeSet já gravado no banco."""
+        for key, (hashdiff, valid_from) in changes.state.items():
+            self.set(key, hashdiff, valid_from)
+
+    @classmethod
+    def from_rows(cls, rows, key_size=16, diff_size=16, **kwargs):
+        """Monta o índice a partir de (chave, HK_DIFF[, valid_from]), ordenados ou não."""
+        index = cls(key_size, diff_size, **kwargs)
+        value_size, date_size = index.value_size, index.date_size
+        keys, diffs = bytearray(), bytearray()
+        last = None
+        ordered = True
+        for key, hashdiff, *valid_from in rows:
+            key = to_bytes(key)
+            if last is not None and key <= last:
+                ordered = False
+            last = key
+            keys += key
+            diffs += to_bytes(hashdiff)
+            diffs += encode_date(valid_from[0] if valid_from else None, date_size)
+        if not ordered:
+            # Ordena as posições sem materializar tuplas por linha
+            count = len(keys) // key_size
+            order = sorted(range(count), key=lambda i: keys[i * key_size:(i + 1) * key_size])
+            keys = b''.join(keys[i * key_size:(i + 1) * key_size] for i in order)
+            diffs = b''.join(diffs[i * value_size:(i + 1) * value_size] for i in order)
+        index._keys, index._diffs = bytes(keys), bytes(diffs)
+        index._count = len(index._keys) // key_size
+        return index
+
+    @classmethod
+    def from_table(cls, connection, table, parent_key, key_size=16, diff_size=16, **kwargs):
+        """Monta o índice a partir das linhas correntes do Satellite no banco."""
+        cursor = connection.execute(
+            f'SELECT {parent_key}, HK_DIFF, valid_from FROM {table} WHERE is_current = 1 ORDER BY {parent_key}'
+        )
+
+        def rows():
+            while True:
+                batch = cursor.fetchmany(FETCH_SIZE)
+                if not batch:
+                    return
+                yield from batch
+
+        return cls.from_rows(rows(), key_size, diff_size, **kwargs)
+
+    def save(self, path):
+        """Grava o índice em um arquivo de snapshot."""
+        self.compact()
+        with Path(path).open('wb') as handle:
+            handle.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.key_size, self.diff_size, self.date_size, self._count
+            ))
+            handle.write(self._keys)
+            handle.write(self._diffs)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Lê um índice gravado por ``save``."""
+        with Path(path).open('rb') as handle:
+            header = handle.read(SNAPSHOT_HEADER.size)
+            if len(header) < SNAPSHOT_HEADER.size:
+                raise ValueError(f'{path} não é um snapshot de estado corrente válido.')
+            magic, version, key_size, diff_size, date_size, count = SNAPSHOT_HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f'{path} não é um snapshot de estado corrente válido.')
+            keys = handle.read(count * key_size)
+            diffs = handle.read(count * (diff_size + date_size))
+        if len(keys) != count * key_size or len(diffs) != count * (diff_size + date_size):
+            raise ValueError(f'Snapshot {path} truncado.')
+        return cls(key_size, diff_size, keys, diffs, date_size=date_size, **kwargs)
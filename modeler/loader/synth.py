@@ -0,0 +1,189 @@
+import csv
+import json
+import random
+import zlib
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+from ..ddl import safe_identifier
+from ..load_sql import staging_table_of
+
+RECORD_SOURCE = 'synth'
+
+
+class StagingSpec:
+    """Colunas e entidades de uma tabela de staging sintética."""
+
+    def __init__(self, table):
+        self.table = table
+        self.hubs = []
+        self.satellites = []
+        self.columns = []
+        self.audit = {}
+
+    def add_column(self, column):
+        if column not in self.columns:
+            self.columns.append(column)
+
+    def add_audit(self, entity):
+        """Colunas de data de carga e de fonte do registro da entidade."""
+        for column, kind in ((entity.load_date, 'load_date'), (entity.record_source, 'record_source')):
+            self.add_column(column)
+            self.audit[column] = kind
+
+    def add_hub(self, hub):
+        if hub not in self.hubs:
+            self.hubs.append(hub)
+        self.add_column(hub.business_key)
+
+
+class VaultSynthesizer:
+    """Gera arquivos de staging sintéticos a partir do modelo do projeto.
+
+    Cada tabela de staging recebe as chaves de negócio dos hubs (também os
+    de links e os pais de satellites), os atributos dos satellites e as
+    colunas de auditoria de cada entidade. As chaves são sorteadas de uma
+    população de ``keys`` por hub com viés Zipf (``skew``; 0 = uniforme) e
+    cada satellite muda de versão com probabilidade ``change_rate`` a cada
+    nova linha do mesmo pai. Tudo deriva de ``seed``: a mesma configuração
+    gera sempre os mesmos arquivos.
+
+    A geração é feita em blocos orientados a colunas (``random.choices`` e
+    aritmética sobre índices), sem dependências externas.
+    """
+
+    def __init__(self, graph, rows=100000, keys=10000, skew=0.0, change_rate=0.1, change_rates=None,
+                 seed=0, start=date(2024, 1, 1), days=30):
+        self.graph = graph
+        self.rows = rows
+        self.keys = keys
+        self.skew = skew
+        self.change_rate = change_rate
+        self.change_rates = change_rates or {}
+        self.seed = seed
+        self.start = start
+        self.days = days
+        # Pesos acumulados do sorteio das chaves, compartilhados por todos os hubs
+        self.cum_weights = list(accumulate((index + 1) ** -skew for index in range(keys)))
+
+    def staging_specs(self):
+        """Tabelas de staging do projeto com as colunas que cada uma precisa."""
+        specs = {}
+
+        def spec_for(entity):
+            table = staging_table_of(entity)
+            if table not in specs:
+                specs[table] = StagingSpec(table)
+            spec = specs[table]
+            spec.add_audit(entity)
+            return spec
+
+        for hub in self.graph.hubs.values():
+            spec_for(hub).add_hub(hub)
+        for link in self.graph.links.values():
+            spec = spec_for(link)
+            for hub in self.graph.hubs_of(link):
+                spec.add_hub(hub)
+        for satellite in self.graph.iter_satellites():
+            kind, parent = self.graph.parent_of(satellite)
+            if parent is None:
+                continue
+            spec = spec_for(satellite)
+            parent_hubs = [parent] if kind == 'hub' else self.graph.hubs_of(parent)
+            for hub in parent_hubs:
+                spec.add_hub(hub)
+            for attribute in satellite.attributes:
+                spec.add_column(attribute)
+            spec.satellites.append((satellite, parent_hubs))
+        return specs
+
+    def business_key(self, hub, index):
+        return f'{safe_identifier(hub.name).upper()}-{index:08d}'
+
+    def attribute_value(self, tipo, seed):
+        """Valor determinístico de um atributo a partir de um inteiro."""
+        tipo = tipo.lower()
+        if tipo == 'smallint':
+            return seed % 30000
+        if tipo in ('integer', 'bigint'):
+            return seed % 1000000
+        if tipo in ('float', 'decimal'):
+            return round((seed % 10000000) / 100, 2)
+        if tipo == 'boolean':
+            return bool(seed % 2)
+        if tipo in ('date', 'datetime'):
+            return (self.start - timedelta(days=seed % 3650)).isoformat()
+        return f'V{seed % 100000:05d}'
+
+    def iter_chunks(self, spec, chunk_size=10000):
+        """Gera as linhas da tabela de staging em blocos de dicts."""
+        rng = random.Random(f'{self.seed}:{spec.table}')
+        population = range(self.keys)
+        rates = [self.change_rates.get(satellite.name, self.change_rate) for satellite, _ in spec.satellites]
+        attributes = [list(satellite.attributes.items()) for satellite, _ in spec.satellites]
+        # Versão corrente de cada pai, por satellite
+        versions = [{} for _ in spec.satellites]
+
+        for offset in range(0, self.rows, chunk_size):
+            size = min(chunk_size, self.rows - offset)
+            # Colunas do bloco: índice da chave de cada hub e sorteios de mudança
+            key_columns = {
+                hub.id: rng.choices(population, cum_weights=self.cum_weights, k=size) for hub in spec.hubs
+            }
+            change_columns = [[rng.random() < rate for _ in range(size)] for rate in rates]
+            load_dates = [
+                (self.start + timedelta(days=(offset + row) * self.days // self.rows)).isoformat()
+                for row in range(size)
+            ]
+
+            chunk = []
+            for row in range(size):
+                record = {hub.business_key: self.business_key(hub, key_columns[hub.id][row]) for hub in spec.hubs}
+                for position, (satellite, parent_hubs) in enumerate(spec.satellites):
+                    parent_key = tuple(key_columns[hub.id][row] for hub in parent_hubs)
+                    seen = versions[position]
+                    if parent_key in seen and change_columns[position][row]:
+                        seen[parent_key] += 1
+                    version = seen.setdefault(parent_key, 0)
+                    base = hash_seed(self.seed, satellite.name, parent_key, version)
+                    for number, (attribute, tipo) in enumerate(attributes[position]):
+                        record[attribute] = self.attribute_value(tipo, base + number * 7919)
+                for column, kind in spec.audit.items():
+                    record[column] = load_dates[row] if kind == 'load_date' else RECORD_SOURCE
+                chunk.append(record)
+            yield chunk
+
+    def write(self, directory, fmt='csv', chunk_size=10000):
+        """Grava um arquivo por tabela de staging, bloco a bloco.
+
+        Retorna a lista de (caminho, linhas gravadas).
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        written = []
+        for spec in self.staging_specs().values():
+            path = directory / f'{spec.table}.{fmt}'
+            count = 0
+            with path.open('w', newline='', encoding='utf-8') as handle:
+                writer = None
+                if fmt == 'csv':
+                    writer = csv.DictWriter(handle, fieldnames=spec.columns)
+                    writer.writeheader()
+                for chunk in self.iter_chunks(spec, chunk_size):
+                    if writer is not None:
+                        writer.writerows(chunk)
+                    else:
+                        handle.write(''.join(json.dumps(record) + '\n' for record in chunk))
+                    count += len(chunk)
+            written.append((path, count))
+        return written
+
+
+def hash_seed(seed, name, parent_key, version):
+    """Inteiro determinístico (independente de PYTHONHASHSEED e dos ids do
+    banco) para os atributos."""
+    value = (seed * 1000003 + zlib.crc32(name.encode('utf-8'))) * 1000003 + version
+    for key in parent_key:
+        value = (value * 1000003 + key) % (1 << 61)
+    return value
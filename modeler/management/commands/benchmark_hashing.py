@@ -0,0 +1,72 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from modeler.dialects import HASH_ALGORITHMS
+from modeler.hashing import PARALLEL_BATCH_SIZE, BatchHasher
+
+
+def parse_workers(value):
+    try:
+        workers = [int(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise CommandError('--workers deve ser uma lista de inteiros separados por vírgula.')
+    if not workers or min(workers) < 1:
+        raise CommandError('--workers deve conter apenas valores maiores que zero.')
+    return workers
+
+
+class Command(BaseCommand):
+    help = 'Mede a vazão do cálculo de hash keys em lote com diferentes números de processos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Linhas por execução')
+        parser.add_argument('--columns', type=int, default=3, help='Colunas concatenadas em cada hash')
+        parser.add_argument('--workers', default=None,
+                            help='Números de processos a comparar, ex.: 1,2,4 (padrão: 1 até o nº de CPUs)')
+        parser.add_argument('--algorithm', choices=sorted(HASH_ALGORITHMS), default='md5')
+        parser.add_argument('--storage', choices=['varchar', 'binary'], default='varchar')
+        parser.add_argument('--batch-size', type=int, default=PARALLEL_BATCH_SIZE,
+                            help='Linhas por lote enviado a cada processo')
+
+    def handle(self, *args, **options):
+        cpus = os.cpu_count() or 1
+        if options['workers']:
+            workers = parse_workers(options['workers'])
+        else:
+            workers = sorted({1, *(2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus), cpus})
+
+        # Valores determinísticos, com nulos e espaços para exercitar a normalização
+        rows = options['rows']
+        columns = [
+            [None if (i + c) % 97 == 0 else f' valor {c}-{i} ' for i in range(rows)]
+            for c in range(options['columns'])
+        ]
+        self.stdout.write(
+            f'{rows} linhas x {options["columns"]} colunas, {options["algorithm"]}/{options["storage"]}, '
+            f'{cpus} CPUs'
+        )
+        # O BatchHasher limita os processos ao número de CPUs
+        self.stdout.write(
+            'O speedup só aparece com mais de um núcleo; '
+            f'acima de {cpus} processo(s) o resultado equivale ao de {cpus}.'
+        )
+
+        baseline = None
+        expected = None
+        for count in workers:
+            with BatchHasher(options['algorithm'], options['storage'], workers=count,
+                             batch_size=options['batch_size']) as hasher:
+                started = time.perf_counter()
+                digests = hasher.hash(columns)
+                seconds = time.perf_counter() - started
+            if expected is None:
+                expected = digests
+            elif digests != expected:
+                raise CommandError(f'Resultado divergente com {count} processos.')
+            baseline = baseline or seconds
+            self.stdout.write(
+                f'{count:>3} processo(s): {seconds:.2f}s  {rows / seconds:>12,.0f} linhas/s  '
+                f'speedup {baseline / seconds:.2f}x'
+            )
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from modeler.benchmarks import (
+    BENCHMARK_VIEWS, DEFAULT_SIZES, compare_results, dump_results, load_results, run_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = ('Mede tempo, queries e pico de memória das views do modeler em projetos sintéticos, '
+            'em um banco de teste descartável.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                            help='Números de hubs dos projetos sintéticos, separados por vírgula')
+        parser.add_argument('--views', default=','.join(BENCHMARK_VIEWS),
+                            help='Views a medir, separadas por vírgula')
+        parser.add_argument('--repeat', type=int, default=3, help='Execuções por view (vale a mediana)')
+        parser.add_argument('--output', default='benchmark.json', help='Arquivo JSON com os resultados')
+        parser.add_argument('--baseline', help='JSON de uma execução anterior para comparação')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Regressão tolerada em tempo e memória (fração do baseline)')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes deve ser uma lista de inteiros separados por vírgula.')
+        views = [name.strip() for name in options['views'].split(',') if name.strip()]
+        unknown = set(views) - set(BENCHMARK_VIEWS)
+        if unknown:
+            raise CommandError(f'Views desconhecidas: {", ".join(sorted(unknown))}')
+        baseline = load_results(options['baseline']) if options['baseline'] else None
+
+        # Nunca mede contra o banco real: cria (e descarta) um banco de teste
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = run_benchmarks(sizes, options['repeat'], views, log=self.stdout.write)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        dump_results(results, options['output'])
+        self.stdout.write(f'Resultados gravados em {options["output"]}')
+
+        if baseline is not None:
+            regressions = compare_results(results, baseline, options['threshold'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(regression)
+                raise CommandError(f'{len(regressions)} regressão(ões) em relação a {options["baseline"]}.')
+            self.stdout.write(self.style.SUCCESS('Sem regressões em relação ao baseline.'))
@@ -0,0 +1,44 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from modeler.importer import MODEL_FORMATS, ModelImportError, import_model_file, model_format
+from modeler.management.utils import find_project
+from modeler.models import Project
+
+
+class Command(BaseCommand):
+    help = ('Importa hubs, links, satellites e atributos de um arquivo de modelo (JSON, JSON lines, YAML '
+            'ou CSV) em uma única transação.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('project', help='Id ou nome do projeto')
+        parser.add_argument('file', help=f'Arquivo do modelo ({", ".join(MODEL_FORMATS)})')
+        parser.add_argument('--create', action='store_true', help='Cria o projeto se ele não existir')
+
+    def handle(self, *args, **options):
+        path = Path(options['file'])
+        fmt = model_format(path.name)
+        if fmt is None:
+            raise CommandError(f'Formato de "{path.name}" não suportado (use {", ".join(MODEL_FORMATS)}).')
+        if not path.is_file():
+            raise CommandError(f'Arquivo "{path}" não existe.')
+        if options['create'] and not Project.objects.filter(name=options['project']).exists():
+            project = Project.objects.create(name=options['project'])
+        else:
+            project = find_project(options['project'])
+
+        started = time.perf_counter()
+        try:
+            with path.open(newline='', encoding='utf-8') as handle:
+                counts = import_model_file(project, handle, fmt)
+        except ModelImportError as error:
+            for message in error.errors:
+                self.stderr.write(message)
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            f'{counts["hubs"]} hub(s), {counts["links"]} link(s), {counts["satellites"]} satellite(s) e '
+            f'{counts["attributes"]} atributo(s) importados em {project.name} '
+            f'em {time.perf_counter() - started:.2f}s.'
+        ))
@@ -0,0 +1,46 @@
+import sqlite3
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from modeler.loader import VaultLoader
+from modeler.management.utils import find_project
+
+
+class Command(BaseCommand):
+    help = 'Carrega os arquivos de staging (CSV/JSON lines) do projeto em um banco SQLite local.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('project', help='Id ou nome do projeto')
+        parser.add_argument('staging_dir', help='Diretório com os arquivos <tabela de staging>.csv/.jsonl')
+        parser.add_argument('--target', help='Arquivo SQLite de destino (padrão: <staging_dir>/vault.sqlite3)')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Registros por transação')
+        parser.add_argument('--workers', type=int, default=1, help='Processos para o cálculo das hash keys')
+        parser.add_argument('--state-dir', help='Diretório dos snapshots de estado corrente dos satellites')
+
+    def handle(self, *args, **options):
+        project = find_project(options['project'])
+        staging_dir = Path(options['staging_dir'])
+        if not staging_dir.is_dir():
+            raise CommandError(f'Diretório de staging "{staging_dir}" não existe.')
+        target = options['target'] or staging_dir / 'vault.sqlite3'
+
+        connection = sqlite3.connect(target)
+        try:
+            loader = VaultLoader(project, connection, staging_dir, chunk_size=options['chunk_size'],
+                                 workers=options['workers'], state_dir=options['state_dir'])
+            for stats in loader.load():
+                if stats.staging_file is None:
+                    self.stdout.write(f'{stats.table}: sem arquivo de staging, ignorada')
+                    continue
+                self.stdout.write(
+                    f'{stats.table}: {stats.rows_read} lidas, {stats.rows_written} gravadas '
+                    f'em {stats.seconds:.2f}s ({stats.rows_per_second:,.0f} linhas/s)'
+                )
+                if stats.rows_stale:
+                    self.stdout.write(self.style.WARNING(
+                        f'{stats.table}: {stats.rows_stale} versões anteriores à linha corrente ignoradas'
+                    ))
+        finally:
+            connection.close()
+        self.stdout.write(self.style.SUCCESS(f'Carga concluída em {target}'))
@@ -0,0 +1,58 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from modeler.graph import load_project_graph
+from modeler.loader.synth import VaultSynthesizer
+from modeler.management.utils import find_project
+
+
+def parse_change_rates(values):
+    """Converte ``--change-rate-for NOME=TAXA`` em um dicionário."""
+    rates = {}
+    for value in values or ():
+        name, _, rate = value.rpartition('=')
+        try:
+            rates[name] = float(rate)
+        except ValueError:
+            raise CommandError(f'Taxa de mudança inválida: "{value}" (use NOME=0.2).')
+    return rates
+
+
+class Command(BaseCommand):
+    help = 'Gera arquivos de staging sintéticos (CSV/JSON lines) para o modelo do projeto.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('project', help='Id ou nome do projeto')
+        parser.add_argument('output_dir', help='Diretório onde os arquivos de staging serão gravados')
+        parser.add_argument('--rows', type=int, default=100000, help='Linhas por tabela de staging')
+        parser.add_argument('--keys', type=int, default=10000, help='Chaves de negócio distintas por hub')
+        parser.add_argument('--skew', type=float, default=0.0,
+                            help='Expoente Zipf do sorteio das chaves (0 = uniforme)')
+        parser.add_argument('--change-rate', type=float, default=0.1,
+                            help='Probabilidade de um satellite mudar a cada nova linha do mesmo pai')
+        parser.add_argument('--change-rate-for', action='append', metavar='SATELLITE=TAXA',
+                            help='Taxa de mudança específica de um satellite (pode repetir)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--start', type=date.fromisoformat, default=date(2024, 1, 1),
+                            help='Primeira data de carga (AAAA-MM-DD)')
+        parser.add_argument('--days', type=int, default=30, help='Dias cobertos pelas datas de carga')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Linhas geradas e gravadas por bloco')
+
+    def handle(self, *args, **options):
+        if options['keys'] < 1 or options['rows'] < 0 or options['days'] < 1:
+            raise CommandError('--keys e --days devem ser positivos e --rows não pode ser negativo.')
+        project = find_project(options['project'])
+        synthesizer = VaultSynthesizer(
+            load_project_graph(project),
+            rows=options['rows'], keys=options['keys'], skew=options['skew'],
+            change_rate=options['change_rate'], change_rates=parse_change_rates(options['change_rate_for']),
+            seed=options['seed'], start=options['start'], days=options['days'],
+        )
+        started = time.perf_counter()
+        for path, count in synthesizer.write(options['output_dir'], options['format'], options['chunk_size']):
+            self.stdout.write(f'{path}: {count} linhas')
+        seconds = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Staging sintético gerado em {seconds:.2f}s'))
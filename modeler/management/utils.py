@@ -0,0 +1,12 @@
+from django.core.management.base import CommandError
+
+from modeler.models import Project
+
+
+def find_project(value):
+    """Busca o projeto pelo id ou pelo nome."""
+    projects = Project.objects.filter(pk=value) if value.isdigit() else Project.objects.filter(name=value)
+    project = projects.first()
+    if project is None:
+        raise CommandError(f'Projeto "{value}" não encontrado.')
+    return project
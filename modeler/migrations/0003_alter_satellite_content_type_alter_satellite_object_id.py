@@ -5,11 +5,16 @@ def forward_func(apps, schema_editor):
     Hub = apps.get_model('modeler', 'Hub')
     ContentType = apps.get_model('contenttypes', 'ContentType')
     
+    orphans = Satellite.objects.filter(content_type__isnull=True)
+    if not orphans.exists():
+        return
+    
     # Obtém o ContentType para Hub usando o modelo histórico
-    hub_ct = ContentType.objects.get(app_label='modeler', model='hub')
+    # (em bancos novos ele ainda não foi criado pelo post_migrate)
+    hub_ct, _ = ContentType.objects.get_or_create(app_label='modeler', model='hub')
     
     # Para cada Satellite sem parent, associa ao primeiro Hub do projeto
-    for satellite in Satellite.objects.filter(content_type__isnull=True):
+    for satellite in orphans:
         hub = Hub.objects.filter(project=satellite.project).first()
         if hub:
             satellite.content_type = hub_ct
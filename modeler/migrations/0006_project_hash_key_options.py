@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0005_project_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='hash_algorithm',
+            field=models.CharField(choices=[('md5', 'MD5 (128 bits)'), ('sha1', 'SHA-1 (160 bits)'), ('sha256', 'SHA-256 (256 bits)')], default='md5', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='hash_key_storage',
+            field=models.CharField(choices=[('varchar', 'Hexadecimal (VARCHAR)'), ('char', 'Hexadecimal de tamanho fixo (CHAR)'), ('binary', 'Binário (BINARY / BYTEA)')], default='varchar', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='target_dialect',
+            field=models.CharField(choices=[('ansi', 'SQL Genérico (ANSI)'), ('postgresql', 'PostgreSQL'), ('sqlserver', 'SQL Server'), ('snowflake', 'Snowflake'), ('redshift', 'Amazon Redshift')], default='ansi', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0006_project_hash_key_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='generate_indexes',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0007_project_generate_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hub',
+            name='cluster_by_hash_key',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='hub',
+            name='distribution',
+            field=models.CharField(choices=[('auto', 'Automática (padrão do banco)'), ('hash', 'Pela hash key'), ('even', 'Uniforme (round robin)'), ('all', 'Replicada em todos os nós')], default='auto', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='hub',
+            name='partition_scheme',
+            field=models.CharField(choices=[('none', 'Sem particionamento'), ('range', 'Range por load_date'), ('daily', 'Diário por load_date'), ('monthly', 'Mensal por load_date')], default='none', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='cluster_by_hash_key',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='distribution',
+            field=models.CharField(choices=[('auto', 'Automática (padrão do banco)'), ('hash', 'Pela hash key'), ('even', 'Uniforme (round robin)'), ('all', 'Replicada em todos os nós')], default='auto', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='partition_scheme',
+            field=models.CharField(choices=[('none', 'Sem particionamento'), ('range', 'Range por load_date'), ('daily', 'Diário por load_date'), ('monthly', 'Mensal por load_date')], default='none', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='satellite',
+            name='cluster_by_hash_key',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='satellite',
+            name='distribution',
+            field=models.CharField(choices=[('auto', 'Automática (padrão do banco)'), ('hash', 'Pela hash key'), ('even', 'Uniforme (round robin)'), ('all', 'Replicada em todos os nós')], default='auto', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='satellite',
+            name='partition_scheme',
+            field=models.CharField(choices=[('none', 'Sem particionamento'), ('range', 'Range por load_date'), ('daily', 'Diário por load_date'), ('monthly', 'Mensal por load_date')], default='none', max_length=10),
+        ),
+    ]
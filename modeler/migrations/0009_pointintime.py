@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('modeler', '0008_physical_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointInTime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('object_id', models.PositiveIntegerField()),
+                ('snapshot_table', models.CharField(default='AS_OF_DATE', max_length=100)),
+                ('snapshot_column', models.CharField(default='snapshot_date', max_length=100)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pits', to='modeler.project')),
+            ],
+        ),
+    ]
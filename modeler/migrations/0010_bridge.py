@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0009_pointintime'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Bridge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('snapshot_table', models.CharField(default='AS_OF_DATE', max_length=100)),
+                ('snapshot_column', models.CharField(default='snapshot_date', max_length=100)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bridges', to='modeler.project')),
+                ('start_hub', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bridges_started', to='modeler.hub')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BridgeStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('bridge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='steps', to='modeler.bridge')),
+                ('hub', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bridge_steps', to='modeler.hub')),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bridge_steps', to='modeler.link')),
+            ],
+            options={
+                'ordering': ['bridge', 'position'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0010_bridge'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hub',
+            name='staging_table',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='staging_table',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='satellite',
+            name='staging_table',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0011_staging_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='target_dialect',
+            field=models.CharField(choices=[('ansi', 'SQL Genérico (ANSI)'), ('postgresql', 'PostgreSQL'), ('sqlserver', 'SQL Server'), ('snowflake', 'Snowflake'), ('redshift', 'Amazon Redshift'), ('sqlite', 'SQLite (desenvolvimento)')], default='ansi', max_length=20),
+        ),
+    ]
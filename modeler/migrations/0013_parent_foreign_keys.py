@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0012_sqlite_dialect'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='satellite',
+            name='hub',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='satellites', to='modeler.hub'),
+        ),
+        migrations.AddField(
+            model_name='satellite',
+            name='link',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='satellites', to='modeler.link'),
+        ),
+        migrations.AddField(
+            model_name='pointintime',
+            name='hub',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pits', to='modeler.hub'),
+        ),
+        migrations.AddField(
+            model_name='pointintime',
+            name='link',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pits', to='modeler.link'),
+        ),
+    ]
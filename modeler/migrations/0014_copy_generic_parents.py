@@ -0,0 +1,79 @@
+import logging
+
+from django.db import migrations, models
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+PARENT_MODELS = ('Satellite', 'PointInTime')
+
+
+def copy_parents(apps, schema_editor):
+    """Copia content_type/object_id para as novas FKs hub/link.
+
+    Registros cujo pai não existe mais (a relação genérica não apagava em
+    cascata) são removidos, pois violariam a constraint de pai único.
+    """
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    parents = {'hub': apps.get_model('modeler', 'Hub'), 'link': apps.get_model('modeler', 'Link')}
+    content_types = dict(
+        ContentType.objects.filter(app_label='modeler', model__in=parents).values_list('model', 'id')
+    )
+    for model_name in PARENT_MODELS:
+        model = apps.get_model('modeler', model_name)
+        for kind, content_type_id in content_types.items():
+            model.objects.filter(
+                content_type_id=content_type_id,
+                object_id__in=parents[kind].objects.values('id'),
+            ).update(**{f'{kind}_id': F('object_id')})
+        orphans = model.objects.filter(hub__isnull=True, link__isnull=True)
+        count = orphans.count()
+        if count:
+            logger.warning('%s: %d registro(s) com pai inexistente removido(s)', model_name, count)
+            orphans.delete()
+
+
+def copy_back(apps, schema_editor):
+    """Preenche content_type/object_id a partir das FKs hub/link."""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    for kind in ('hub', 'link'):
+        content_type, _ = ContentType.objects.get_or_create(app_label='modeler', model=kind)
+        for model_name in PARENT_MODELS:
+            apps.get_model('modeler', model_name).objects.filter(**{f'{kind}__isnull': False}).update(
+                content_type_id=content_type.id, object_id=F(f'{kind}_id'),
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('modeler', '0013_parent_foreign_keys'),
+    ]
+
+    # Os campos genéricos ficam anuláveis antes da cópia: ao reverter, a 0015
+    # os recria vazios e copy_back os preenche antes de voltarem a ser
+    # obrigatórios
+    operations = [
+        migrations.AlterField(
+            model_name='satellite',
+            name='content_type',
+            field=models.ForeignKey(null=True, on_delete=models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AlterField(
+            model_name='satellite',
+            name='object_id',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='pointintime',
+            name='content_type',
+            field=models.ForeignKey(null=True, on_delete=models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AlterField(
+            model_name='pointintime',
+            name='object_id',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunPython(copy_parents, copy_back),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0014_copy_generic_parents'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='pointintime',
+            name='content_type',
+        ),
+        migrations.RemoveField(
+            model_name='pointintime',
+            name='object_id',
+        ),
+        migrations.RemoveField(
+            model_name='satellite',
+            name='content_type',
+        ),
+        migrations.RemoveField(
+            model_name='satellite',
+            name='object_id',
+        ),
+        migrations.AddConstraint(
+            model_name='pointintime',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('hub__isnull', False), ('link__isnull', True)), models.Q(('hub__isnull', True), ('link__isnull', False)), _connector='OR'), name='pit_single_parent'),
+        ),
+        migrations.AddConstraint(
+            model_name='satellite',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('hub__isnull', False), ('link__isnull', True)), models.Q(('hub__isnull', True), ('link__isnull', False)), _connector='OR'), name='satellite_single_parent'),
+        ),
+    ]
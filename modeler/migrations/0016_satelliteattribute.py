@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0015_remove_generic_parents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SatelliteAttribute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, max_length=100)),
+                ('tipo', models.CharField(db_index=True, max_length=20)),
+                ('length', models.PositiveIntegerField(blank=True, null=True)),
+                ('precision', models.PositiveIntegerField(blank=True, null=True)),
+                ('nullable', models.BooleanField(default=True)),
+                ('ordinal', models.PositiveIntegerField(default=0)),
+                ('satellite', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='columns', to='modeler.satellite')),
+            ],
+            options={
+                'ordering': ['satellite', 'ordinal'],
+                'constraints': [models.UniqueConstraint(fields=('satellite', 'name'), name='satellite_attribute_unique_name')],
+            },
+        ),
+    ]
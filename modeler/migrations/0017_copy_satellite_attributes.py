@@ -0,0 +1,41 @@
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def copy_attributes(apps, schema_editor):
+    """Cria uma linha do catálogo por atributo do JSON, na ordem do dicionário."""
+    Satellite = apps.get_model('modeler', 'Satellite')
+    SatelliteAttribute = apps.get_model('modeler', 'SatelliteAttribute')
+    batch = []
+    for satellite_id, attributes in Satellite.objects.values_list('id', 'attributes').iterator():
+        for ordinal, (name, tipo) in enumerate((attributes or {}).items()):
+            batch.append(SatelliteAttribute(satellite_id=satellite_id, name=name, tipo=tipo, ordinal=ordinal))
+        if len(batch) >= BATCH_SIZE:
+            SatelliteAttribute.objects.bulk_create(batch)
+            batch = []
+    SatelliteAttribute.objects.bulk_create(batch)
+
+
+def copy_back(apps, schema_editor):
+    Satellite = apps.get_model('modeler', 'Satellite')
+    SatelliteAttribute = apps.get_model('modeler', 'SatelliteAttribute')
+    attributes = {}
+    for satellite_id, name, tipo in SatelliteAttribute.objects.order_by('satellite_id', 'ordinal').values_list(
+        'satellite_id', 'name', 'tipo'
+    ):
+        attributes.setdefault(satellite_id, {})[name] = tipo
+    for satellite in Satellite.objects.filter(pk__in=attributes):
+        satellite.attributes = attributes[satellite.pk]
+        satellite.save(update_fields=['attributes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0016_satelliteattribute'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_attributes, copy_back),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0017_copy_satellite_attributes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='satellite',
+            name='attributes',
+        ),
+    ]
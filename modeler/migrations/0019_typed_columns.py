@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modeler', '0018_remove_satellite_attributes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hub',
+            name='business_key_length',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='hub',
+            name='business_key_type',
+            field=models.CharField(choices=[('string', 'String (VARCHAR)'), ('char', 'Char (tamanho fixo)'), ('smallint', 'SmallInt'), ('integer', 'Integer'), ('bigint', 'BigInt'), ('date', 'Date'), ('datetime', 'DateTime')], default='string', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='satelliteattribute',
+            name='scale',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
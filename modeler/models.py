@@ -1,53 +1,375 @@
-from django.db import models
-from django.contrib.contenttypes.fields import GenericForeignKey
-from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
 from django.utils import timezone
 
+from .cache import artifact_cache
+from .dialects import (
+    BUSINESS_KEY_TYPE_CHOICES, DIALECT_CHOICES, DISTRIBUTION_CHOICES, HASH_ALGORITHM_CHOICES, HASH_KEY_STORAGE_CHOICES,
+    PARTITION_SCHEME_CHOICES,
+)
+
 # Create your models here.
 
+class ProjectQuerySet(models.QuerySet):
+    def bump_revision(self):
+        """Incrementa atomicamente a revisão dos projetos (sem disparar signals)."""
+        return self.update(revision=models.F('revision') + 1, updated_at=timezone.now())
+
 class Project(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Incrementada a cada alteração do projeto ou de qualquer entidade filha
+    revision = models.PositiveIntegerField(default=0, editable=False)
+    # Configurações da geração de DDL
+    target_dialect = models.CharField(max_length=20, choices=DIALECT_CHOICES, default='ansi')
+    hash_algorithm = models.CharField(max_length=10, choices=HASH_ALGORITHM_CHOICES, default='md5')
+    hash_key_storage = models.CharField(max_length=10, choices=HASH_KEY_STORAGE_CHOICES, default='varchar')
+    generate_indexes = models.BooleanField(default=True)
+
+    objects = ProjectQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
-class Hub(models.Model):
+    def clone(self, name):
+        """Copia o projeto inteiro (hubs, links, satellites com atributos,
+        PITs e Bridges) com um número fixo de queries em lote.
+
+        Cada tabela é lida uma vez e inserida com ``bulk_create``; os ids
+        antigos de hubs, links, satellites e bridges são remapeados para os
+        novos nas chaves estrangeiras e na tabela de ligação ``Link.hubs``.
+        """
+        with transaction.atomic():
+            clone = Project.objects.create(
+                name=name, description=self.description, target_dialect=self.target_dialect,
+                hash_algorithm=self.hash_algorithm, hash_key_storage=self.hash_key_storage,
+                generate_indexes=self.generate_indexes,
+            )
+            hub_ids = bulk_copy(Hub.objects.filter(project=self), project_id=clone.pk)
+            link_ids = bulk_copy(Link.objects.filter(project=self), project_id=clone.pk)
+            Through = Link.hubs.through
+            # Na ordem original: a ordem das chaves dos hubs no link segue a da ligação
+            memberships = Through.objects.filter(link__project=self).order_by('id').values_list('link_id', 'hub_id')
+            Through.objects.bulk_create(
+                [Through(link_id=link_ids[link_id], hub_id=hub_ids[hub_id]) for link_id, hub_id in memberships],
+                batch_size=BULK_BATCH_SIZE,
+            )
+
+            def remap_parent(instance):
+                instance.project_id = clone.pk
+                instance.hub_id = hub_ids.get(instance.hub_id)
+                instance.link_id = link_ids.get(instance.link_id)
+
+            satellite_ids = bulk_copy(Satellite.objects.filter(project=self), remap_parent)
+            bulk_copy(
+                SatelliteAttribute.objects.filter(satellite__project=self),
+                lambda column: setattr(column, 'satellite_id', satellite_ids[column.satellite_id]),
+            )
+            bulk_copy(PointInTime.objects.filter(project=self), remap_parent)
+            bridge_ids = bulk_copy(
+                Bridge.objects.filter(project=self),
+                lambda bridge: setattr(bridge, 'start_hub_id', hub_ids[bridge.start_hub_id]),
+                project_id=clone.pk,
+            )
+
+            def remap_step(step):
+                step.bridge_id = bridge_ids[step.bridge_id]
+                step.link_id = link_ids[step.link_id]
+                step.hub_id = hub_ids[step.hub_id]
+
+            bulk_copy(BridgeStep.objects.filter(bridge__project=self), remap_step)
+            # As inserções em lote não disparam signals
+            Project.objects.filter(pk=clone.pk).bump_revision()
+        artifact_cache.invalidate(clone.pk)
+        clone.refresh_from_db(fields=['revision', 'updated_at'])
+        return clone
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or kwargs.get('update_fields') is not None:
+            super().save(*args, **kwargs)
+            return
+        # Incrementa no banco para não sobrescrever revisões concorrentes
+        self.revision = models.F('revision') + 1
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['revision'])
+
+# Linhas por INSERT nas cópias em lote
+BULK_BATCH_SIZE = 2000
+
+def bulk_copy(queryset, remap=None, **values):
+    """Copia as linhas do queryset com ``bulk_create`` e retorna {id antigo: id novo}.
+
+    ``remap`` ajusta cada cópia (chaves estrangeiras) e ``values`` define
+    campos comuns a todas. Quando o banco não devolve os ids inseridos,
+    eles são relidos na ordem de inserção.
+    """
+    model = queryset.model
+    rows = list(queryset.order_by('pk'))
+    old_ids = [row.pk for row in rows]
+    for row in rows:
+        row.pk = None
+        row._state.adding = True
+        for field, value in values.items():
+            setattr(row, field, value)
+        if remap is not None:
+            remap(row)
+    model.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE)
+    if rows and rows[0].pk is None:
+        new_ids = model.objects.order_by('-pk').values_list('pk', flat=True)[:len(rows)]
+        return dict(zip(old_ids, reversed(list(new_ids))))
+    return dict(zip(old_ids, (row.pk for row in rows)))
+
+class PhysicalOptions(models.Model):
+    """Opções de desenho físico das tabelas geradas, renderizadas por dialeto."""
+    partition_scheme = models.CharField(max_length=10, choices=PARTITION_SCHEME_CHOICES, default='none')
+    cluster_by_hash_key = models.BooleanField(default=False)
+    distribution = models.CharField(max_length=10, choices=DISTRIBUTION_CHOICES, default='auto')
+
+    class Meta:
+        abstract = True
+
+class Hub(PhysicalOptions):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='hubs')
     name = models.CharField(max_length=100)
     business_key = models.CharField(max_length=100)
+    # Tipo da coluna da chave de negócio (vazio = tamanho padrão)
+    business_key_type = models.CharField(max_length=20, choices=BUSINESS_KEY_TYPE_CHOICES, default='string')
+    business_key_length = models.PositiveIntegerField(null=True, blank=True)
     load_date = models.CharField(max_length=100, default='load_date')
     record_source = models.CharField(max_length=100, default='record_source')
+    # Tabela de staging de origem da carga (vazio = STG_<nome>)
+    staging_table = models.CharField(max_length=100, blank=True)
 
     def __str__(self):
         return self.name
 
-class Link(models.Model):
+class Link(PhysicalOptions):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='links')
     name = models.CharField(max_length=100)
     hubs = models.ManyToManyField(Hub, related_name='links')
     load_date = models.CharField(max_length=100, default='load_date')
     record_source = models.CharField(max_length=100, default='record_source')
+    # Tabela de staging de origem da carga (vazio = STG_<nome>)
+    staging_table = models.CharField(max_length=100, blank=True)
 
     def __str__(self):
         return self.name
 
-class Satellite(models.Model):
+def single_parent_constraint(name):
+    """Exige exatamente um pai: o Hub ou o Link."""
+    return models.CheckConstraint(
+        condition=(
+            models.Q(hub__isnull=False, link__isnull=True)
+            | models.Q(hub__isnull=True, link__isnull=False)
+        ),
+        name=name,
+    )
+
+class HubOrLinkChild:
+    """Acesso ao pai (Hub ou Link) de satellites e PITs.
+
+    O pai é identificado nos formulários como '<hub|link>-<id>'.
+    """
+
+    @property
+    def parent_kind(self):
+        if self.hub_id is not None:
+            return 'hub'
+        if self.link_id is not None:
+            return 'link'
+        return None
+
+    @property
+    def parent(self):
+        kind = self.parent_kind
+        return getattr(self, kind) if kind else None
+
+    @property
+    def parent_value(self):
+        kind = self.parent_kind
+        return f'{kind}-{self.hub_id if kind == "hub" else self.link_id}' if kind else ''
+
+    def set_parent_value(self, value):
+        kind, object_id = value.split('-')
+        self.hub_id = int(object_id) if kind == 'hub' else None
+        self.link_id = int(object_id) if kind == 'link' else None
+
+class Satellite(HubOrLinkChild, PhysicalOptions):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='satellites')
     name = models.CharField(max_length=100)
-    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
-    object_id = models.PositiveIntegerField()
-    parent_object = GenericForeignKey('content_type', 'object_id')
-    attributes = models.JSONField(default=dict)
+    # Pai do satellite: exatamente um dos dois (ver constraint)
+    hub = models.ForeignKey(Hub, on_delete=models.CASCADE, null=True, blank=True, related_name='satellites')
+    link = models.ForeignKey(Link, on_delete=models.CASCADE, null=True, blank=True, related_name='satellites')
     load_date = models.CharField(max_length=100, default='load_date')
     record_source = models.CharField(max_length=100, default='record_source')
+    # Tabela de staging de origem da carga (vazio = STG_<nome>)
+    staging_table = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        constraints = [single_parent_constraint('satellite_single_parent')]
 
     def __str__(self):
         return self.name
 
+    @property
+    def attributes(self):
+        """Atributos do catálogo como {nome: tipo}, na ordem das colunas.
+
+        Usa os ``columns`` pré-carregados (prefetch_related) quando houver.
+        """
+        pending = getattr(self, '_pending_attributes', None)
+        if pending is not None:
+            return dict(pending)
+        return {column.name: column.tipo for column in self.columns.all()}
+
+    @attributes.setter
+    def attributes(self, value):
+        # Gravado no catálogo ao salvar o satellite
+        self._pending_attributes = dict(value)
+
     def save(self, *args, **kwargs):
-        if not self.content_type or not self.object_id:
+        if self.parent_kind is None:
             raise ValueError("Satellite precisa ter um Hub ou Link pai definido.")
         super().save(*args, **kwargs)
+        pending = getattr(self, '_pending_attributes', None)
+        if pending is not None:
+            self._pending_attributes = None
+            self.set_columns([{'name': name, 'tipo': tipo} for name, tipo in pending.items()])
+
+    def set_columns(self, columns):
+        """Substitui o catálogo de atributos pela lista de dicts ``columns``
+        (name, tipo e, opcionalmente, length, precision, scale e nullable).
+
+        Atributos mantidos são atualizados em lote (preservando os campos não
+        informados), os novos são criados em lote e os ausentes removidos.
+        Como as operações em lote não disparam signals, a revisão do projeto
+        é incrementada aqui.
+        """
+        with transaction.atomic():
+            existing = {column.name: column for column in self.columns.all()}
+            to_create, to_update = [], []
+            for ordinal, data in enumerate(columns):
+                column = existing.pop(data['name'], None)
+                if column is None:
+                    column = SatelliteAttribute(satellite=self, name=data['name'])
+                    to_create.append(column)
+                else:
+                    to_update.append(column)
+                column.ordinal = ordinal
+                for field in ('tipo', 'length', 'precision', 'scale', 'nullable'):
+                    if field in data:
+                        setattr(column, field, data[field])
+            if existing:
+                SatelliteAttribute.objects.filter(pk__in=[column.pk for column in existing.values()]).delete()
+            SatelliteAttribute.objects.bulk_update(
+                to_update, ['ordinal', 'tipo', 'length', 'precision', 'scale', 'nullable']
+            )
+            SatelliteAttribute.objects.bulk_create(to_create)
+            Project.objects.filter(pk=self.project_id).bump_revision()
+        artifact_cache.invalidate(self.project_id)
+        # Descarta o prefetch antigo
+        getattr(self, '_prefetched_objects_cache', {}).pop('columns', None)
+
+    def split(self, groups):
+        """Divide o satellite em novos satellites sob o mesmo pai.
+
+        ``groups`` é uma lista de pares ``(nome, [atributos])`` que deve cobrir
+        todos os atributos; cada novo satellite herda as colunas de controle,
+        a staging e as opções físicas, e o original é removido.
+        """
+        columns = {
+            column.name: {
+                'name': column.name, 'tipo': column.tipo, 'length': column.length,
+                'precision': column.precision, 'scale': column.scale, 'nullable': column.nullable,
+            }
+            for column in self.columns.all()
+        }
+        created = []
+        with transaction.atomic():
+            for name, attributes in groups:
+                satellite = Satellite(
+                    project_id=self.project_id, name=name, hub_id=self.hub_id, link_id=self.link_id,
+                    load_date=self.load_date, record_source=self.record_source,
+                    staging_table=self.staging_table, partition_scheme=self.partition_scheme,
+                    cluster_by_hash_key=self.cluster_by_hash_key, distribution=self.distribution,
+                )
+                satellite.save()
+                satellite.set_columns([columns[attribute] for attribute in attributes])
+                created.append(satellite)
+            self.delete()
+        return created
+
+class SatelliteAttribute(models.Model):
+    """Coluna descritiva de um Satellite."""
+    satellite = models.ForeignKey(Satellite, on_delete=models.CASCADE, related_name='columns')
+    name = models.CharField(max_length=100, db_index=True)
+    tipo = models.CharField(max_length=20, db_index=True)
+    # Tamanho de string/char e precisão/escala de decimal (vazio = padrão do tipo)
+    length = models.PositiveIntegerField(null=True, blank=True)
+    precision = models.PositiveIntegerField(null=True, blank=True)
+    scale = models.PositiveIntegerField(null=True, blank=True)
+    nullable = models.BooleanField(default=True)
+    ordinal = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['satellite', 'ordinal']
+        constraints = [
+            models.UniqueConstraint(fields=['satellite', 'name'], name='satellite_attribute_unique_name'),
+        ]
+
+    def __str__(self):
+        return f'{self.satellite.name}.{self.name}'
+
+    def sql_type(self, dialect):
+        """Tipo SQL da coluna no dialeto informado."""
+        return dialect.column_type(self.tipo, self.length, self.precision, self.scale)
+
+class PointInTime(HubOrLinkChild, models.Model):
+    """Tabela PIT de um Hub ou Link: guarda, para cada data do calendário de
+    snapshots, o load_date vigente de cada satellite do pai."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='pits')
+    name = models.CharField(max_length=100)
+    hub = models.ForeignKey(Hub, on_delete=models.CASCADE, null=True, blank=True, related_name='pits')
+    link = models.ForeignKey(Link, on_delete=models.CASCADE, null=True, blank=True, related_name='pits')
+    snapshot_table = models.CharField(max_length=100, default='AS_OF_DATE')
+    snapshot_column = models.CharField(max_length=100, default='snapshot_date')
+
+    class Meta:
+        constraints = [single_parent_constraint('pit_single_parent')]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if self.parent_kind is None:
+            raise ValueError("PIT precisa ter um Hub ou Link pai definido.")
+        super().save(*args, **kwargs)
+
+class Bridge(models.Model):
+    """Tabela Bridge sobre um caminho hub -> link -> hub -> ... no grafo de links.
+
+    Guarda, para cada data do calendário de snapshots, as hash keys de todos
+    os hubs e links do caminho já combinadas.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='bridges')
+    name = models.CharField(max_length=100)
+    start_hub = models.ForeignKey(Hub, on_delete=models.CASCADE, related_name='bridges_started')
+    snapshot_table = models.CharField(max_length=100, default='AS_OF_DATE')
+    snapshot_column = models.CharField(max_length=100, default='snapshot_date')
+
+    def __str__(self):
+        return self.name
+
+class BridgeStep(models.Model):
+    """Um passo do caminho da Bridge: o link percorrido e o hub alcançado."""
+    bridge = models.ForeignKey(Bridge, on_delete=models.CASCADE, related_name='steps')
+    position = models.PositiveIntegerField()
+    link = models.ForeignKey(Link, on_delete=models.CASCADE, related_name='bridge_steps')
+    hub = models.ForeignKey(Hub, on_delete=models.CASCADE, related_name='bridge_steps')
+
+    class Meta:
+        ordering = ['bridge', 'position']
+
+    def __str__(self):
+        return f'{self.bridge.name} #{self.position}'
@@ -0,0 +1,225 @@
+import hashlib
+import math
+import re
+from datetime import date, datetime
+
+from .dialects import DEFAULT_LENGTH, MAX_PRECISION
+from .loader.readers import iter_upload_records
+
+# Faixas dos inteiros, do mais estreito ao mais largo
+INTEGER_RANGES = [
+    ('smallint', -2 ** 15, 2 ** 15 - 1),
+    ('integer', -2 ** 31, 2 ** 31 - 1),
+    ('bigint', -2 ** 63, 2 ** 63 - 1),
+]
+# Folga aplicada ao que a amostra mostrou: inteiros precisam caber com o
+# dobro do maior valor absoluto; strings ganham 20% no tamanho
+INTEGER_HEADROOM = 2
+LENGTH_HEADROOM = 1.2
+
+BOOLEAN_VALUES = {'true', 'false'}
+NUMBER_RE = re.compile(r'[+-]?(\d*)(?:\.(\d+))?')
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+class HyperLogLog:
+    """Estimativa do número de valores distintos em memória fixa.
+
+    Usa ``2 ** precision`` registradores de um byte (4 KB com o padrão 12,
+    erro típico de ~1,6%).
+    """
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+
+    def add(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        # Posição do primeiro bit 1 nos bits restantes
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def __len__(self):
+        size = self.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        # Correção para cardinalidades pequenas (linear counting)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+
+class ColumnProfile:
+    """Estatísticas de uma coluna acumuladas valor a valor.
+
+    Mantém apenas contadores, extremos e um HyperLogLog; os tipos candidatos
+    (boolean, inteiro, decimal, data, data e hora) são descartados à medida
+    que aparece um valor incompatível.
+    """
+
+    def __init__(self, name, hll_precision=12):
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.min_length = None
+        self.max_length = 0
+        self.min_value = None
+        self.max_value = None
+        self.max_digits = 0
+        self.max_scale = 0
+        self.kinds = {'boolean', 'integer', 'decimal', 'date', 'datetime'}
+        self.distinct = HyperLogLog(hll_precision)
+
+    def add(self, value):
+        self.count += 1
+        if value is None or value == '':
+            self.nulls += 1
+            return
+        if isinstance(value, bool):
+            text = 'true' if value else 'false'
+        else:
+            text = str(value).strip()
+        length = len(text)
+        self.max_length = max(self.max_length, length)
+        self.min_length = length if self.min_length is None else min(self.min_length, length)
+        self.distinct.add(text)
+        if self.kinds:
+            self.classify(text)
+
+    def classify(self, text):
+        kinds = self.kinds
+        if 'boolean' in kinds and text.lower() not in BOOLEAN_VALUES:
+            kinds.discard('boolean')
+        if 'integer' in kinds or 'decimal' in kinds:
+            match = NUMBER_RE.fullmatch(text)
+            digits, fraction = match.groups() if match else (None, None)
+            # Zeros à esquerda indicam código, não número
+            if not match or not (digits or fraction) or (len(digits) > 1 and digits[0] == '0'):
+                kinds.discard('integer')
+                kinds.discard('decimal')
+            else:
+                self.max_digits = max(self.max_digits, len(digits.lstrip('0')))
+                if fraction:
+                    kinds.discard('integer')
+                    self.max_scale = max(self.max_scale, len(fraction))
+                if 'integer' in kinds:
+                    number = int(text)
+                    self.min_value = number if self.min_value is None else min(self.min_value, number)
+                    self.max_value = number if self.max_value is None else max(self.max_value, number)
+        if 'date' in kinds or 'datetime' in kinds:
+            parsed = None
+            if DATE_RE.match(text):
+                try:
+                    parsed = datetime.fromisoformat(text) if len(text) > 10 else date.fromisoformat(text)
+                except ValueError:
+                    pass
+            if not isinstance(parsed, date) or isinstance(parsed, datetime):
+                kinds.discard('date')
+            if not isinstance(parsed, date):
+                kinds.discard('datetime')
+
+    @property
+    def null_ratio(self):
+        return self.nulls / self.count if self.count else 0.0
+
+    @property
+    def distinct_estimate(self):
+        return len(self.distinct)
+
+    def business_key_suggestion(self):
+        """Tipo e tamanho sugeridos para a coluna como chave de negócio."""
+        column = self.suggestion()
+        if column['tipo'] in ('decimal', 'boolean'):
+            column.update(tipo='string', length=suggested_length(self.max_length))
+        return column['tipo'], column['length']
+
+    def suggestion(self):
+        """Tipo mais estreito compatível com a amostra, no formato do formset
+        de atributos (name, tipo, length, precision, scale, not_null)."""
+        column = {'name': self.name, 'tipo': 'string', 'length': None, 'precision': None,
+                  'scale': None, 'not_null': False}
+        if self.count == self.nulls:
+            return column
+        kinds = self.kinds
+        if 'boolean' in kinds:
+            column['tipo'] = 'boolean'
+        elif 'integer' in kinds:
+            extreme = max(abs(self.min_value), abs(self.max_value)) * INTEGER_HEADROOM
+            for tipo, low, high in INTEGER_RANGES:
+                if low <= -extreme and extreme <= high:
+                    column['tipo'] = tipo
+                    break
+            else:
+                column.update(tipo='decimal', precision=min(self.max_digits + 1, MAX_PRECISION), scale=0)
+        elif 'decimal' in kinds and self.max_digits + 1 + self.max_scale <= MAX_PRECISION:
+            column.update(tipo='decimal', precision=self.max_digits + 1 + self.max_scale, scale=self.max_scale)
+        elif 'date' in kinds:
+            column['tipo'] = 'date'
+        elif 'datetime' in kinds:
+            column['tipo'] = 'datetime'
+        elif self.min_length == self.max_length:
+            column.update(tipo='char', length=self.max_length)
+        else:
+            column['length'] = suggested_length(self.max_length)
+        return column
+
+
+def suggested_length(max_length):
+    """Tamanho de VARCHAR com folga, arredondado para múltiplo de 10."""
+    if not max_length:
+        return DEFAULT_LENGTH
+    return int(math.ceil(max_length * LENGTH_HEADROOM / 10) * 10)
+
+
+class SampleProfile:
+    """Perfil de um arquivo de amostra, coluna a coluna, em uma única passada."""
+
+    def __init__(self, hll_precision=12):
+        self.hll_precision = hll_precision
+        self.rows = 0
+        self.columns = {}
+
+    def add(self, record):
+        self.rows += 1
+        for name, value in record.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = ColumnProfile(name, self.hll_precision)
+                # Linhas anteriores em que a coluna não apareceu contam como nulas
+                column.count = column.nulls = self.rows - 1
+            column.add(value)
+        # Colunas ausentes do registro contam como nulas
+        for column in self.columns.values():
+            if column.count < self.rows:
+                column.add(None)
+
+    def suggestions(self, exclude=()):
+        """Sugestões de atributos para as colunas que não estão em ``exclude``."""
+        return [column.suggestion() for name, column in self.columns.items() if name not in exclude]
+
+
+def profile_records(records, max_rows=None, hll_precision=12):
+    """Perfila um iterável de registros (dicts), lendo no máximo ``max_rows``."""
+    profile = SampleProfile(hll_precision)
+    for record in records:
+        if max_rows is not None and profile.rows >= max_rows:
+            break
+        if not isinstance(record, dict):
+            raise ValueError('Cada linha do arquivo deve ser um objeto JSON.')
+        profile.add(record)
+    return profile
+
+
+def profile_upload(upload, max_rows=None):
+    """Perfila um arquivo enviado (CSV ou JSON lines) sem salvá-lo."""
+    records = iter_upload_records(upload)
+    try:
+        return profile_records(records, max_rows)
+    finally:
+        records.close()
@@ -0,0 +1,50 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import artifact_cache
+from .models import Hub, Link, Satellite, Project, PointInTime, Bridge, BridgeStep
+
+
+def project_changed(project_id):
+    """Registra uma alteração no conteúdo do projeto."""
+    Project.objects.filter(pk=project_id).bump_revision()
+    artifact_cache.invalidate(project_id)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project(sender, instance, **kwargs):
+    """Descarta os artefatos quando o próprio projeto muda (a revisão é
+    incrementada em Project.save)."""
+    artifact_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Hub)
+@receiver(post_delete, sender=Hub)
+@receiver(post_save, sender=Link)
+@receiver(post_delete, sender=Link)
+@receiver(post_save, sender=Satellite)
+@receiver(post_delete, sender=Satellite)
+@receiver(post_save, sender=PointInTime)
+@receiver(post_delete, sender=PointInTime)
+@receiver(post_save, sender=Bridge)
+@receiver(post_delete, sender=Bridge)
+def entity_changed(sender, instance, **kwargs):
+    """Incrementa a revisão do projeto quando um Hub, Link, Satellite, PIT ou Bridge muda."""
+    project_changed(instance.project_id)
+
+
+@receiver(post_save, sender=BridgeStep)
+@receiver(post_delete, sender=BridgeStep)
+def bridge_step_changed(sender, instance, **kwargs):
+    """Incrementa a revisão quando o caminho de uma Bridge muda."""
+    project_id = Bridge.objects.filter(pk=instance.bridge_id).values_list('project_id', flat=True).first()
+    if project_id is not None:
+        project_changed(project_id)
+
+
+@receiver(m2m_changed, sender=Link.hubs.through)
+def link_hubs_changed(sender, instance, action, **kwargs):
+    """Incrementa a revisão quando os hubs de um link mudam (em qualquer sentido)."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        project_changed(instance.project_id)
@@ -0,0 +1,249 @@
+"""Recomenda a divisão de satellites largos pela taxa de mudança dos atributos."""
+import hashlib
+from collections import Counter
+from itertools import combinations
+
+from .dialects import HASH_ALGORITHMS
+from .hashing import normalize
+
+# Bytes estimados das colunas de controle de uma linha de satellite, além
+# da hash key e do HK_DIFF: valid_from, valid_to, load_date, is_current e
+# record_source
+CONTROL_COLUMNS_BYTES = 3 * 8 + 1 + 16
+# Economia mínima (fração dos bytes atuais) para recomendar a divisão
+MIN_SAVINGS = 0.05
+# Nomes dos grupos, do que muda menos para o que muda mais
+GROUP_LABELS = {
+    2: ('Lento', 'Rápido'),
+    3: ('Estável', 'Lento', 'Rápido'),
+}
+
+
+def digest(value):
+    """Impressão digital de 8 bytes de um valor normalizado como no HK_DIFF."""
+    return hashlib.blake2b(normalize(value).encode('utf-8'), digest_size=8).digest()
+
+
+def business_keys_of(satellite):
+    """Chaves de negócio do pai do satellite (a do hub ou as dos hubs do link)."""
+    if satellite.hub_id is not None:
+        return [satellite.hub.business_key]
+    return list(satellite.link.hubs.order_by('id').values_list('business_key', flat=True))
+
+
+class ChangeRateAnalyzer:
+    """Mede, snapshot a snapshot, com que frequência cada atributo muda.
+
+    Para cada chave guarda apenas a impressão digital de 8 bytes de cada
+    atributo no último snapshot visto. Cada transição (chave nova ou
+    alterada) é registrada pela máscara de bits dos atributos que mudaram,
+    o que permite calcular depois, para qualquer agrupamento, quantas
+    linhas cada satellite resultante receberia.
+    """
+
+    def __init__(self, key_columns, attributes):
+        self.key_columns = list(key_columns)
+        self.attributes = list(attributes)
+        self.all_mask = (1 << len(self.attributes)) - 1
+        self.state = {}
+        self.snapshots = 0
+        self.records = 0
+        # Chaves vistas em dois snapshots seguidos (denominador das taxas)
+        self.comparisons = 0
+        self.changes = [0] * len(self.attributes)
+        self.masks = Counter()
+        self.widths = [0] * len(self.attributes)
+
+    def add_snapshot(self, records):
+        """Compara um snapshot (iterável de dicts) com o anterior."""
+        current = {}
+        for record in records:
+            if not isinstance(record, dict):
+                raise ValueError('Cada linha do arquivo deve ser um objeto JSON.')
+            missing = [column for column in self.key_columns if record.get(column) is None]
+            if missing:
+                raise ValueError(f'Linha sem a chave de negócio {", ".join(missing)}.')
+            self.records += 1
+            key = digest('|'.join(normalize(record.get(column)) for column in self.key_columns))
+            values = [record.get(attribute) for attribute in self.attributes]
+            for position, value in enumerate(values):
+                if value is not None:
+                    self.widths[position] += len(str(value))
+            # Chave repetida no mesmo snapshot: vale a última linha
+            current[key] = b''.join(digest(value) for value in values)
+        for key, digests in current.items():
+            previous = self.state.get(key)
+            if previous is None:
+                self.masks[self.all_mask] += 1
+                continue
+            self.comparisons += 1
+            mask = 0
+            for position in range(len(self.attributes)):
+                start = position * 8
+                if digests[start:start + 8] != previous[start:start + 8]:
+                    mask |= 1 << position
+                    self.changes[position] += 1
+            if mask:
+                self.masks[mask] += 1
+        self.state.update(current)
+        self.snapshots += 1
+
+    def change_rates(self):
+        """Fração das comparações em que cada atributo mudou."""
+        return {
+            attribute: (self.changes[position] / self.comparisons if self.comparisons else 0.0)
+            for position, attribute in enumerate(self.attributes)
+        }
+
+    def average_widths(self):
+        """Tamanho médio (em caracteres) de cada atributo."""
+        return {
+            attribute: (self.widths[position] / self.records if self.records else 0.0)
+            for position, attribute in enumerate(self.attributes)
+        }
+
+    def rows_for(self, mask):
+        """Linhas que um satellite com os atributos de ``mask`` receberia."""
+        return sum(count for changed, count in self.masks.items() if changed & mask)
+
+
+class SplitAdvice:
+    """Resultado da análise: grupos recomendados e estimativas de linhas e bytes."""
+
+    def __init__(self, analyzer, groups, row_overhead):
+        self.analyzer = analyzer
+        self.rates = analyzer.change_rates()
+        self.widths = analyzer.average_widths()
+        self.row_overhead = row_overhead
+        self.current_rows, self.current_bytes = self.estimate([analyzer.attributes])[0]
+        self.groups = []
+        estimates = self.estimate(groups)
+        labels = GROUP_LABELS.get(len(groups), ())
+        for position, (attributes, (rows, size)) in enumerate(zip(groups, estimates)):
+            self.groups.append({
+                'label': labels[position] if position < len(labels) else str(position + 1),
+                'attributes': attributes,
+                'rate': max(self.rates[attribute] for attribute in attributes),
+                'rows': rows,
+                'bytes': size,
+            })
+        self.split_rows = sum(group['rows'] for group in self.groups)
+        self.split_bytes = sum(group['bytes'] for group in self.groups)
+
+    def estimate(self, groups):
+        """(linhas, bytes) de cada grupo de atributos."""
+        positions = {attribute: position for position, attribute in enumerate(self.analyzer.attributes)}
+        estimates = []
+        for attributes in groups:
+            mask = 0
+            for attribute in attributes:
+                mask |= 1 << positions[attribute]
+            rows = self.analyzer.rows_for(mask)
+            width = self.row_overhead + sum(self.widths[attribute] for attribute in attributes)
+            estimates.append((rows, round(rows * width)))
+        return estimates
+
+    @property
+    def columns(self):
+        """Atributos com taxa de mudança, tamanho médio e grupo, do mais estável ao mais volátil."""
+        return [
+            {'name': attribute, 'rate': self.rates[attribute], 'width': self.widths[attribute],
+             'group': group['label']}
+            for group in self.groups
+            for attribute in group['attributes']
+        ]
+
+    @property
+    def recommended(self):
+        return len(self.groups) > 1
+
+    @property
+    def saved_bytes(self):
+        return self.current_bytes - self.split_bytes
+
+    @property
+    def savings(self):
+        return self.saved_bytes / self.current_bytes if self.current_bytes else 0.0
+
+
+def row_overhead(project):
+    """Bytes fixos de uma linha de satellite: hash key, HK_DIFF e controle."""
+    digest_size = HASH_ALGORITHMS[project.hash_algorithm]
+    hash_bytes = digest_size if project.hash_key_storage == 'binary' else digest_size * 2
+    return 2 * hash_bytes + CONTROL_COLUMNS_BYTES
+
+
+def range_costs(analyzer, ordered, overhead):
+    """Bytes estimados de cada grupo contíguo ``ordered[start:end]``.
+
+    Uma máscara de mudanças entra nas linhas de um grupo se muda algum dos
+    seus atributos, isto é, se o primeiro atributo alterado a partir de
+    ``start`` fica antes de ``end``. Registrando esse primeiro atributo por
+    máscara e início e somando cumulativamente, todos os grupos saem em
+    O(máscaras × n + n²), sem varrer as máscaras a cada partição avaliada.
+    """
+    count = len(ordered)
+    positions = {attribute: position for position, attribute in enumerate(analyzer.attributes)}
+    bits = [positions[attribute] for attribute in ordered]
+    # first_changed[start][index]: transições cujo primeiro atributo alterado
+    # a partir de ``start`` é ``ordered[index]``
+    first_changed = [[0] * count for _ in range(count)]
+    for mask, transitions in analyzer.masks.items():
+        changed = [index for index, bit in enumerate(bits) if mask >> bit & 1]
+        pointer = 0
+        for start in range(count):
+            while pointer < len(changed) and changed[pointer] < start:
+                pointer += 1
+            if pointer == len(changed):
+                break
+            first_changed[start][changed[pointer]] += transitions
+
+    widths = analyzer.average_widths()
+    costs = {}
+    for start in range(count):
+        rows, width = 0, overhead
+        for end in range(start + 1, count + 1):
+            rows += first_changed[start][end - 1]
+            width += widths[ordered[end - 1]]
+            costs[start, end] = round(rows * width)
+    return costs
+
+
+def recommend_split(analyzer, overhead, max_groups=3, min_savings=MIN_SAVINGS):
+    """Escolhe a divisão dos atributos que minimiza os bytes estimados.
+
+    Os atributos são ordenados pela taxa de mudança e todas as partições
+    contíguas em até ``max_groups`` grupos são avaliadas (cada grupo paga o
+    custo fixo de uma linha), com os custos dos grupos calculados uma única
+    vez por ``range_costs``. Sem ganho de ao menos ``min_savings`` o
+    satellite fica como está.
+    """
+    rates = analyzer.change_rates()
+    positions = {attribute: position for position, attribute in enumerate(analyzer.attributes)}
+    ordered = sorted(analyzer.attributes, key=lambda attribute: (rates[attribute], positions[attribute]))
+    costs = range_costs(analyzer, ordered, overhead)
+    count = len(ordered)
+    best_bounds, best_bytes = (0, count), costs.get((0, count), 0)
+    for groups_count in range(2, min(max_groups, count) + 1):
+        for cuts in combinations(range(1, count), groups_count - 1):
+            bounds = (0,) + cuts + (count,)
+            size = sum(costs[start, end] for start, end in zip(bounds, bounds[1:]))
+            if size < best_bytes:
+                best_bounds, best_bytes = bounds, size
+    best = SplitAdvice(analyzer, [ordered[start:end] for start, end in zip(best_bounds, best_bounds[1:])], overhead)
+    if best.recommended and best.saved_bytes < best.current_bytes * min_savings:
+        return SplitAdvice(analyzer, [ordered], overhead)
+    return best
+
+
+def group_names(satellite, advice, taken=()):
+    """Nomes dos satellites resultantes (``<nome> <grupo>``), sem repetir ``taken``."""
+    names = []
+    for group in advice.groups:
+        base = name = f'{satellite.name} {group["label"]}'
+        suffix = 2
+        while name in taken or name in names:
+            name = f'{base} {suffix}'
+            suffix += 1
+        names.append(name)
+    return names
@@ -1,3 +1,1393 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import io
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .benchmarks import BENCHMARK_VIEWS, METRICS, compare_results, create_synthetic_project, measure, run_benchmarks
+from .cache import ArtifactCache, artifact_cache
+from .ddl import build_ddl
+from .graph import load_project_graph
+from .deletion import DeleteImpact
+from .dialects import get_dialect
+from .forms import AttributeForm, bridge_path_errors
+from .hashing import BatchHasher, hash_batch, hash_values
+from .loader import CurrentStateIndex, VaultLoader
+from .loader.state import DATE_SIZE
+from .profiling import HyperLogLog, profile_records
+from .importer import ModelImportError, import_model
+from .split_advisor import ChangeRateAnalyzer, SplitAdvice, range_costs, recommend_split
+from .load_sql import bridge_population_sql, build_load_sql, pit_population_sql
+from .models import Hub, Link, Satellite, SatelliteAttribute, Project, PointInTime, Bridge, BridgeStep
+
+
+def build_project(name='Vendas', hubs=3, satellites_per_hub=2):
+    """Cria um projeto com hubs encadeados por links e satellites em hubs e links."""
+    project = Project.objects.create(name=name)
+    created_hubs = [
+        Hub.objects.create(project=project, name=f'Hub {i}', business_key=f'bk_{i}')
+        for i in range(hubs)
+    ]
+    for i in range(hubs - 1):
+        link = Link.objects.create(project=project, name=f'Link {i}')
+        link.hubs.set([created_hubs[i], created_hubs[i + 1]])
+        Satellite.objects.create(
+            project=project, name=f'Sat Link {i}', link=link, attributes={'valor': 'float'},
+        )
+    for hub in created_hubs:
+        for j in range(satellites_per_hub):
+            Satellite.objects.create(
+                project=project, name=f'Sat {hub.name} {j}', hub=hub,
+                attributes={'nome': 'string', 'ativo': 'boolean'},
+            )
+    return project
+
+
+def build_reference_project(hubs):
+    """``build_project`` com um PIT e uma Bridge no primeiro link."""
+    project = build_project(name=f'Referência {hubs}', hubs=hubs)
+    hub_list = list(Hub.objects.filter(project=project).order_by('id'))
+    link = Link.objects.filter(project=project).order_by('id').first()
+    PointInTime.objects.create(project=project, name='PIT Link', link=link)
+    bridge = Bridge.objects.create(project=project, name='Cadeia', start_hub=hub_list[0])
+    BridgeStep.objects.create(bridge=bridge, position=0, link=link, hub=hub_list[1])
+    return project
+
+
+class ConstantQueriesMixin:
+    """Verifica que uma operação faz o mesmo número de queries em projetos de tamanhos diferentes."""
+
+    def assertConstantQueries(self, sizes, action, build=None, expected=None):
+        """Roda ``action(build(size))`` para cada tamanho, contando as queries
+        só da ação; com ``expected`` o número também é conferido. Retorna o
+        último contexto montado e o resultado da ação sobre ele."""
+        counts = []
+        for size in sizes:
+            context = build(size) if build else size
+            with CaptureQueriesContext(connection) as queries:
+                result = action(context)
+            counts.append(len(queries))
+        self.assertEqual(len(set(counts)), 1, f'Queries por tamanho: {counts}')
+        if expected is not None:
+            self.assertEqual(counts[0], expected)
+        return context, result
+
+
+class ProjectGraphTests(ConstantQueriesMixin, TestCase):
+    def setUp(self):
+        artifact_cache.clear()
+
+    def test_graph_indexes_entities_and_adjacency(self):
+        project = build_project(hubs=3, satellites_per_hub=1)
+        graph = load_project_graph(project)
+
+        self.assertEqual(len(graph.hubs), 3)
+        self.assertEqual(len(graph.links), 2)
+        self.assertEqual(len(graph.satellites), 5)
+        first_link = next(iter(graph.links.values()))
+        self.assertEqual([hub.name for hub in graph.hubs_of(first_link)], ['Hub 0', 'Hub 1'])
+        for satellite in graph.satellites.values():
+            kind, parent = graph.parent_of(satellite)
+            self.assertIn(kind, ('hub', 'link'))
+            self.assertIsNotNone(parent)
+
+    def test_query_count_is_constant_in_project_size(self):
+        small = build_project(name='Pequeno', hubs=2, satellites_per_hub=1)
+        large = build_project(name='Grande', hubs=12, satellites_per_hub=5)
+
+        # 1 query para o projeto + 7 para o grafo (+1 para o índice de
+        # satellites quando o download os lê em blocos, +1 para o COUNT que
+        # decide se o diagrama completo cabe)
+        expected = {'visualize': 10, 'view_ddl': 9, 'generate_ddl': 10, 'view_load_sql': 9}
+        for url_name, queries in expected.items():
+            with self.subTest(view=url_name):
+                artifact_cache.clear()
+                self.assertConstantQueries(
+                    (small, large), lambda project: self.client.get(reverse(url_name, args=[project.pk])).getvalue(),
+                    expected=queries,
+                )
+
+
+class SatelliteParentTests(TestCase):
+    def test_deleting_parent_cascades_to_satellites_and_pits(self):
+        project = build_project(hubs=3, satellites_per_hub=1)
+        link = Link.objects.get(project=project, name='Link 0')
+        PointInTime.objects.create(project=project, name='PIT Link', link=link)
+
+        response = self.client.post(reverse('delete_link', args=[link.pk]), {'confirm': 'true'})
+        self.assertRedirects(response, reverse('project_detail', args=[project.pk]))
+        self.assertFalse(Satellite.objects.filter(name='Sat Link 0').exists())
+        self.assertFalse(PointInTime.objects.filter(project=project).exists())
+
+    def test_exactly_one_parent_is_required(self):
+        project = build_project(hubs=2, satellites_per_hub=0)
+        hub = Hub.objects.filter(project=project).first()
+        link = Link.objects.get(project=project)
+        with self.assertRaises(ValueError):
+            Satellite.objects.create(project=project, name='Sem pai')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Satellite.objects.create(project=project, name='Dois pais', hub=hub, link=link)
+
+    def test_parent_form_value_round_trip(self):
+        project = build_project(hubs=2, satellites_per_hub=1)
+        satellite = Satellite.objects.get(name='Sat Link 0')
+        self.assertEqual(satellite.parent_value, f'link-{satellite.link_id}')
+        hub = Hub.objects.filter(project=project).first()
+        satellite.set_parent_value(f'hub-{hub.id}')
+        satellite.save()
+        satellite.refresh_from_db()
+        self.assertEqual((satellite.parent_kind, satellite.parent), ('hub', hub))
+        self.assertIsNone(satellite.link_id)
+
+
+class SatelliteAttributeTests(TestCase):
+    def setUp(self):
+        self.project = build_project(hubs=2, satellites_per_hub=1)
+        self.satellite = Satellite.objects.get(name='Sat Hub 0 0')
+
+    def test_catalog_is_queryable_by_name_and_type(self):
+        self.assertEqual(self.satellite.attributes, {'nome': 'string', 'ativo': 'boolean'})
+        carriers = Satellite.objects.filter(columns__name='nome').order_by('name')
+        self.assertEqual([s.name for s in carriers], ['Sat Hub 0 0', 'Sat Hub 1 0'])
+        floats = SatelliteAttribute.objects.filter(satellite__project=self.project, tipo='float')
+        self.assertEqual(list(floats.values_list('satellite__name', flat=True)), ['Sat Link 0'])
+
+    def test_set_columns_keeps_details_not_informed(self):
+        self.satellite.columns.filter(name='nome').update(length=60, nullable=False)
+        revision = Project.objects.get(pk=self.project.pk).revision
+        self.satellite.set_columns([{'name': 'valor', 'tipo': 'decimal'}, {'name': 'nome', 'tipo': 'string'}])
+        columns = list(self.satellite.columns.values_list('name', 'ordinal', 'length', 'nullable'))
+        self.assertEqual(columns, [('valor', 0, None, True), ('nome', 1, 60, False)])
+        self.assertGreater(Project.objects.get(pk=self.project.pk).revision, revision)
+
+    def test_update_view_writes_typed_columns(self):
+        data = {
+            'project': self.project.pk, 'name': self.satellite.name, 'parent': self.satellite.parent_value,
+            'load_date': 'load_date', 'record_source': 'record_source', 'staging_table': '',
+            'partition_scheme': 'none', 'distribution': 'auto',
+            'attributes-TOTAL_FORMS': '3', 'attributes-INITIAL_FORMS': '0',
+            'attributes-0-name': 'valor', 'attributes-0-tipo': 'decimal',
+            'attributes-0-precision': '12', 'attributes-0-scale': '4',
+            'attributes-1-name': 'nome', 'attributes-1-tipo': 'string',
+            'attributes-1-length': '60', 'attributes-1-not_null': 'on',
+            'attributes-2-name': 'quantidade', 'attributes-2-tipo': 'smallint',
+        }
+        url = reverse('update_satellite', args=[self.satellite.pk])
+        response = self.client.post(url, data)
+        self.assertRedirects(response, reverse('project_detail', args=[self.project.pk]))
+        ddl = build_ddl(load_project_graph(self.project))
+        self.assertIn('    valor DECIMAL(12,4),', ddl)
+        self.assertIn('    nome VARCHAR(60) NOT NULL,', ddl)
+        self.assertIn('    quantidade SMALLINT,', ddl)
+
+        # Escala maior que a precisão é rejeitada
+        response = self.client.post(url, dict(data, **{'attributes-0-scale': '14'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.satellite.columns.get(name='valor').scale, 4)
+        # Sem precisão, a escala é comparada com a precisão padrão (18)
+        self.assertFalse(AttributeForm({'name': 'x', 'tipo': 'decimal', 'scale': '20'}).is_valid())
+        self.assertTrue(AttributeForm({'name': 'x', 'tipo': 'decimal', 'scale': '6'}).is_valid())
+
+    def test_types_map_per_dialect_with_declared_sizes(self):
+        self.assertEqual(get_dialect('postgresql').column_type('decimal', precision=10, scale=2), 'NUMERIC(10,2)')
+        self.assertEqual(get_dialect('snowflake').column_type('bigint'), 'NUMBER(19,0)')
+        self.assertEqual(get_dialect('sqlserver').column_type('string', length=10000), 'VARCHAR(MAX)')
+        self.assertEqual(get_dialect('ansi').column_type('decimal'), 'DECIMAL(18,2)')
+        self.assertEqual(get_dialect('ansi').column_type('decimal', scale=20), 'DECIMAL(20,20)')
+        self.assertEqual(get_dialect('ansi').column_type('xml'), 'VARCHAR(255)')
+
+        Hub.objects.filter(project=self.project, name='Hub 0').update(business_key_type='char', business_key_length=11)
+        Hub.objects.filter(project=self.project, name='Hub 1').update(business_key_type='bigint')
+        ddl = build_ddl(load_project_graph(self.project))
+        self.assertIn('    bk_0 CHAR(11) NOT NULL,', ddl)
+        self.assertIn('    bk_1 BIGINT NOT NULL,', ddl)
+
+
+class SampleProfilingTests(TestCase):
+    def test_profile_suggests_narrowest_safe_types(self):
+        records = [
+            {'id': str(i), 'uf': 'SP' if i % 2 else 'RJ', 'valor': f'{i * 1.5:.2f}', 'cep': '01310',
+             'nome': 'x' * (3 + i % 40), 'nascimento': '2024-01-02', 'ativo': 'true', 'obs': None}
+            for i in range(1000)
+        ]
+        profile = profile_records(records)
+        suggestions = {column['name']: column for column in profile.suggestions(exclude={'obs'})}
+        self.assertEqual(suggestions['id']['tipo'], 'smallint')
+        self.assertEqual((suggestions['uf']['tipo'], suggestions['uf']['length']), ('char', 2))
+        self.assertEqual(
+            (suggestions['valor']['tipo'], suggestions['valor']['precision'], suggestions['valor']['scale']),
+            ('decimal', 7, 2),
+        )
+        # Zeros à esquerda: código, não número
+        self.assertEqual(suggestions['cep']['tipo'], 'char')
+        self.assertEqual((suggestions['nome']['tipo'], suggestions['nome']['length']), ('string', 60))
+        self.assertEqual(suggestions['nascimento']['tipo'], 'date')
+        self.assertEqual(suggestions['ativo']['tipo'], 'boolean')
+        self.assertNotIn('obs', suggestions)
+        self.assertEqual(profile.columns['obs'].null_ratio, 1.0)
+
+    def test_hyperloglog_estimate_is_close(self):
+        counter = HyperLogLog()
+        for i in range(20000):
+            counter.add(str(i % 10000))
+        self.assertAlmostEqual(len(counter), 10000, delta=500)
+
+    def test_create_satellite_prefills_attributes_from_sample(self):
+        project = build_project(hubs=2, satellites_per_hub=0)
+        hub = Hub.objects.get(project=project, name='Hub 0')
+        sample = SimpleUploadedFile(
+            'clientes.csv', b'bk_0,nome,limite,load_date\nA1,Ana,1500.50,2024-01-01\nA2,Bruno Souza,,2024-01-02\n'
+        )
+        response = self.client.post(reverse('create_satellite', args=[project.pk]), {
+            'project': project.pk, 'name': 'Cliente Dados', 'parent': f'hub-{hub.id}',
+            'load_date': 'load_date', 'record_source': 'record_source',
+            'profile_sample': '1', 'sample': sample,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Satellite.objects.filter(name='Cliente Dados').exists())
+        initial = response.context['formset'].initial
+        self.assertEqual([column['name'] for column in initial], ['nome', 'limite'])
+        self.assertEqual(initial[1]['tipo'], 'decimal')
+        self.assertEqual(response.context['form'].initial['name'], 'Cliente Dados')
+
+    def test_create_hub_suggests_business_key_type(self):
+        project = Project.objects.create(name='Vendas')
+        sample = SimpleUploadedFile('pedidos.jsonl', b'{"numero": 12345678901}\n{"numero": 98765432100}\n')
+        response = self.client.post(reverse('create_hub', args=[project.pk]), {
+            'project': project.pk, 'name': 'Pedido', 'business_key': 'numero',
+            'profile_sample': '1', 'sample': sample,
+        })
+        initial = response.context['form'].initial
+        self.assertEqual((initial['business_key_type'], initial['business_key_length']), ('bigint', None))
+
+
+class SplitAdvisorTests(TestCase):
+    @staticmethod
+    def snapshot(version, customers=200):
+        # Endereço e nome estáveis; saldo muda em todo snapshot
+        return [
+            {'bk_0': f'C{i}', 'nome': f'Cliente {i}', 'endereco': f'Rua das Acácias, {i * 7} - Jardim Paulista - São Paulo',
+             'saldo': str(i * 10 + version)}
+            for i in range(customers)
+        ]
+
+    def test_recommends_splitting_fast_attributes(self):
+        analyzer = ChangeRateAnalyzer(['bk_0'], ['nome', 'endereco', 'saldo'])
+        for version in range(5):
+            analyzer.add_snapshot(self.snapshot(version))
+        rates = analyzer.change_rates()
+        self.assertEqual((rates['nome'], rates['saldo']), (0.0, 1.0))
+        advice = recommend_split(analyzer, overhead=73)
+        self.assertEqual([group['attributes'] for group in advice.groups], [['nome', 'endereco'], ['saldo']])
+        self.assertEqual(advice.current_rows, 1000)
+        self.assertEqual([group['rows'] for group in advice.groups], [200, 1000])
+        self.assertGreater(advice.savings, 0.2)
+
+    def test_range_costs_match_per_group_estimates(self):
+        attributes = [f'a{i}' for i in range(6)]
+        analyzer = ChangeRateAnalyzer(['bk_0'], attributes)
+        for version in range(4):
+            # O atributo a{i} muda a cada i + 1 snapshots
+            analyzer.add_snapshot([
+                {'bk_0': f'C{key}', **{name: f'{key}-{version // (i + 1)}' for i, name in enumerate(attributes)}}
+                for key in range(20)
+            ])
+        ordered = list(reversed(attributes))
+        costs = range_costs(analyzer, ordered, 73)
+        advice = SplitAdvice(analyzer, [ordered], 73)
+        for (start, end), size in costs.items():
+            self.assertEqual(size, advice.estimate([ordered[start:end]])[0][1])
+
+    def test_similar_rates_keep_satellite(self):
+        analyzer = ChangeRateAnalyzer(['bk_0'], ['nome', 'saldo'])
+        for version in range(3):
+            analyzer.add_snapshot([{'bk_0': 'C1', 'nome': f'N{version}', 'saldo': str(version)}])
+        self.assertFalse(recommend_split(analyzer, overhead=73).recommended)
+
+    def test_split_views_analyze_and_apply(self):
+        project = build_project(hubs=1, satellites_per_hub=0)
+        hub = Hub.objects.get(project=project)
+        satellite = Satellite(project=project, name='Cliente', hub=hub, staging_table='STG_CLIENTE')
+        satellite.save()
+        satellite.set_columns([
+            {'name': 'nome', 'tipo': 'string', 'length': 80},
+            {'name': 'endereco', 'tipo': 'string'},
+            {'name': 'saldo', 'tipo': 'decimal', 'precision': 12, 'scale': 2, 'nullable': False},
+        ])
+        snapshots = [
+            SimpleUploadedFile(f'clientes_{version}.jsonl', ''.join(
+                json.dumps(record) + '\n' for record in self.snapshot(version)
+            ).encode())
+            for version in range(5)
+        ]
+        response = self.client.post(reverse('analyze_satellite_split', args=[satellite.pk]), {'snapshots': snapshots})
+        self.assertTrue(response.context['advice'].recommended)
+        names = [name for name, _ in response.context['groups']]
+        self.assertEqual(names, ['Cliente Lento', 'Cliente Rápido'])
+
+        response = self.client.post(reverse('split_satellite', args=[satellite.pk]), {
+            'group-0-name': names[0], 'group-0-attributes': 'nome, endereco',
+            'group-1-name': names[1], 'group-1-attributes': 'saldo',
+        })
+        self.assertRedirects(response, reverse('project_detail', args=[project.pk]))
+        self.assertFalse(Satellite.objects.filter(pk=satellite.pk).exists())
+        slow, fast = Satellite.objects.filter(project=project).order_by('name')
+        self.assertEqual((slow.hub_id, slow.staging_table), (hub.id, 'STG_CLIENTE'))
+        self.assertEqual(list(slow.columns.values_list('name', 'length')), [('nome', 80), ('endereco', None)])
+        saldo = fast.columns.get()
+        self.assertEqual((saldo.name, saldo.precision, saldo.nullable), ('saldo', 12, False))
+
+
+class ModelImportTests(TestCase):
+    def test_import_document_in_few_queries(self):
+        project = Project.objects.create(name='Vendas')
+        Hub.objects.create(project=project, name='Loja', business_key='loja_id')
+        document = {
+            'hubs': [{'name': f'Hub {i}', 'business_key': f'bk_{i}', 'business_key_type': 'bigint'}
+                     for i in range(100)],
+            'links': [{'name': f'Link {i}', 'hubs': [f'Hub {i}', f'Hub {i + 1}', 'Loja']} for i in range(99)],
+            'satellites': [{'name': f'Sat {i}', 'hub': f'Hub {i}',
+                            'attributes': [{'name': 'valor', 'tipo': 'decimal', 'precision': 12, 'scale': 2},
+                                           {'name': 'nome', 'tipo': 'string', 'nullable': False}]}
+                           for i in range(100)]
+                          + [{'name': 'Sat Link', 'link': 'Link 0', 'attributes': {'quantidade': 'integer'}}],
+        }
+        records = [dict(record, kind=kind) for section, kind in (('hubs', 'hub'), ('links', 'link'),
+                   ('satellites', 'satellite')) for record in document[section]]
+        revision = project.revision
+        # Inserções em lote: poucas queries para centenas de entidades
+        with CaptureQueriesContext(connection) as queries:
+            counts = import_model(project, records)
+        self.assertLess(len(queries), 20)
+        self.assertEqual(counts, {'hubs': 100, 'links': 99, 'satellites': 101, 'attributes': 201})
+        self.assertEqual(Link.objects.get(project=project, name='Link 5').hubs.count(), 3)
+        satellite = Satellite.objects.get(project=project, name='Sat 7')
+        self.assertEqual(satellite.hub.name, 'Hub 7')
+        self.assertEqual(list(satellite.columns.values_list('name', 'precision', 'nullable')),
+                         [('valor', 12, True), ('nome', None, False)])
+        self.assertEqual(Satellite.objects.get(name='Sat Link').link.name, 'Link 0')
+        project.refresh_from_db()
+        self.assertGreater(project.revision, revision)
+
+    def test_invalid_model_writes_nothing(self):
+        project = Project.objects.create(name='Vendas')
+        records = [
+            {'kind': 'hub', 'name': 'Cliente', 'business_key': 'cpf'},
+            {'kind': 'link', 'name': 'Cliente Pedido', 'hubs': ['Cliente', 'Pedido']},
+            {'kind': 'satellite', 'name': 'Cliente Dados', 'hub': 'Cliente'},
+            {'kind': 'attribute', 'satellite': 'Cliente Dados', 'name': 'nome', 'tipo': 'texto'},
+            {'kind': 'hub', 'name': 'Cliente', 'business_key': 'cpf'},
+        ]
+        with self.assertRaises(ModelImportError) as raised:
+            import_model(project, records)
+        errors = ' '.join(raised.exception.errors)
+        self.assertIn('hub(s) inexistente(s): Pedido', errors)
+        self.assertIn('tipo "texto" inválido', errors)
+        self.assertIn('hub Cliente duplicado', errors)
+        self.assertFalse(Hub.objects.filter(project=project).exists())
+
+    def test_references_of_the_wrong_type_are_reported(self):
+        project = Project.objects.create(name='Vendas')
+        records = [
+            {'kind': 'hub', 'name': 'Cliente', 'business_key': 'cpf'},
+            {'kind': 'hub', 'name': ['Pedido'], 'business_key': 'numero'},
+            {'kind': 'link', 'name': 'Cliente Pedido', 'hubs': [{'x': 1}]},
+            {'kind': 'satellite', 'name': 'Cliente Dados', 'hub': ['Cliente']},
+            {'kind': 'attribute', 'satellite': {'name': 'Cliente Dados'}, 'name': 'nome', 'tipo': 'string'},
+            {'kind': ['hub'], 'name': 'Loja'},
+        ]
+        with self.assertRaises(ModelImportError) as raised:
+            import_model(project, records)
+        self.assertEqual(raised.exception.errors, [
+            'Registro 2: hub (sem nome): name deve(m) ser um valor simples.',
+            'Registro 3: link Cliente Pedido: os hubs devem ser informados pelo nome.',
+            'Registro 4: satellite Cliente Dados: o hub deve ser informado pelo nome.',
+            'Registro 5: atributo nome: informe o satellite pelo nome.',
+            'Registro 6: tipo "[\'hub\']" desconhecido (use hub, link, satellite ou attribute).',
+        ])
+
+        # Pelo upload, o erro volta ao formulário em vez de um 500
+        upload = SimpleUploadedFile('modelo.json', json.dumps({
+            'hubs': [{'name': 'Cliente', 'business_key': 'cpf'}],
+            'satellites': [{'name': 'Cliente Dados', 'hub': {'name': 'Cliente'}}],
+        }).encode())
+        response = self.client.post(reverse('import_model', args=[project.pk]), {'model_file': upload})
+        self.assertContains(response, 'o hub deve ser informado pelo nome')
+        self.assertFalse(Hub.objects.filter(project=project).exists())
+
+    def test_import_command_and_upload(self):
+        project = Project.objects.create(name='Vendas')
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'modelo.csv'
+            path.write_text(
+                'kind,name,business_key,hubs,hub,satellite,tipo,length\n'
+                'hub,Cliente,cpf,,,,,\n'
+                'hub,Pedido,numero,,,,,\n'
+                'link,Cliente Pedido,,Cliente|Pedido,,,,\n'
+                'satellite,Cliente Dados,,,Cliente,,,\n'
+                'attribute,nome,,,,Cliente Dados,string,100\n',
+                encoding='utf-8',
+            )
+            call_command('import_model', 'Vendas', str(path), stdout=io.StringIO())
+        self.assertEqual(Link.objects.get(project=project).hubs.count(), 2)
+        self.assertEqual(SatelliteAttribute.objects.get(satellite__project=project).length, 100)
+
+        upload = SimpleUploadedFile('modelo.yaml', (
+            'hubs:\n  - name: Produto\n    business_key: sku\n'
+            'satellites:\n  - name: Produto Dados\n    hub: Produto\n    attributes: {preco: decimal}\n'
+        ).encode())
+        response = self.client.post(reverse('import_model', args=[project.pk]), {'model_file': upload})
+        self.assertRedirects(response, reverse('project_detail', args=[project.pk]))
+        self.assertEqual(Satellite.objects.get(name='Produto Dados').attributes, {'preco': 'decimal'})
+
+
+class BatchApiTests(TestCase):
+    def post(self, project, operations):
+        return self.client.post(
+            reverse('api_batch', args=[project.pk]), json.dumps({'operations': operations}),
+            content_type='application/json',
+        )
+
+    def test_large_create_batch_takes_few_queries(self):
+        project = Project.objects.create(name='Vendas')
+        operations = [{'op': 'create', 'kind': 'hub', 'name': f'Hub {i}', 'business_key': f'bk_{i}'}
+                      for i in range(500)]
+        operations += [{'op': 'create', 'kind': 'satellite', 'name': f'Sat {i}', 'hub': f'Hub {i}',
+                        'attributes': {'nome': 'string'}} for i in range(500)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(project, operations)
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(queries), 40)
+        results = response.json()['results']
+        self.assertEqual(results[0], {'index': 0, 'status': 'created', 'id': Hub.objects.get(name='Hub 0').pk})
+        self.assertEqual(Satellite.objects.get(pk=results[999]['id']).hub.name, 'Hub 499')
+
+    def test_mixed_batch_updates_and_deletes(self):
+        project = build_project(hubs=3)
+        hubs = {hub.name: hub for hub in project.hubs.all()}
+        link = project.links.get(name='Link 0')
+        satellite = project.satellites.get(name='Sat Hub 0 0')
+        removed = project.satellites.get(name='Sat Hub 1 0')
+        response = self.post(project, [
+            {'op': 'create', 'kind': 'hub', 'name': 'Loja', 'business_key': 'loja_id'},
+            {'op': 'update', 'kind': 'hub', 'id': hubs['Hub 2'].pk, 'name': 'Produto', 'business_key_type': 'integer'},
+            {'op': 'update', 'kind': 'link', 'id': link.pk, 'hubs': ['Hub 0', 'Loja']},
+            {'op': 'update', 'kind': 'satellite', 'id': satellite.pk, 'name': 'Sat Hub 1 0', 'hub': 'Loja',
+             'attributes': [{'name': 'email', 'tipo': 'string', 'length': 200}]},
+            {'op': 'delete', 'kind': 'satellite', 'id': removed.pk},
+        ])
+        self.assertEqual(response.status_code, 200, response.json())
+        self.assertEqual([result['status'] for result in response.json()['results']],
+                         ['created', 'updated', 'updated', 'updated', 'deleted'])
+        self.assertEqual(Hub.objects.get(pk=hubs['Hub 2'].pk).business_key_type, 'integer')
+        self.assertEqual(sorted(link.hubs.values_list('name', flat=True)), ['Hub 0', 'Loja'])
+        satellite.refresh_from_db()
+        self.assertEqual((satellite.name, satellite.hub.name), ('Sat Hub 1 0', 'Loja'))
+        self.assertEqual(list(satellite.columns.values_list('name', 'length')), [('email', 200)])
+        self.assertFalse(Satellite.objects.filter(pk=removed.pk).exists())
+
+    def test_invalid_batch_writes_nothing(self):
+        project = build_project(hubs=2)
+        hub = project.hubs.get(name='Hub 0')
+        revision = Project.objects.get(pk=project.pk).revision
+        response = self.post(project, [
+            {'op': 'create', 'kind': 'hub', 'name': 'Loja', 'business_key': 'loja_id'},
+            {'op': 'update', 'kind': 'hub', 'id': hub.pk, 'name': 'Hub 1'},
+            {'op': 'create', 'kind': 'satellite', 'name': 'Sat Loja', 'link': 'Link 9'},
+            {'op': 'delete', 'kind': 'link', 'id': 999999},
+        ])
+        self.assertEqual(response.status_code, 400)
+        results = response.json()['results']
+        self.assertEqual(results[0], {'index': 0, 'status': 'valid'})
+        self.assertIn('hub Hub 1 duplicado.', results[1]['errors'])
+        self.assertIn('satellite Sat Loja: link Link 9 inexistente.', results[2]['errors'])
+        self.assertIn('link 999999 não encontrado no projeto.', results[3]['errors'])
+        self.assertFalse(Hub.objects.filter(name='Loja').exists())
+        self.assertEqual(Project.objects.get(pk=project.pk).revision, revision)
+
+    def test_values_of_the_wrong_type_are_reported(self):
+        project = build_project(hubs=2)
+        hub = project.hubs.get(name='Hub 0')
+        link = project.links.get(name='Link 0')
+        satellite = project.satellites.get(name='Sat Hub 0 0')
+        response = self.post(project, [
+            {'op': 'update', 'kind': 'link', 'id': link.pk, 'hubs': [{'x': 1}]},
+            {'op': 'update', 'kind': 'satellite', 'id': satellite.pk, 'hub': ['A']},
+            {'op': 'update', 'kind': 'hub', 'id': hub.pk, 'name': ['x']},
+            {'op': 'create', 'kind': 'link', 'name': 'Link X', 'hubs': [{'x': 1}]},
+            {'op': 'delete', 'kind': 'hub', 'id': True},
+            {'op': 'create', 'kind': ['hub']},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result.get('errors') for result in response.json()['results']], [
+            [f'link {link.pk}: os hubs devem ser informados pelo nome.'],
+            [f'satellite {satellite.pk}: o hub deve ser informado pelo nome.'],
+            [f'hub {hub.pk}: name deve(m) ser um valor simples.'],
+            ['link Link X: os hubs devem ser informados pelo nome.'],
+            ['delete exige o id da entidade.'],
+            ['informe op (create, update ou delete) e kind (hub, link ou satellite).'],
+        ])
+        self.assertEqual(Hub.objects.get(pk=hub.pk).name, 'Hub 0')
+
+    def test_cross_site_posts_are_rejected(self):
+        project = build_project(hubs=2)
+        url = reverse('api_batch', args=[project.pk])
+        body = json.dumps({'operations': [{'op': 'delete', 'kind': 'hub', 'id': project.hubs.first().pk}]})
+        client = Client(enforce_csrf_checks=True)
+        self.assertEqual(client.post(url, body, content_type='application/json').status_code, 403)
+        self.assertEqual(self.client.post(url, body, content_type='text/plain').status_code, 415)
+        self.assertEqual(project.hubs.count(), 2)
+
+        token = client.get(url).json()['csrf_token']
+        response = client.post(url, body, content_type='application/json', HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(project.hubs.count(), 1)
+
+
+class ProjectCopyTests(ConstantQueriesMixin, TestCase):
+    def test_clone_copies_project_in_constant_queries(self):
+        project, clone = self.assertConstantQueries(
+            (3, 6), lambda project: project.clone(f'Cópia de {project.name}'), build=build_reference_project,
+        )
+
+        self.assertEqual(clone.hubs.count(), 6)
+        link = clone.links.get(name='Link 2')
+        self.assertEqual(sorted(link.hubs.values_list('name', flat=True)), ['Hub 2', 'Hub 3'])
+        self.assertEqual(set(Hub.objects.filter(links__project=clone).values_list('project', flat=True)), {clone.pk})
+        satellite = clone.satellites.get(name='Sat Hub 4 1')
+        self.assertEqual((satellite.hub.project_id, satellite.hub.name), (clone.pk, 'Hub 4'))
+        self.assertEqual(satellite.attributes, {'nome': 'string', 'ativo': 'boolean'})
+        self.assertEqual(clone.pits.get().link.project_id, clone.pk)
+        step = BridgeStep.objects.get(bridge__project=clone)
+        self.assertEqual((step.bridge.start_hub.project_id, step.link.project_id, step.hub.name), (clone.pk, clone.pk, 'Hub 1'))
+        # Mesmo DDL, exceto pelo nome do projeto no cabeçalho
+        self.assertEqual(
+            build_ddl(load_project_graph(clone)).split('\n', 1)[1],
+            build_ddl(load_project_graph(project)).split('\n', 1)[1],
+        )
+
+    def test_export_round_trips_through_import(self):
+        project = build_project(hubs=4)
+        response = self.client.get(reverse('export_project', args=[project.pk]))
+        self.assertTrue(response.streaming)
+        document = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(document['project']['name'], 'Vendas')
+        self.assertEqual(document['links'][0]['hubs'], ['Hub 0', 'Hub 1'])
+
+        copy = Project.objects.create(name='Importado')
+        counts = import_model(copy, (
+            dict(record, kind=kind) for section, kind in (('hubs', 'hub'), ('links', 'link'), ('satellites', 'satellite'))
+            for record in document[section]
+        ))
+        self.assertEqual(counts, {'hubs': 4, 'links': 3, 'satellites': 11, 'attributes': 19})
+        self.assertEqual(Satellite.objects.get(project=copy, name='Sat Link 0').attributes, {'valor': 'decimal'})
+
+
+class DeleteImpactTests(ConstantQueriesMixin, TestCase):
+    def test_hub_delete_removes_links_and_dependents_in_constant_queries(self):
+        project, _ = self.assertConstantQueries(
+            (3, 6), lambda project: DeleteImpact(project, hubs=[project.hubs.get(name='Hub 1').pk]).delete(),
+            build=build_reference_project,
+        )
+
+        # Hub 1 participa de Link 0 e Link 1; os satellites, o PIT e a Bridge saem junto
+        self.assertEqual(sorted(project.hubs.values_list('name', flat=True)),
+                         ['Hub 0', 'Hub 2', 'Hub 3', 'Hub 4', 'Hub 5'])
+        self.assertEqual(sorted(project.links.values_list('name', flat=True)), ['Link 2', 'Link 3', 'Link 4'])
+        self.assertFalse(project.satellites.filter(name__in=['Sat Hub 1 0', 'Sat Link 0', 'Sat Link 1']).exists())
+        self.assertFalse(SatelliteAttribute.objects.filter(satellite__project=project, satellite__name='Sat Link 0').exists())
+        self.assertFalse(project.pits.exists())
+        self.assertFalse(BridgeStep.objects.filter(bridge__project=project).exists())
+        self.assertEqual(project.satellites.count(), 13)
+
+    def test_impact_resolves_dependents_as_subqueries(self):
+        project = build_reference_project(3)
+        hub = project.hubs.get(name='Hub 1')
+        with CaptureQueriesContext(connection) as queries:
+            impact = DeleteImpact(project, hubs=[hub.pk])
+        # Uma query por tipo e um único COUNT de atributos; os dependentes
+        # vêm de subqueries, não de listas de ids resolvidos
+        self.assertEqual(len(queries), 6)
+        self.assertTrue(all('IN (SELECT' in query['sql'] for query in queries[1:]))
+        self.assertEqual(
+            impact.attribute_count,
+            SatelliteAttribute.objects.filter(satellite__in=impact.satellite_ids).count(),
+        )
+
+    def test_confirm_page_previews_cascade(self):
+        project = build_reference_project(3)
+        hub = project.hubs.get(name='Hub 1')
+        response = self.client.get(reverse('delete_hub', args=[hub.pk]))
+        self.assertContains(response, 'Links (2)')
+        self.assertContains(response, 'Sat Link 1')
+        self.assertContains(response, 'Bridges (1)')
+
+        artifact_cache.set('ddl', project, 'CREATE TABLE H_Hub_0 ();')
+        # Confirmar não monta a prévia
+        with patch('modeler.views.DeleteImpact') as impact:
+            response = self.client.post(reverse('project_delete', args=[project.pk]))
+        impact.assert_not_called()
+        self.assertRedirects(response, reverse('project_list'))
+        self.assertIsNone(artifact_cache.get('ddl', project))
+        self.assertFalse(Hub.objects.filter(project_id=project.pk).exists())
+        self.assertFalse(SatelliteAttribute.objects.filter(satellite__project_id=project.pk).exists())
+        self.assertFalse(Project.objects.filter(pk=project.pk).exists())
+
+
+class NeighborhoodDiagramTests(ConstantQueriesMixin, TestCase):
+    def setUp(self):
+        artifact_cache.clear()
+
+    def test_neighborhood_follows_links_up_to_depth(self):
+        project = build_project(hubs=5, satellites_per_hub=0)
+        graph = load_project_graph(project)
+        hub_ids = {hub.name: hub.id for hub in graph.hubs.values()}
+        link_ids = {link.name: link.id for link in graph.links.values()}
+
+        hubs, links = graph.neighborhood('hub', hub_ids['Hub 2'], 1)
+        self.assertEqual(hubs, {hub_ids['Hub 1'], hub_ids['Hub 2'], hub_ids['Hub 3']})
+        self.assertEqual(links, {link_ids['Link 1'], link_ids['Link 2']})
+        self.assertEqual(graph.neighborhood('hub', hub_ids['Hub 2'], 0), ({hub_ids['Hub 2']}, set()))
+        hubs, links = graph.neighborhood('link', link_ids['Link 0'], 1)
+        self.assertEqual(hubs, {hub_ids['Hub 0'], hub_ids['Hub 1'], hub_ids['Hub 2']})
+        self.assertEqual(links, {link_ids['Link 0'], link_ids['Link 1']})
+
+    def test_scoped_diagram_depends_on_neighborhood_size(self):
+        def build(hubs):
+            project = build_project(name=f'Projeto {hubs}', hubs=hubs)
+            return reverse('visualize', args=[project.pk]) + f'?focus=hub:{project.hubs.get(name="Hub 1").pk}'
+
+        url, response = self.assertConstantQueries((4, 12), self.client.get, build=build)
+        self.assertContains(response, 'H_Hub_2:::hubStyle')
+        self.assertContains(response, 'S_Sat_Link_0:::satelliteStyle')
+        self.assertNotContains(response, 'H_Hub_3:::hubStyle')
+
+        response = self.client.get(url + '&hide_attributes=on&depth=0')
+        self.assertContains(response, 'S_Sat_Hub_1_0:::satelliteStyle')
+        self.assertNotContains(response, 'HK_DIFF')
+        self.assertNotContains(response, 'L_Link_0:::linkStyle')
+        response = self.client.get(url + '&hide_satellites=on')
+        self.assertNotContains(response, ':::satelliteStyle')
+
+        # Foco em um hub de outro projeto
+        hub = Hub.objects.get(project__name='Projeto 12', name='Hub 1')
+        other = build_project(name='Outro', hubs=2)
+        response = self.client.get(reverse('visualize', args=[other.pk]) + f'?focus=hub:{hub.pk}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_large_project_asks_for_a_focus(self):
+        project = build_project(hubs=4)
+        url = reverse('visualize', args=[project.pk])
+        with patch('modeler.views.MAX_DIAGRAM_ENTITIES', 5):
+            # O tamanho sai de contagens, sem carregar o grafo
+            with patch('modeler.views.load_project_graph') as load_graph:
+                response = self.client.get(url)
+            load_graph.assert_not_called()
+            self.assertNotContains(response, 'erDiagram')
+            self.assertContains(response, f'?focus=hub:{project.hubs.get(name="Hub 0").pk}')
+            self.assertContains(self.client.get(url + '?full=1'), 'H_Hub_3:::hubStyle')
+
+
+class ArtifactCacheTests(TestCase):
+    def setUp(self):
+        artifact_cache.clear()
+
+    def test_repeated_views_skip_model_tables(self):
+        project = build_project(hubs=3)
+        for url_name in ('visualize', 'view_ddl', 'generate_ddl'):
+            with self.subTest(view=url_name):
+                first = self.client.get(reverse(url_name, args=[project.pk])).getvalue()
+                # Apenas a query do próprio projeto
+                with self.assertNumQueries(1):
+                    second = self.client.get(reverse(url_name, args=[project.pk])).getvalue()
+                self.assertEqual(first, second)
+
+    def test_entity_changes_invalidate_artifacts(self):
+        project = build_project(hubs=2)
+        url = reverse('view_ddl', args=[project.pk])
+        self.client.get(url)
+
+        hub = Hub.objects.create(project=project, name='Cliente', business_key='cpf')
+        self.assertContains(self.client.get(url), 'H_Cliente')
+
+        link = Link.objects.filter(project=project).first()
+        link.hubs.add(hub)
+        self.assertContains(self.client.get(url), 'FOREIGN KEY (HK_Cliente) REFERENCES H_Cliente')
+
+        hub.delete()
+        self.assertNotContains(self.client.get(url), 'H_Cliente')
+
+    def test_lru_evicts_by_size(self):
+        first = Project.objects.create(name='A')
+        second = Project.objects.create(name='B')
+        cache = ArtifactCache(alias='artifacts', max_bytes=10)
+        cache.set('ddl', first, 'a' * 6)
+        cache.set('ddl', second, 'b' * 6)
+        self.assertIsNone(cache.get('ddl', first))
+        self.assertEqual(cache.get('ddl', second), 'b' * 6)
+
+    def test_shared_backend_skips_local_lru_and_invalidates_across_processes(self):
+        project = Project.objects.create(name='A')
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={'artifacts': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            # Duas instâncias fazem o papel de dois processos sobre o mesmo diretório
+            writer = ArtifactCache(alias='artifacts', max_bytes=10)
+            reader = ArtifactCache(alias='artifacts', max_bytes=10)
+            writer.set('ddl', project, 'a' * 20)
+            self.assertEqual(reader.get('ddl', project), 'a' * 20)
+            reader.invalidate(project.pk)
+            self.assertIsNone(writer.get('ddl', project))
+
+
+class StreamingDDLTests(TestCase):
+    def setUp(self):
+        artifact_cache.clear()
+
+    def test_streamed_download_matches_built_ddl(self):
+        project = build_project(hubs=4)
+        expected = build_ddl(load_project_graph(project))
+
+        response = self.client.get(reverse('generate_ddl', args=[project.pk]))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response.getvalue().decode('utf-8'), expected)
+
+        response = self.client.get(reverse('generate_ddl', args=[project.pk]), {'gzip': '1'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.sql.gz', response['Content-Disposition'])
+        self.assertEqual(gzip.decompress(response.getvalue()).decode('utf-8'), expected)
+
+
+class HashKeyStorageTests(TestCase):
+    def ddl_for(self, **options):
+        project = build_project(hubs=2, satellites_per_hub=1)
+        Project.objects.filter(pk=project.pk).update(**options)
+        project.refresh_from_db()
+        return build_ddl(load_project_graph(project))
+
+    def test_default_is_hex_md5_varchar(self):
+        ddl = self.ddl_for()
+        self.assertIn('HK_Hub_0 VARCHAR(32) PRIMARY KEY', ddl)
+        self.assertIn('HK_DIFF VARCHAR(32) NOT NULL', ddl)
+
+    def test_binary_keys_apply_to_pks_fks_and_parents(self):
+        ddl = self.ddl_for(target_dialect='postgresql', hash_key_storage='binary')
+        self.assertNotIn('VARCHAR(32)', ddl)
+        self.assertIn('HK_Link_0 BYTEA PRIMARY KEY', ddl)
+        self.assertIn('HK_Hub_1 BYTEA NOT NULL', ddl)
+        self.assertIn('HK_DIFF BYTEA NOT NULL', ddl)
+
+        ddl = self.ddl_for(target_dialect='sqlserver', hash_key_storage='binary', hash_algorithm='sha256')
+        self.assertIn('HK_Hub_0 BINARY(32) PRIMARY KEY', ddl)
+        self.assertIn('is_current BIT NOT NULL', ddl)
+
+    def test_fixed_char_widths_follow_algorithm(self):
+        ddl = self.ddl_for(hash_key_storage='char', hash_algorithm='sha1')
+        self.assertIn('HK_Hub_0 CHAR(40) PRIMARY KEY', ddl)
+        self.assertIn('HK_DIFF CHAR(40) NOT NULL', ddl)
+
+
+class IndexGenerationTests(TestCase):
+    def test_satellite_key_and_supporting_indexes(self):
+        project = build_project(hubs=2, satellites_per_hub=1)
+        ddl = build_ddl(load_project_graph(project))
+
+        self.assertIn('PRIMARY KEY (HK_Hub_0, load_date)', ddl)
+        self.assertIn('PRIMARY KEY (HK_Link_0, load_date)', ddl)
+        self.assertIn('CREATE INDEX IX_L_Link_0_HK_Hub_1 ON L_Link_0 (HK_Hub_1);', ddl)
+        self.assertIn('CREATE INDEX IX_S_Sat_Hub_0_0_current ON S_Sat_Hub_0_0 (HK_Hub_0) WHERE is_current = TRUE;', ddl)
+
+        # O DDL ANSI gerado deve ser aceito por um banco real
+        connection = sqlite3.connect(':memory:')
+        connection.executescript(ddl)
+        connection.close()
+
+    def test_indexes_can_be_disabled(self):
+        project = build_project(hubs=2, satellites_per_hub=1)
+        project.generate_indexes = False
+        project.save()
+        ddl = build_ddl(load_project_graph(project))
+        self.assertNotIn('CREATE INDEX', ddl)
+
+        project.generate_indexes = True
+        project.target_dialect = 'snowflake'
+        project.save()
+        self.assertNotIn('CREATE INDEX', build_ddl(load_project_graph(project)))
+
+
+class PhysicalOptionsTests(TestCase):
+    def ddl_for(self, dialect, **options):
+        project = build_project(hubs=2, satellites_per_hub=1)
+        Project.objects.filter(pk=project.pk).update(target_dialect=dialect)
+        Hub.objects.filter(project=project).update(**options)
+        Satellite.objects.filter(project=project).update(**options)
+        project.refresh_from_db()
+        return build_ddl(load_project_graph(project))
+
+    def test_options_render_in_dialect_syntax(self):
+        options = {'partition_scheme': 'monthly', 'cluster_by_hash_key': True, 'distribution': 'hash'}
+
+        ddl = self.ddl_for('snowflake', **options)
+        self.assertIn("CLUSTER BY (DATE_TRUNC('MONTH', load_date), HK_Hub_0);", ddl)
+
+        ddl = self.ddl_for('redshift', **options)
+        self.assertIn(') DISTSTYLE KEY DISTKEY (HK_Hub_0) COMPOUND SORTKEY (load_date, HK_Hub_0);', ddl)
+
+        ddl = self.ddl_for('postgresql', **options)
+        self.assertIn(') PARTITION BY RANGE (load_date);\nCREATE TABLE S_Sat_Hub_0_0_default PARTITION OF S_Sat_Hub_0_0 DEFAULT;', ddl)
+        self.assertIn("period_start TIMESTAMP := DATE_TRUNC('month', CURRENT_DATE);", ddl)
+        self.assertIn('CLUSTER S_Sat_Hub_0_0 USING IX_S_Sat_Hub_0_0_cluster;', ddl)
+        # Hubs não têm load_date na chave: clusterizados em vez de particionados
+        self.assertIn('CLUSTER H_Hub_0 USING IX_H_Hub_0_cluster;', ddl)
+        self.assertNotIn('H_Hub_0_default', ddl)
+        self.assertIn("DATE_TRUNC('day', CURRENT_DATE)", self.ddl_for('postgresql', partition_scheme='daily'))
+
+        ddl = self.ddl_for('sqlserver', **options)
+        self.assertIn(') ON PS_load_date_monthly (load_date);', ddl)
+        # A função e o esquema de partição vêm antes da primeira tabela que os usa
+        setup = ddl.index("IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = 'PF_load_date_monthly')")
+        self.assertLess(setup, ddl.index('CREATE TABLE S_Sat_Hub_0_0 ('))
+        self.assertIn('CREATE PARTITION SCHEME PS_load_date_monthly AS PARTITION PF_load_date_monthly', ddl)
+        self.assertNotIn('CLUSTER', ddl)
+
+    def test_ansi_ignores_physical_options(self):
+        ddl = self.ddl_for('ansi', partition_scheme='daily', cluster_by_hash_key=True, distribution='all')
+        self.assertNotIn('PARTITION', ddl)
+        self.assertNotIn('CLUSTER', ddl)
+
+    def test_entity_forms_render_physical_options(self):
+        project = build_project(hubs=2)
+        for url in (reverse('create_hub', args=[project.pk]), reverse('create_satellite', args=[project.pk]),
+                    reverse('update_link', args=[Link.objects.filter(project=project).first().pk])):
+            self.assertContains(self.client.get(url), 'name="partition_scheme"')
+
+        # SQL Server não tem distribuição e já clusteriza pela PRIMARY KEY
+        Project.objects.filter(pk=project.pk).update(target_dialect='sqlserver')
+        response = self.client.get(reverse('create_hub', args=[project.pk]))
+        self.assertContains(response, 'name="partition_scheme"')
+        self.assertNotContains(response, 'name="distribution"')
+        self.assertNotContains(response, 'name="cluster_by_hash_key"')
+
+
+class PointInTimeTests(TestCase):
+    def setUp(self):
+        self.project = build_project(hubs=2, satellites_per_hub=2)
+        self.hub = Hub.objects.get(project=self.project, name='Hub 0')
+        PointInTime.objects.create(
+            project=self.project, name='Cliente Diario', hub=self.hub,
+        )
+
+    def test_pit_ddl_has_one_load_date_per_parent_satellite(self):
+        ddl = build_ddl(load_project_graph(self.project))
+        self.assertIn('CREATE TABLE PIT_Cliente_Diario (', ddl)
+        self.assertIn('    S_Sat_Hub_0_0_load_date TIMESTAMP,', ddl)
+        self.assertIn('    S_Sat_Hub_0_1_load_date TIMESTAMP,', ddl)
+        self.assertNotIn('S_Sat_Hub_1_0_load_date', ddl)
+        self.assertIn('PRIMARY KEY (HK_Hub_0, snapshot_date)', ddl)
+
+        # O mesmo DDL é gerado quando os satellites são lidos em blocos
+        streamed = build_ddl(load_project_graph(self.project, stream_satellites=True))
+        self.assertEqual(ddl, streamed)
+
+    def test_population_sql_runs_against_generated_tables(self):
+        graph = load_project_graph(self.project)
+        connection = sqlite3.connect(':memory:')
+        connection.executescript(build_ddl(graph))
+        connection.executescript('''
+            CREATE TABLE AS_OF_DATE (snapshot_date TIMESTAMP);
+            INSERT INTO AS_OF_DATE VALUES ('2024-01-31'), ('2024-02-29');
+            INSERT INTO H_Hub_0 VALUES ('k1', 'A', '2024-01-01', 'crm');
+            INSERT INTO S_Sat_Hub_0_0 (HK_Hub_0, HK_DIFF, valid_from, valid_to, is_current, load_date, record_source)
+            VALUES ('k1', 'd1', '2024-01-01', '2024-02-10', 0, '2024-01-01', 'crm'),
+                   ('k1', 'd2', '2024-02-10', NULL, 1, '2024-02-10', 'crm');
+        ''')
+        population = '\n'.join(pit_population_sql(graph, next(iter(graph.pits.values()))))
+        connection.executescript(population)
+        # Reexecutar não duplica snapshots já carregados
+        connection.executescript(population)
+        rows = connection.execute(
+            'SELECT snapshot_date, S_Sat_Hub_0_0_load_date, S_Sat_Hub_0_1_load_date '
+            'FROM PIT_Cliente_Diario ORDER BY snapshot_date'
+        ).fetchall()
+        connection.close()
+        self.assertEqual(rows, [('2024-01-31', '2024-01-01', None), ('2024-02-29', '2024-02-10', None)])
+
+    def test_create_pit_view(self):
+        response = self.client.post(reverse('create_pit', args=[self.project.pk]), {
+            'project': self.project.pk, 'name': 'Outra', 'parent': f'hub-{self.hub.id}',
+            'snapshot_table': 'AS_OF_DATE', 'snapshot_column': 'snapshot_date',
+        })
+        self.assertRedirects(response, reverse('project_detail', args=[self.project.pk]))
+        self.assertTrue(PointInTime.objects.filter(name='Outra', hub=self.hub).exists())
+
+
+class BridgeTests(TestCase):
+    def setUp(self):
+        self.project = build_project(hubs=3, satellites_per_hub=0)
+        self.hubs = list(Hub.objects.filter(project=self.project).order_by('id'))
+        self.links = list(Link.objects.filter(project=self.project).order_by('id'))
+        self.bridge = Bridge.objects.create(project=self.project, name='Cadeia', start_hub=self.hubs[0])
+        BridgeStep.objects.create(bridge=self.bridge, position=0, link=self.links[0], hub=self.hubs[1])
+        BridgeStep.objects.create(bridge=self.bridge, position=1, link=self.links[1], hub=self.hubs[2])
+
+    def test_bridge_ddl_follows_path(self):
+        ddl = build_ddl(load_project_graph(self.project))
+        self.assertIn('CREATE TABLE BR_Cadeia (', ddl)
+        self.assertIn('    HK_Hub_0 VARCHAR(32) NOT NULL,\n    HK_Link_0 VARCHAR(32) NOT NULL,\n'
+                      '    HK_Hub_1 VARCHAR(32) NOT NULL,\n    HK_Link_1 VARCHAR(32) NOT NULL,\n'
+                      '    HK_Hub_2 VARCHAR(32) NOT NULL,', ddl)
+        self.assertIn('PRIMARY KEY (snapshot_date, HK_Link_0, HK_Link_1)', ddl)
+
+    def test_population_sql_joins_links_as_of_snapshot(self):
+        graph = load_project_graph(self.project)
+        connection = sqlite3.connect(':memory:')
+        connection.executescript(build_ddl(graph))
+        connection.executescript('''
+            CREATE TABLE AS_OF_DATE (snapshot_date TIMESTAMP);
+            INSERT INTO AS_OF_DATE VALUES ('2024-01-31'), ('2024-02-29');
+            INSERT INTO L_Link_0 VALUES ('l0', 'c1', 'p1', '2024-01-01', 'erp');
+            INSERT INTO L_Link_1 VALUES ('l1a', 'p1', 'x1', '2024-01-10', 'erp'),
+                                        ('l1b', 'p1', 'x2', '2024-02-15', 'erp');
+        ''')
+        population = '\n'.join(bridge_population_sql(graph, self.bridge))
+        connection.executescript(population)
+        connection.executescript(population)
+        rows = connection.execute(
+            'SELECT snapshot_date, HK_Hub_0, HK_Link_0, HK_Hub_1, HK_Link_1, HK_Hub_2 '
+            'FROM BR_Cadeia ORDER BY snapshot_date, HK_Link_1'
+        ).fetchall()
+        connection.close()
+        self.assertEqual(rows, [
+            ('2024-01-31', 'c1', 'l0', 'p1', 'l1a', 'x1'),
+            ('2024-02-29', 'c1', 'l0', 'p1', 'l1a', 'x1'),
+            ('2024-02-29', 'c1', 'l0', 'p1', 'l1b', 'x2'),
+        ])
+
+    def test_create_bridge_rejects_disconnected_path(self):
+        url = reverse('create_bridge', args=[self.project.pk])
+        data = {
+            'project': self.project.pk, 'name': 'Quebrada', 'start_hub': self.hubs[0].pk,
+            'snapshot_table': 'AS_OF_DATE', 'snapshot_column': 'snapshot_date',
+            'steps-TOTAL_FORMS': 1, 'steps-INITIAL_FORMS': 0,
+            'steps-0-link': self.links[1].pk, 'steps-0-hub': self.hubs[2].pk,
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Bridge.objects.filter(name='Quebrada').exists())
+
+        data.update({'name': 'Valida', 'steps-0-link': self.links[0].pk, 'steps-0-hub': self.hubs[1].pk})
+        response = self.client.post(url, data)
+        self.assertRedirects(response, reverse('project_detail', args=[self.project.pk]))
+        self.assertEqual(Bridge.objects.get(name='Valida').steps.count(), 1)
+
+    def test_repeated_entities_are_rejected_with_one_membership_query(self):
+        # Hub_0 -> Link_0 -> Hub_1 -> Link_0 -> Hub_0 colidiria as colunas HK_Link_0 e HK_Hub_0
+        steps = [(self.links[0], self.hubs[1]), (self.links[0], self.hubs[0])]
+        with CaptureQueriesContext(connection) as queries:
+            errors = bridge_path_errors(self.hubs[0], steps)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(errors, [
+            'Passo 2: o link Link 0 já aparece no caminho.',
+            'Passo 2: o hub Hub 0 já aparece no caminho.',
+        ])
+
+        BridgeStep.objects.create(bridge=self.bridge, position=2, link=self.links[0], hub=self.hubs[0])
+        ddl = build_ddl(load_project_graph(self.project))
+        self.assertNotIn('CREATE TABLE BR_Cadeia', ddl)
+        self.assertIn('-- BR_Cadeia ignorada: caminho vazio, repetido', ddl)
+
+
+class StagingProjectMixin:
+    """Projeto com dois hubs, um link e um satellite lidos de duas tabelas de staging."""
+
+    def setUp(self):
+        self.project = Project.objects.create(name='Vendas')
+        cliente = Hub.objects.create(project=self.project, name='Cliente', business_key='cpf')
+        pedido = Hub.objects.create(project=self.project, name='Pedido', business_key='numero')
+        link = Link.objects.create(project=self.project, name='Cliente Pedido', staging_table='STG_PEDIDOS')
+        link.hubs.set([cliente, pedido])
+        Satellite.objects.create(
+            project=self.project, name='Cliente Dados', hub=cliente, attributes={'nome': 'string'}, staging_table='STG_CLIENTES',
+        )
+        Hub.objects.filter(pk=cliente.pk).update(staging_table='STG_CLIENTES')
+        Hub.objects.filter(pk=pedido.pk).update(staging_table='STG_PEDIDOS')
+
+    def connect(self):
+        connection = sqlite3.connect(':memory:')
+        connection.create_function('MD5', 1, lambda value: hashlib.md5(value.encode()).hexdigest())
+        connection.executescript(build_ddl(load_project_graph(self.project)))
+        connection.executescript('''
+            CREATE TABLE STG_CLIENTES (cpf TEXT, nome TEXT, load_date TEXT, record_source TEXT);
+            CREATE TABLE STG_PEDIDOS (cpf TEXT, numero TEXT, load_date TEXT, record_source TEXT);
+        ''')
+        return connection
+
+    def load(self, connection, clientes, pedidos):
+        connection.executescript('DELETE FROM STG_CLIENTES; DELETE FROM STG_PEDIDOS;')
+        connection.executemany('INSERT INTO STG_CLIENTES VALUES (?, ?, ?, ?)', clientes)
+        connection.executemany('INSERT INTO STG_PEDIDOS VALUES (?, ?, ?, ?)', pedidos)
+        connection.executescript(build_load_sql(load_project_graph(self.project)))
+
+
+class StagingLoadTests(StagingProjectMixin, TestCase):
+    def test_loads_are_idempotent_and_version_satellites(self):
+        connection = self.connect()
+        clientes = [('1', 'Ana', '2024-01-01', 'crm'), (' 1 ', 'Ana', '2024-01-01', 'crm'), ('2', 'Bia', '2024-01-01', 'crm')]
+        pedidos = [('1', 'P1', '2024-01-01', 'erp'), ('1', 'P1', '2024-01-01', 'erp')]
+        self.load(connection, clientes, pedidos)
+        self.load(connection, clientes, pedidos)
+        count = lambda table: connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        self.assertEqual(count('H_Cliente'), 2)
+        self.assertEqual(count('H_Pedido'), 1)
+        self.assertEqual(count('L_Cliente_Pedido'), 1)
+        self.assertEqual(count('S_Cliente_Dados'), 2)
+
+        # Mudança de atributo: nova versão corrente e a anterior encerrada
+        self.load(connection, [('1', 'Ana Maria', '2024-02-01', 'crm')], [])
+        rows = connection.execute(
+            "SELECT nome, valid_from, valid_to, is_current FROM S_Cliente_Dados "
+            "WHERE nome LIKE 'Ana%' ORDER BY valid_from"
+        ).fetchall()
+        self.assertEqual(rows, [('Ana', '2024-01-01', '2024-02-01', 0), ('Ana Maria', '2024-02-01', None, 1)])
+
+        # Versões repetidas em sequência não geram linhas; a volta a um
+        # valor anterior, sim
+        self.load(connection, [('1', 'Ana Maria', '2024-03-01', 'crm'), ('1', 'Ana', '2024-04-01', 'crm'),
+                               ('1', 'Ana', '2024-05-01', 'crm'), ('1', 'Ana Maria', '2024-06-01', 'crm')], [])
+        rows = connection.execute(
+            "SELECT nome, valid_from, is_current FROM S_Cliente_Dados WHERE nome LIKE 'Ana%' ORDER BY valid_from"
+        ).fetchall()
+        connection.close()
+        self.assertEqual(rows, [('Ana', '2024-01-01', 0), ('Ana Maria', '2024-02-01', 0),
+                                ('Ana', '2024-04-01', 0), ('Ana Maria', '2024-06-01', 1)])
+
+    def test_reloading_a_batch_with_history_is_idempotent(self):
+        connection = self.connect()
+        # Duas versões no mesmo load_date: só uma entra
+        clientes = [('1', 'Ana', '2024-01-01', 'crm'), ('1', 'Ana Maria', '2024-02-01', 'crm'),
+                    ('1', 'Ana M.', '2024-02-01', 'crm')]
+        self.load(connection, clientes, [])
+        first = connection.execute('SELECT * FROM S_Cliente_Dados ORDER BY valid_from').fetchall()
+        self.load(connection, clientes, [])
+        second = connection.execute('SELECT * FROM S_Cliente_Dados ORDER BY valid_from').fetchall()
+        connection.close()
+        self.assertEqual(len(first), 2)
+        self.assertEqual(first, second)
+
+    def test_hash_expression_per_dialect(self):
+        self.assertEqual(
+            get_dialect('ansi').hash_expression(['s.a', 's.b']),
+            "MD5(COALESCE(UPPER(TRIM(CAST(s.a AS VARCHAR))), '^^') || '||' || "
+            "COALESCE(UPPER(TRIM(CAST(s.b AS VARCHAR))), '^^'))",
+        )
+        sqlserver = get_dialect('sqlserver').hash_expression(['s.a', 's.b'], 'sha256', 'binary')
+        self.assertTrue(sqlserver.startswith("HASHBYTES('SHA2_256', CONCAT("))
+        self.assertIn('SHA2_BINARY(', get_dialect('snowflake').hash_expression(['s.a'], 'sha256', 'binary'))
+
+
+class VaultLoaderTests(StagingProjectMixin, TestCase):
+    def write_staging(self, directory, clientes, pedidos):
+        Path(directory, 'STG_CLIENTES.csv').write_text(
+            'cpf,nome,load_date,record_source\n' + ''.join(f'{",".join(row)}\n' for row in clientes)
+        )
+        Path(directory, 'STG_PEDIDOS.jsonl').write_text(''.join(
+            json.dumps(dict(zip(('cpf', 'numero', 'load_date', 'record_source'), row))) + '\n'
+            for row in pedidos
+        ))
+
+    def test_load_vault_command_matches_generated_sql(self):
+        clientes = [('1', 'Ana', '2024-01-01', 'crm'), ('2', 'Bia', '2024-01-01', 'crm')]
+        pedidos = [('1', 'P1', '2024-01-01', 'erp'), ('2', 'P1', '2024-01-01', 'erp')]
+        with tempfile.TemporaryDirectory() as directory:
+            self.write_staging(directory, clientes, pedidos)
+            output = io.StringIO()
+            state_dir = str(Path(directory, 'state'))
+            call_command('load_vault', str(self.project.pk), directory, '--chunk-size', '1',
+                         '--state-dir', state_dir, stdout=output)
+            self.assertIn('H_Cliente: 2 lidas, 2 gravadas', output.getvalue())
+            self.assertIn('linhas/s', output.getvalue())
+
+            self.write_staging(directory, [('1', 'Ana Maria', '2024-02-01', 'crm')], [])
+            # Segunda carga: só a mudança de atributo gera linhas novas; o
+            # estado corrente vem do snapshot gravado na primeira
+            self.assertTrue(Path(state_dir, 'S_Cliente_Dados.state').exists())
+            call_command('load_vault', self.project.name, directory, '--state-dir', state_dir, stdout=io.StringIO())
+
+            target = sqlite3.connect(Path(directory, 'vault.sqlite3'))
+            loaded = {
+                table: sorted(target.execute(f'SELECT * FROM {table}').fetchall(), key=repr)
+                for table in ('H_Cliente', 'H_Pedido', 'L_Cliente_Pedido', 'S_Cliente_Dados')
+            }
+            target.close()
+
+        # O SQL de carga gerado produz as mesmas linhas e hash keys
+        connection = self.connect()
+        self.load(connection, clientes, pedidos)
+        self.load(connection, [('1', 'Ana Maria', '2024-02-01', 'crm')], [])
+        for table, rows in loaded.items():
+            with self.subTest(table=table):
+                expected = sorted(connection.execute(f'SELECT * FROM {table}').fetchall(), key=repr)
+                self.assertEqual(rows, expected)
+        connection.close()
+
+    def test_failed_chunk_leaves_state_index_untouched(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.write_staging(directory, [('1', 'Ana', '2024-01-01', 'crm')], [])
+            target = sqlite3.connect(Path(directory, 'vault.sqlite3'))
+            loader = VaultLoader(self.project, target, directory)
+            loader.create_target()
+            target.execute(
+                "CREATE TRIGGER falha BEFORE INSERT ON S_Cliente_Dados BEGIN SELECT RAISE(ABORT, 'falha'); END"
+            )
+            with self.assertRaises(sqlite3.IntegrityError):
+                list(loader.load())
+            state = loader.states['S_Cliente_Dados']
+            count = target.execute('SELECT COUNT(*) FROM S_Cliente_Dados').fetchone()[0]
+            target.close()
+        # Rollback do bloco: nem o banco nem o índice registram a versão
+        self.assertEqual(count, 0)
+        self.assertEqual(len(state), 0)
+
+    def test_replaying_older_staging_keeps_history_and_one_current_row(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.write_staging(directory, [('1', 'Ana', '2024-01-01', 'crm')], [])
+            call_command('load_vault', str(self.project.pk), directory, stdout=io.StringIO())
+            self.write_staging(directory, [('1', 'Ana Maria', '2024-02-01', 'crm')], [])
+            call_command('load_vault', str(self.project.pk), directory, stdout=io.StringIO())
+            # Versão mais antiga que a corrente (e diferente dela) chega depois
+            self.write_staging(directory, [('1', 'Ana B', '2024-01-15', 'crm'), ('1', 'Ana', '2024-01-01', 'crm')], [])
+            output = io.StringIO()
+            call_command('load_vault', str(self.project.pk), directory, stdout=output)
+            self.assertIn('2 versões anteriores à linha corrente ignoradas', output.getvalue())
+
+            target = sqlite3.connect(Path(directory, 'vault.sqlite3'))
+            rows = target.execute(
+                'SELECT nome, valid_from, valid_to, is_current FROM S_Cliente_Dados ORDER BY valid_from'
+            ).fetchall()
+            target.close()
+        self.assertEqual(rows, [
+            ('Ana', '2024-01-01', '2024-02-01', 0),
+            ('Ana Maria', '2024-02-01', None, 1),
+        ])
+
+
+class HashingTests(TestCase):
+    def test_batches_match_row_hashes_and_sql_normalization(self):
+        columns = [['1', ' a ', None], ['x', 'B', 'c']]
+        digests = hash_batch(columns)
+        self.assertEqual(digests[1], hash_values([' a ', 'B']))
+        self.assertEqual(digests[1], hashlib.md5(b'A||B').hexdigest())
+        self.assertEqual(digests[2], hashlib.md5(b'^^||C').hexdigest())
+        self.assertEqual(hash_batch([['1']], 'sha256', 'binary'), [hashlib.sha256(b'1').digest()])
+        # TRIM só remove espaços: tabulações e quebras de linha entram no hash
+        self.assertEqual(hash_batch([[' \ta\r\n ']]), [hashlib.md5(b'\tA\r\n').hexdigest()])
+
+    def test_process_pool_matches_serial(self):
+        columns = [[f'{i}' for i in range(250)], [f'v{i % 7}' for i in range(250)]]
+        with patch('modeler.hashing.os.cpu_count', return_value=2):
+            with BatchHasher(workers=2, batch_size=40) as hasher:
+                self.assertEqual(hasher.hash(columns), hash_batch(columns))
+                self.assertIsNotNone(hasher._pool)
+        with patch('modeler.hashing.os.cpu_count', return_value=1):
+            with BatchHasher(workers=4, batch_size=40) as hasher:
+                self.assertEqual(hasher.hash(columns), hash_batch(columns))
+                self.assertIsNone(hasher._pool)
+
+
+class SyntheticStagingTests(StagingProjectMixin, TestCase):
+    def synth(self, directory, *args):
+        call_command('synth_vault', str(self.project.pk), directory, '--rows', '500', '--keys', '50',
+                     '--chunk-size', '64', *args, stdout=io.StringIO())
+
+    def test_generation_is_deterministic_and_loadable(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            self.synth(first, '--seed', '7', '--skew', '1.2')
+            self.synth(second, '--seed', '7', '--skew', '1.2')
+            for name in ('STG_CLIENTES.csv', 'STG_PEDIDOS.csv'):
+                self.assertEqual(Path(first, name).read_bytes(), Path(second, name).read_bytes())
+            header = Path(first, 'STG_CLIENTES.csv').read_text().splitlines()[0]
+            self.assertEqual(header, 'load_date,record_source,cpf,nome')
+
+            call_command('load_vault', str(self.project.pk), first, stdout=io.StringIO())
+            target = sqlite3.connect(Path(first, 'vault.sqlite3'))
+            hubs = target.execute('SELECT COUNT(*) FROM H_Cliente').fetchone()[0]
+            versions = target.execute('SELECT COUNT(*) FROM S_Cliente_Dados').fetchone()[0]
+            target.close()
+        self.assertLessEqual(hubs, 50)
+        # Com taxa de mudança de 10% há mais versões que clientes, mas bem menos que linhas
+        self.assertGreater(versions, hubs)
+        self.assertLess(versions, 200)
+
+    def test_change_rate_zero_keeps_one_version_per_key(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.synth(directory, '--format', 'jsonl', '--change-rate-for', 'Cliente Dados=0')
+            call_command('load_vault', str(self.project.pk), directory, stdout=io.StringIO())
+            target = sqlite3.connect(Path(directory, 'vault.sqlite3'))
+            counts = target.execute('SELECT COUNT(*), COUNT(DISTINCT HK_Cliente) FROM S_Cliente_Dados').fetchone()
+            target.close()
+        self.assertEqual(counts[0], counts[1])
+
+    def test_reloading_another_seed_keeps_one_current_row_per_key(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.synth(directory, '--seed', '7')
+            call_command('load_vault', str(self.project.pk), directory, stdout=io.StringIO())
+            # Segundo lote com as mesmas datas: versões repetidas, mais antigas e do mesmo load_date
+            self.synth(directory, '--seed', '8')
+            call_command('load_vault', str(self.project.pk), directory, stdout=io.StringIO())
+            target = sqlite3.connect(Path(directory, 'vault.sqlite3'))
+            current = target.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT HK_Cliente) FROM S_Cliente_Dados WHERE is_current = 1'
+            ).fetchone()
+            open_rows = target.execute('SELECT COUNT(*) FROM S_Cliente_Dados WHERE valid_to IS NULL').fetchone()[0]
+            target.close()
+        self.assertEqual(current[0], current[1])
+        self.assertEqual(open_rows, current[0])
+
+
+class CurrentStateIndexTests(TestCase):
+    def digest(self, value):
+        return hashlib.md5(value.encode()).hexdigest()
+
+    def test_lookup_updates_and_snapshot(self):
+        rows = [(self.digest(f'k{i}'), self.digest(f'v{i}')) for i in range(50)]
+        index = CurrentStateIndex.from_rows(rows, compact_threshold=8)
+        self.assertEqual(len(index), 50)
+        self.assertEqual(index.nbytes, 50 * (16 + 16 + DATE_SIZE))
+        self.assertEqual(index.get(self.digest('k7')), bytes.fromhex(self.digest('v7')))
+        self.assertIsNone(index.get(self.digest('novo')))
+
+        for i in range(20):
+            index.set(self.digest(f'n{i}'), self.digest('x'))
+        index.set(self.digest('k7'), self.digest('y'), '2024-05-01')
+        self.assertEqual(len(index), 70)
+        self.assertEqual(index.lookup(self.digest('k7')), (bytes.fromhex(self.digest('y')), '2024-05-01'))
+        keys = [key for key, _, _ in index.items()]
+        self.assertEqual(keys, sorted(keys))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory, 'S_X.state')
+            index.save(path)
+            restored = CurrentStateIndex.load(path)
+        self.assertEqual(list(restored.items()), list(index.items()))
+
+    def test_detect_changes_emits_new_versions_and_end_dates(self):
+        known, unchanged, new = self.digest('a'), self.digest('b'), self.digest('c')
+        index = CurrentStateIndex.from_rows([
+            (known, self.digest('v1'), '2024-01-01'), (unchanged, self.digest('v1'), '2024-01-01'),
+        ])
+        changes = index.detect_changes({
+            known: [('2024-03-01', self.digest('v3'), 'p3'), ('2024-02-01', self.digest('v2'), 'p2')],
+            unchanged: [('2024-02-01', self.digest('v1'), 'p')],
+            new: [('2024-02-01', self.digest('v1'), 'p'), ('2024-02-02', self.digest('v1'), 'p')],
+        })
+        self.assertEqual(changes.end_dates, [('2024-02-01', known)])
+        self.assertEqual(changes.inserts, [
+            (known, self.digest('v2'), '2024-02-01', '2024-03-01', False, 'p2'),
+            (known, self.digest('v3'), '2024-03-01', None, True, 'p3'),
+            (new, self.digest('v1'), '2024-02-01', None, True, 'p'),
+        ])
+        # O índice só muda quando o lote gravado é aplicado
+        self.assertEqual(index.lookup(known), (bytes.fromhex(self.digest('v1')), '2024-01-01'))
+        index.apply(changes)
+        self.assertEqual(index.lookup(known), (bytes.fromhex(self.digest('v3')), '2024-03-01'))
+        self.assertEqual(index.detect_changes({new: [('2024-02-03', self.digest('v1'), 'p')]}).inserts, [])
+
+    def test_older_versions_never_replace_the_current_row(self):
+        key = self.digest('a')
+        index = CurrentStateIndex.from_rows([(key, self.digest('v2'), '2024-02-01')])
+        # Versão anterior à corrente: ignorada, sem encerrar nem substituir a linha corrente
+        changes = index.detect_changes({key: [('2024-01-15', self.digest('v1'), 'p1')]})
+        self.assertEqual((changes.inserts, changes.end_dates, changes.replacements, changes.stale), ([], [], [], 1))
+        # Mesmo load_date da corrente: substitui só a linha corrente
+        changes = index.detect_changes({key: [('2024-02-01', self.digest('v3'), 'p3')]})
+        self.assertEqual(changes.replacements, [(key, '2024-02-01')])
+        self.assertEqual(changes.end_dates, [])
+        self.assertEqual(changes.inserts, [(key, self.digest('v3'), '2024-02-01', None, True, 'p3')])
+
+
+class BenchmarkTests(TestCase):
+    def test_run_benchmarks_measures_every_view(self):
+        results = run_benchmarks(sizes=[5], repeat=1)
+        self.assertEqual(set(results['5']), set(BENCHMARK_VIEWS))
+        for metrics in results['5'].values():
+            self.assertEqual(set(metrics), set(METRICS))
+        self.assertFalse(Project.objects.exists())
+
+    def test_delete_runs_are_rolled_back(self):
+        project = create_synthetic_project('Benchmark', 5)
+        method, url = BENCHMARK_VIEWS['delete_hub']
+        runs = [measure(Client(), method, url(project)) for _ in range(2)]
+        self.assertEqual(runs[0]['queries'], runs[1]['queries'])
+        self.assertEqual(project.hubs.count(), 5)
+        self.assertEqual(project.satellites.count(), 14)
+
+    def test_compare_results_flags_regressions(self):
+        baseline = {'100': {'visualize': {'wall_ms': 100, 'queries': 8, 'peak_kb': 1000}}}
+        within = {'100': {'visualize': {'wall_ms': 115, 'queries': 8, 'peak_kb': 1100}}}
+        self.assertEqual(compare_results(within, baseline, threshold=0.2), [])
+
+        worse = {'100': {'visualize': {'wall_ms': 130, 'queries': 9, 'peak_kb': 1000}}}
+        regressions = compare_results(worse, baseline, threshold=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(any('queries' in regression for regression in regressions))
+
+
+class ProjectRevisionTests(TestCase):
+    def revision(self, project):
+        return Project.objects.values_list('revision', flat=True).get(pk=project.pk)
+
+    def test_child_changes_bump_revision(self):
+        project = Project.objects.create(name='Vendas')
+        hub = Hub.objects.create(project=project, name='Cliente', business_key='cpf')
+        other = Hub.objects.create(project=project, name='Pedido', business_key='numero')
+        self.assertEqual(self.revision(project), 2)
+
+        link = Link.objects.create(project=project, name='Cliente Pedido')
+        link.hubs.set([hub, other])
+        self.assertEqual(self.revision(project), 4)
+
+        project.name = 'Vendas 2'
+        project.save()
+        self.assertEqual(project.revision, 5)
+
+        link.delete()
+        self.assertEqual(self.revision(project), 6)
+
+    def test_conditional_get_returns_not_modified(self):
+        project = build_project(hubs=2)
+        for url_name in ('project_detail', 'visualize', 'view_ddl', 'generate_ddl'):
+            with self.subTest(view=url_name):
+                url = reverse(url_name, args=[project.pk])
+                response = self.client.get(url)
+                etag = response['ETag']
+                self.assertIn('Last-Modified', response)
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+                Hub.objects.create(project=project, name=f'Novo {url_name}', business_key='id')
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_pending_messages_skip_not_modified(self):
+        project = Project.objects.create(name='Sem links')
+        url = reverse('project_detail', args=[project.pk])
+        etag = self.client.get(url)['ETag']
+        # Redireciona com aviso sem mudar a revisão; a revalidação precisa exibi-lo
+        response = self.client.get(reverse('create_bridge', args=[project.pk]))
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'pelo menos um Link')
+        self.assertNotIn('ETag', response)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
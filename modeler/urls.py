@@ -8,6 +8,10 @@ urlpatterns = [
     path('project/<int:pk>/', views.project_detail, name='project_detail'),
     path('project/<int:pk>/edit/', views.ProjectUpdateView.as_view(), name='project_update'),
     path('project/<int:pk>/delete/', views.ProjectDeleteView.as_view(), name='project_delete'),
+    path('project/<int:pk>/import/', views.import_model, name='import_model'),
+    path('project/<int:pk>/export/', views.export_project, name='export_project'),
+    path('project/<int:pk>/clone/', views.clone_project, name='clone_project'),
+    path('project/<int:pk>/api/batch/', views.api_batch, name='api_batch'),
 
     # Hub URLs
     path('project/<int:project_pk>/hub/new/', views.create_hub, name='create_hub'),
@@ -23,9 +27,20 @@ urlpatterns = [
     path('project/<int:project_pk>/satellite/new/', views.create_satellite, name='create_satellite'),
     path('satellite/<int:pk>/edit/', views.update_satellite, name='update_satellite'),
     path('satellite/<int:pk>/delete/', views.delete_satellite, name='delete_satellite'),
+    path('satellite/<int:pk>/split/', views.analyze_satellite_split, name='analyze_satellite_split'),
+    path('satellite/<int:pk>/split/apply/', views.split_satellite, name='split_satellite'),
+
+    # PIT URLs
+    path('project/<int:project_pk>/pit/new/', views.create_pit, name='create_pit'),
+    path('pit/<int:pk>/edit/', views.update_pit, name='update_pit'),
+    path('pit/<int:pk>/delete/', views.delete_pit, name='delete_pit'),
+    path('project/<int:project_pk>/bridge/new/', views.create_bridge, name='create_bridge'),
+    path('bridge/<int:pk>/edit/', views.update_bridge, name='update_bridge'),
+    path('bridge/<int:pk>/delete/', views.delete_bridge, name='delete_bridge'),
 
     # Visualization URLs
     path('project/<int:pk>/visualize/', views.visualize, name='visualize'),
     path('project/<int:pk>/view_ddl/', views.view_ddl, name='view_ddl'),
     path('project/<int:pk>/generate_ddl/', views.generate_ddl, name='generate_ddl'),
+    path('project/<int:pk>/load_sql/', views.view_load_sql, name='view_load_sql'),
 ] 
\ No newline at end of file
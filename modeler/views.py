@@ -1,9 +1,30 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Hub, Link, Satellite, Project
-from .forms import HubForm, LinkForm, SatelliteForm, AttributeForm
-from django.contrib.contenttypes.models import ContentType
+from .models import Hub, Link, Satellite, Project, PointInTime, Bridge, BridgeStep
+from .forms import (
+    ProjectForm, HubForm, LinkForm, SatelliteForm, AttributeForm, PointInTimeForm,
+    BridgeForm, BridgeStepForm, SampleFileForm, SnapshotFilesForm, ModelFileForm, ProjectCloneForm,
+    DiagramScopeForm, bridge_path_errors,
+)
+from .graph import load_neighborhood_graph, load_project_graph
+from .cache import artifact_cache
+from .ddl import build_ddl, iter_ddl, iter_encoded
+from .load_sql import build_load_sql
+from .batch import MAX_OPERATIONS, apply_batch
+from .deletion import DeleteImpact, delete_project
+from .export import iter_project_json
+from .importer import ModelImportError, import_model_upload
+from .loader.readers import iter_upload_records
+from .profiling import profile_upload
+from .split_advisor import ChangeRateAnalyzer, business_keys_of, group_names, recommend_split, row_overhead
 from django.contrib import messages
-from django.http import HttpResponse
+from django.db import transaction
+from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.middleware.csrf import get_token
+from django.views.decorators.http import condition, require_http_methods
+import csv
+import json
 import re
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.urls import reverse_lazy
@@ -13,24 +34,101 @@ from django.forms import formset_factory
 AttributeFormSet = formset_factory(AttributeForm, extra=1)
 # Formset para edição (sem campos extras)
 AttributeEditFormSet = formset_factory(AttributeForm, extra=0)
+# Passos (link, hub alcançado) do caminho de uma Bridge
+BridgeStepFormSet = formset_factory(BridgeStepForm, extra=1)
+BridgeStepEditFormSet = formset_factory(BridgeStepForm, extra=0)
+# Linhas lidas do arquivo de amostra ao inferir tipos
+PROFILE_MAX_ROWS = 200000
+# Acima disto o diagrama completo trava o navegador; pede-se um recorte
+MAX_DIAGRAM_ENTITIES = 300
+# Hubs por página na escolha do recorte
+DIAGRAM_HUBS_PER_PAGE = 50
 
 # Create your views here.
 
+def get_project(request, pk):
+    """Busca o projeto uma única vez por requisição.
+
+    Compartilhado entre as funções de ETag/Last-Modified e a própria view.
+    """
+    project = getattr(request, '_modeler_project', None)
+    if project is None or project.pk != pk:
+        project = get_object_or_404(Project, pk=pk)
+        request._modeler_project = project
+    return project
+
+def project_condition(artifact):
+    """Habilita GET condicional (ETag / Last-Modified / 304) pela revisão do projeto.
+
+    Com mensagens pendentes não há validadores: a página precisa ser
+    renderizada para exibi-las, mesmo sem mudança no projeto.
+    """
+    def etag(request, pk, **kwargs):
+        if len(messages.get_messages(request)):
+            return None
+        project = get_project(request, pk)
+        return f'"{artifact}-{project.pk}-{project.revision}"'
+
+    def last_modified(request, pk, **kwargs):
+        if len(messages.get_messages(request)):
+            return None
+        return get_project(request, pk).updated_at
+
+    def decorator(view):
+        view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+        # Obriga o navegador/proxy a revalidar antes de reutilizar a cópia
+        return cache_control(no_cache=True)(view)
+    return decorator
+
 def index(request):
     hubs = Hub.objects.all()
     links = Link.objects.all()
-    satellites = Satellite.objects.all().select_related('content_type')
+    satellites = Satellite.objects.select_related('hub', 'link').prefetch_related('columns')
     return render(request, "modeler/index.html", {
         "hubs": hubs, 
         "links": links,
         "satellites": satellites
     })
 
+def profile_sample(request):
+    """Perfila o arquivo de amostra enviado.
+
+    Retorna o formulário da amostra e o perfil (None se o arquivo for inválido).
+    """
+    sample_form = SampleFileForm(request.POST, request.FILES)
+    if not sample_form.is_valid():
+        return sample_form, None
+    try:
+        return sample_form, profile_upload(sample_form.cleaned_data['sample'], PROFILE_MAX_ROWS)
+    except (UnicodeDecodeError, ValueError, csv.Error) as error:
+        messages.error(request, f'Não foi possível ler o arquivo de amostra: {error}')
+        return sample_form, None
+
+def posted_initial(request, form_class, project):
+    """Valores já preenchidos no formulário, para reexibi-lo após perfilar a amostra."""
+    initial = {name: request.POST[name] for name in form_class.base_fields if name in request.POST}
+    initial['project'] = project.pk
+    return initial
+
 def create_hub(request, project_pk):
     """Cria um novo Hub."""
     project = get_object_or_404(Project, pk=project_pk)
-    
-    if request.method == 'POST':
+    sample_form, profile = SampleFileForm(), None
+    
+    if request.method == 'POST' and 'profile_sample' in request.POST:
+        # Sugere tipo e tamanho da chave de negócio a partir da amostra
+        sample_form, profile = profile_sample(request)
+        initial = posted_initial(request, HubForm, project)
+        if profile and profile.columns:
+            business_key = initial.get('business_key') or next(iter(profile.columns))
+            column = profile.columns.get(business_key)
+            if column is None:
+                messages.warning(request, f'A coluna {business_key} não está no arquivo de amostra.')
+            else:
+                tipo, length = column.business_key_suggestion()
+                initial.update(business_key=business_key, business_key_type=tipo, business_key_length=length)
+        form = HubForm(initial=initial)
+    elif request.method == 'POST':
         form = HubForm(request.POST)
         if form.is_valid():
             hub = form.save()
@@ -40,6 +138,8 @@ def create_hub(request, project_pk):
     
     return render(request, 'modeler/create_hub.html', {
         'form': form,
+        'sample_form': sample_form,
+        'profile': profile,
         'project': project
     })
 
@@ -59,26 +159,21 @@ def update_hub(request, pk):
 
 def delete_hub(request, pk):
     hub = get_object_or_404(Hub, pk=pk)
-    project_id = hub.project.pk
+    project_id = hub.project_id
     
-    # Verifica se há Links ou Satellites dependentes
-    links = hub.links.all()
-    satellites = Satellite.objects.filter(
-        content_type=ContentType.objects.get_for_model(Hub),
-        object_id=hub.id
-    )
+    # Impacto completo: links do hub e todos os dependentes de ambos
+    impact = DeleteImpact(hub.project, hubs=[hub.pk])
     
     if request.method == 'POST':
         if 'confirm' in request.POST:
             # Deleta o hub e suas dependências
-            hub.delete()
+            impact.delete()
             messages.success(request, 'Hub e seus objetos dependentes foram deletados com sucesso!')
             return redirect('project_detail', pk=project_id)
     
     context = {
         'hub': hub,
-        'links': links,
-        'satellites': satellites,
+        'impact': impact,
     }
     return render(request, 'modeler/hub_confirm_delete.html', context)
 
@@ -102,31 +197,77 @@ def create_link(request, project_pk):
         'project': project
     })
 
+def attribute_columns(formset):
+    """Colunas do catálogo a partir do formset de atributos (nomes repetidos:
+    vale o último)."""
+    columns = {}
+    for f in formset.cleaned_data:
+        if f and not f.get('DELETE', False):
+            name = f['name'].strip()
+            columns[name] = {
+                'name': name,
+                'tipo': f['tipo'].strip(),
+                'length': f.get('length'),
+                'precision': f.get('precision'),
+                'scale': f.get('scale'),
+                'nullable': not f.get('not_null'),
+            }
+    return list(columns.values())
+
+def attribute_initial(satellite):
+    """Valores iniciais do formset a partir do catálogo do satellite."""
+    return [
+        {
+            'name': column.name,
+            # 'float' é o nome antigo de decimal
+            'tipo': 'decimal' if column.tipo == 'float' else column.tipo,
+            'length': column.length,
+            'precision': column.precision,
+            'scale': column.scale,
+            'not_null': not column.nullable,
+        }
+        for column in satellite.columns.all()
+    ]
+
+def parent_business_keys(project, parent):
+    """Chaves de negócio do pai ('hub-<id>' ou 'link-<id>'), que não são atributos."""
+    kind, _, object_id = (parent or '').partition('-')
+    if not object_id.isdigit():
+        return set()
+    hubs = Hub.objects.filter(project=project)
+    hubs = hubs.filter(pk=object_id) if kind == 'hub' else hubs.filter(links=object_id)
+    return set(hubs.values_list('business_key', flat=True))
+
 def create_satellite(request, project_pk):
     """Cria um novo Satellite."""
     project = get_object_or_404(Project, pk=project_pk)
-    
-    if request.method == 'POST':
+    sample_form, profile = SampleFileForm(), None
+    
+    if request.method == 'POST' and 'profile_sample' in request.POST:
+        # Preenche os atributos com os tipos mais estreitos vistos na amostra,
+        # sem as colunas de auditoria e as chaves do pai
+        sample_form, profile = profile_sample(request)
+        initial = posted_initial(request, SatelliteForm, project)
+        form = SatelliteForm(initial=initial)
+        exclude = {initial.get('load_date'), initial.get('record_source')}
+        exclude |= parent_business_keys(project, initial.get('parent'))
+        suggestions = profile.suggestions(exclude) if profile else []
+        if suggestions:
+            formset = AttributeEditFormSet(prefix='attributes', initial=suggestions)
+        else:
+            formset = AttributeFormSet(prefix='attributes')
+    elif request.method == 'POST':
         form = SatelliteForm(request.POST, initial={'project': project.pk})
         formset = AttributeFormSet(request.POST, prefix='attributes')
         if form.is_valid() and formset.is_valid():
             satellite = form.save(commit=False)
             satellite.project = project
-            parent_str = form.cleaned_data['parent']
-            content_type_id, object_id = parent_str.split('-')
-            satellite.content_type = ContentType.objects.get_for_id(int(content_type_id))
-            satellite.object_id = object_id
+            satellite.set_parent_value(form.cleaned_data['parent'])
             
-            # Converte o formset em um dicionário de atributos
-            attributes_dict = {}
-            for f in formset.cleaned_data:
-                if f and not f.get('DELETE', False):
-                    name = f['name'].strip()
-                    tipo = f['tipo'].strip()
-                    attributes_dict[name] = tipo
-            
-            satellite.attributes = attributes_dict
-            satellite.save()
+            # Grava o satellite e o catálogo de atributos em lote
+            with transaction.atomic():
+                satellite.save()
+                satellite.set_columns(attribute_columns(formset))
             messages.success(request, 'Satellite criado com sucesso!')
             return redirect('project_detail', pk=project.pk)
         else:
@@ -144,6 +285,8 @@ def create_satellite(request, project_pk):
     return render(request, 'modeler/create_satellite.html', {
         'form': form,
         'formset': formset,
+        'sample_form': sample_form,
+        'profile': profile,
         'project': project
     })
 
@@ -154,21 +297,11 @@ def update_satellite(request, pk):
         formset = AttributeEditFormSet(request.POST, prefix='attributes')
         if form.is_valid() and formset.is_valid():
             satellite_instance = form.save(commit=False)
-            parent_str = form.cleaned_data['parent']
-            content_type_id, object_id = parent_str.split('-')
-            satellite_instance.content_type = ContentType.objects.get_for_id(int(content_type_id))
-            satellite_instance.object_id = object_id
-            
-            # Converte o formset em um dicionário de atributos
-            attributes_dict = {}
-            for f in formset.cleaned_data:
-                if f and not f.get('DELETE', False):
-                    name = f['name'].strip()
-                    tipo = f['tipo'].strip()
-                    attributes_dict[name] = tipo
+            satellite_instance.set_parent_value(form.cleaned_data['parent'])
             
-            satellite_instance.attributes = attributes_dict
-            satellite_instance.save()
+            with transaction.atomic():
+                satellite_instance.save()
+                satellite_instance.set_columns(attribute_columns(formset))
             messages.success(request, 'Satellite atualizado com sucesso!')
             return redirect('project_detail', pk=satellite.project.pk)
         else:
@@ -177,20 +310,16 @@ def update_satellite(request, pk):
             if formset.errors:
                 messages.error(request, 'Por favor, corrija os erros nos atributos.')
     else:
-        # Obtém o content_type e object_id do parent atual
-        if satellite.content_type and satellite.object_id:
-            initial_parent = f"{satellite.content_type.id}-{satellite.object_id}"
-        else:
+        # Obtém o pai atual no formato do formulário
+        initial_parent = satellite.parent_value
+        if not initial_parent:
             messages.error(request, 'Este Satellite não tem um Hub ou Link pai definido.')
             return redirect('project_detail', pk=satellite.project.pk)
         
         form = SatelliteForm(instance=satellite, initial={'parent': initial_parent, 'project': satellite.project})
         
         # Inicializa o formset com os atributos existentes
-        initial_attributes = [
-            {'name': name, 'tipo': tipo}
-            for name, tipo in satellite.attributes.items()
-        ] if satellite.attributes else []
+        initial_attributes = attribute_initial(satellite)
         
         formset = AttributeEditFormSet(
             prefix='attributes',
@@ -215,6 +344,87 @@ def delete_satellite(request, pk):
     
     return render(request, 'modeler/satellite_confirm_delete.html', {'satellite': satellite})
 
+def analyze_satellite_split(request, pk):
+    """Mede a taxa de mudança dos atributos em snapshots da origem e sugere
+    a divisão do satellite em grupos que mudam em ritmos diferentes."""
+    satellite = get_object_or_404(Satellite.objects.select_related('project', 'hub', 'link'), pk=pk)
+    attributes = list(satellite.columns.values_list('name', flat=True))
+    if len(attributes) < 2:
+        messages.warning(request, 'O satellite precisa de ao menos dois atributos para ser dividido.')
+        return redirect('project_detail', pk=satellite.project_id)
+    advice, names = None, []
+
+    if request.method == 'POST':
+        form = SnapshotFilesForm(request.POST, request.FILES)
+        if form.is_valid():
+            analyzer = ChangeRateAnalyzer(business_keys_of(satellite), attributes)
+            try:
+                # Cada snapshot é lido em uma única passada, sem ser salvo
+                for snapshot in form.cleaned_data['snapshots']:
+                    records = iter_upload_records(snapshot)
+                    try:
+                        analyzer.add_snapshot(records)
+                    finally:
+                        records.close()
+            except (UnicodeDecodeError, ValueError, csv.Error) as error:
+                messages.error(request, f'Não foi possível ler os snapshots: {error}')
+            else:
+                advice = recommend_split(analyzer, row_overhead(satellite.project))
+                taken = set(satellite.project.satellites.exclude(pk=satellite.pk).values_list('name', flat=True))
+                names = group_names(satellite, advice, taken)
+    else:
+        form = SnapshotFilesForm()
+
+    return render(request, 'modeler/satellite_split.html', {
+        'satellite': satellite,
+        'form': form,
+        'advice': advice,
+        'groups': list(zip(names, advice.groups)) if advice else [],
+    })
+
+def posted_groups(request):
+    """Grupos (nome, [atributos]) enviados pelo formulário de divisão."""
+    groups = []
+    while f'group-{len(groups)}-name' in request.POST:
+        prefix = f'group-{len(groups)}'
+        attributes = [name.strip() for name in request.POST.get(f'{prefix}-attributes', '').split(',')]
+        groups.append((request.POST[f'{prefix}-name'].strip(), [name for name in attributes if name]))
+    return groups
+
+def split_groups_errors(satellite, groups):
+    """Valida os grupos da divisão; retorna a lista de mensagens de erro."""
+    errors = []
+    attributes = [name for _, group in groups for name in group]
+    if len([group for _, group in groups if group]) < 2:
+        errors.append('Informe ao menos dois grupos com atributos.')
+    if sorted(attributes) != sorted(satellite.columns.values_list('name', flat=True)):
+        errors.append('Os grupos devem conter cada atributo do satellite exatamente uma vez.')
+    names = [name for name, group in groups if group]
+    if not all(names) or len(set(names)) != len(names):
+        errors.append('Cada grupo precisa de um nome único.')
+    elif satellite.project.satellites.exclude(pk=satellite.pk).filter(name__in=names).exists():
+        errors.append('Já existe um satellite com um dos nomes informados.')
+    return errors
+
+def split_satellite(request, pk):
+    """Cria os satellites dos grupos sob o mesmo pai e remove o original."""
+    satellite = get_object_or_404(Satellite.objects.select_related('project'), pk=pk)
+    if request.method != 'POST':
+        return redirect('analyze_satellite_split', pk=satellite.pk)
+
+    groups = posted_groups(request)
+    errors = split_groups_errors(satellite, groups)
+    if errors:
+        for error in errors:
+            messages.error(request, error)
+        return redirect('analyze_satellite_split', pk=satellite.pk)
+
+    created = satellite.split([(name, group) for name, group in groups if group])
+    messages.success(
+        request, f'Satellite dividido em {", ".join(new.name for new in created)}.'
+    )
+    return redirect('project_detail', pk=satellite.project_id)
+
 def update_link(request, pk):
     link = get_object_or_404(Link, pk=pk)
     if request.method == 'POST':
@@ -231,27 +441,170 @@ def update_link(request, pk):
 
 def delete_link(request, pk):
     link = get_object_or_404(Link, pk=pk)
-    project_id = link.project.pk
+    project_id = link.project_id
     
-    # Verifica se há Satellites dependentes
-    satellites = Satellite.objects.filter(
-        content_type=ContentType.objects.get_for_model(Link),
-        object_id=link.id
-    )
+    # Satellites, PITs e Bridges que dependem do link
+    impact = DeleteImpact(link.project, links=[link.pk])
     
     if request.method == 'POST':
         if 'confirm' in request.POST:
-            # Deleta o link e seus satellites
-            link.delete()
+            # Deleta o link e seus dependentes
+            impact.delete()
             messages.success(request, 'Link e seus satellites foram deletados com sucesso!')
             return redirect('project_detail', pk=project_id)
     
     context = {
         'link': link,
-        'satellites': satellites,
+        'impact': impact,
     }
     return render(request, 'modeler/link_confirm_delete.html', context)
 
+def create_pit(request, project_pk):
+    """Cria uma nova tabela PIT (Point-in-Time)."""
+    project = get_object_or_404(Project, pk=project_pk)
+    
+    if request.method == 'POST':
+        form = PointInTimeForm(request.POST, initial={'project': project.pk})
+        if form.is_valid():
+            pit = form.save(commit=False)
+            pit.project = project
+            pit.set_parent_value(form.cleaned_data['parent'])
+            pit.save()
+            messages.success(request, 'PIT criada com sucesso!')
+            return redirect('project_detail', pk=project.pk)
+        else:
+            messages.error(request, 'Por favor, corrija os erros no formulário.')
+    else:
+        form = PointInTimeForm(initial={'project': project.pk})
+    
+    if len(form.fields['parent'].choices) <= 1:
+        return render(request, 'modeler/error_no_parents.html', {'project': project})
+    
+    return render(request, 'modeler/pit_form.html', {
+        'form': form,
+        'project': project
+    })
+
+def update_pit(request, pk):
+    pit = get_object_or_404(PointInTime, pk=pk)
+    if request.method == 'POST':
+        form = PointInTimeForm(request.POST, instance=pit, initial={'project': pit.project})
+        if form.is_valid():
+            pit = form.save(commit=False)
+            pit.set_parent_value(form.cleaned_data['parent'])
+            pit.save()
+            messages.success(request, 'PIT atualizada com sucesso!')
+            return redirect('project_detail', pk=pit.project.pk)
+        else:
+            messages.error(request, 'Por favor, corrija os erros no formulário.')
+    else:
+        initial_parent = pit.parent_value
+        form = PointInTimeForm(instance=pit, initial={'parent': initial_parent, 'project': pit.project})
+    return render(request, 'modeler/pit_form.html', {
+        'form': form,
+        'pit': pit,
+        'project': pit.project
+    })
+
+def delete_pit(request, pk):
+    pit = get_object_or_404(PointInTime, pk=pk)
+    project_id = pit.project.pk
+    
+    if request.method == 'POST':
+        if 'confirm' in request.POST:
+            pit.delete()
+            messages.success(request, 'PIT deletada com sucesso!')
+            return redirect('project_detail', pk=project_id)
+    
+    return render(request, 'modeler/pit_confirm_delete.html', {'pit': pit})
+
+def save_bridge(request, form, formset, project):
+    """Valida o caminho e grava a Bridge com seus passos.
+
+    Retorna a Bridge salva ou None se o caminho for inválido.
+    """
+    steps = [
+        (f['link'], f['hub'])
+        for f in formset.cleaned_data
+        if f and not f.get('DELETE', False)
+    ]
+    errors = bridge_path_errors(form.cleaned_data['start_hub'], steps)
+    if errors:
+        for error in errors:
+            messages.error(request, error)
+        return None
+
+    with transaction.atomic():
+        bridge = form.save(commit=False)
+        bridge.project = project
+        bridge.save()
+        bridge.steps.all().delete()
+        for position, (link, hub) in enumerate(steps):
+            BridgeStep.objects.create(bridge=bridge, position=position, link=link, hub=hub)
+    return bridge
+
+def create_bridge(request, project_pk):
+    """Cria uma Bridge sobre um caminho hub -> link -> hub."""
+    project = get_object_or_404(Project, pk=project_pk)
+
+    if not project.links.exists():
+        messages.warning(request, 'É necessário ter pelo menos um Link antes de criar uma Bridge.')
+        return redirect('project_detail', pk=project.pk)
+
+    if request.method == 'POST':
+        form = BridgeForm(request.POST, initial={'project': project.pk})
+        formset = BridgeStepFormSet(request.POST, prefix='steps', form_kwargs={'project': project})
+        if form.is_valid() and formset.is_valid():
+            if save_bridge(request, form, formset, project):
+                messages.success(request, 'Bridge criada com sucesso!')
+                return redirect('project_detail', pk=project.pk)
+        else:
+            messages.error(request, 'Por favor, corrija os erros no formulário.')
+    else:
+        form = BridgeForm(initial={'project': project.pk})
+        formset = BridgeStepFormSet(prefix='steps', form_kwargs={'project': project})
+
+    return render(request, 'modeler/bridge_form.html', {
+        'form': form,
+        'formset': formset,
+        'project': project
+    })
+
+def update_bridge(request, pk):
+    bridge = get_object_or_404(Bridge, pk=pk)
+    project = bridge.project
+    if request.method == 'POST':
+        form = BridgeForm(request.POST, instance=bridge, initial={'project': project})
+        formset = BridgeStepEditFormSet(request.POST, prefix='steps', form_kwargs={'project': project})
+        if form.is_valid() and formset.is_valid():
+            if save_bridge(request, form, formset, project):
+                messages.success(request, 'Bridge atualizada com sucesso!')
+                return redirect('project_detail', pk=project.pk)
+        else:
+            messages.error(request, 'Por favor, corrija os erros no formulário.')
+    else:
+        form = BridgeForm(instance=bridge, initial={'project': project})
+        initial_steps = [{'link': step.link_id, 'hub': step.hub_id} for step in bridge.steps.all()]
+        formset = BridgeStepEditFormSet(prefix='steps', initial=initial_steps, form_kwargs={'project': project})
+    return render(request, 'modeler/bridge_form.html', {
+        'form': form,
+        'formset': formset,
+        'bridge': bridge,
+        'project': project
+    })
+
+def delete_bridge(request, pk):
+    bridge = get_object_or_404(Bridge, pk=pk)
+    project_id = bridge.project.pk
+
+    if request.method == 'POST':
+        if 'confirm' in request.POST:
+            bridge.delete()
+            messages.success(request, 'Bridge deletada com sucesso!')
+            return redirect('project_detail', pk=project_id)
+
+    return render(request, 'modeler/bridge_confirm_delete.html', {'bridge': bridge})
+
 def visualize_legacy(request):
     """Função de compatibilidade para redirecionar a URL antiga para a nova."""
     project_id = request.GET.get('project')
@@ -259,17 +612,11 @@ def visualize_legacy(request):
         return redirect('visualize', pk=project_id)
     return redirect('project_list')
 
-def visualize(request, pk):
-    """Visualiza o modelo Data Vault usando Mermaid."""
-    project = get_object_or_404(Project, pk=pk)
-    hubs = Hub.objects.filter(project=project)
-    links = Link.objects.filter(project=project).prefetch_related('hubs')
-    satellites = Satellite.objects.filter(project=project).select_related('content_type')
-    
-    # Cria dicionários para mapear IDs para nomes
-    hub_name_map = {str(hub.id): hub.name for hub in hubs}
-    link_name_map = {str(link.id): link.name for link in links}
-    
+def build_mermaid(graph, attributes=True):
+    """Monta o código Mermaid (erDiagram) a partir do grafo do projeto.
+
+    Com ``attributes=False`` os satellites mostram só a chave do pai.
+    """
     mermaid_lines = []
     mermaid_lines.append('erDiagram')
     
@@ -282,7 +629,7 @@ def visualize(request, pk):
     ])
     
     # Adiciona as entidades Hub
-    for hub in hubs:
+    for hub in graph.hubs.values():
         safe_name = re.sub(r'\W+', '_', hub.name)
         mermaid_lines.append(f'    H_{safe_name}:::hubStyle {{')
         mermaid_lines.append(f'        string HK_{safe_name}')
@@ -292,11 +639,12 @@ def visualize(request, pk):
         mermaid_lines.append('    }')
     
     # Adiciona as entidades Link
-    for link in links:
+    for link in graph.links.values():
         safe_name = re.sub(r'\W+', '_', link.name)
+        link_hubs = graph.hubs_of(link)
         mermaid_lines.append(f'    L_{safe_name}:::linkStyle {{')
         mermaid_lines.append(f'        string HK_{safe_name}')
-        for hub in link.hubs.all():
+        for hub in link_hubs:
             safe_hub = re.sub(r'\W+', '_', hub.name)
             mermaid_lines.append(f'        string HK_{safe_hub}')
         mermaid_lines.append(f'        datetime load_date')
@@ -304,57 +652,114 @@ def visualize(request, pk):
         mermaid_lines.append('    }')
         
         # Adiciona os relacionamentos do Link com os Hubs
-        for hub in link.hubs.all():
+        for hub in link_hubs:
             safe_hub = re.sub(r'\W+', '_', hub.name)
             mermaid_lines.append(f'    L_{safe_name} }}|--|| H_{safe_hub} : "references"')
     
     # Adiciona as entidades Satellite
-    for satellite in satellites:
+    for satellite in graph.satellites.values():
         safe_name = re.sub(r'\W+', '_', satellite.name)
         mermaid_lines.append(f'    S_{safe_name}:::satelliteStyle {{')
         
         # Adiciona a chave do pai (Hub ou Link)
-        parent_name = None
-        if satellite.content_type.model == 'hub':
-            parent = Hub.objects.get(id=satellite.object_id)
-            parent_name = parent.name
-            safe_parent = re.sub(r'\W+', '_', parent_name)
-            mermaid_lines.append(f'        string HK_{safe_parent}')
-        elif satellite.content_type.model == 'link':
-            parent = Link.objects.get(id=satellite.object_id)
-            parent_name = parent.name
-            safe_parent = re.sub(r'\W+', '_', parent_name)
+        parent_kind, parent = graph.parent_of(satellite)
+        if parent is not None:
+            safe_parent = re.sub(r'\W+', '_', parent.name)
             mermaid_lines.append(f'        string HK_{safe_parent}')
         
-        # Adiciona o HK_DIFF e campos default
-        mermaid_lines.append(f'        string HK_DIFF')
-        mermaid_lines.append(f'        datetime valid_from')
-        mermaid_lines.append(f'        datetime valid_to')
-        mermaid_lines.append(f'        boolean is_current')
-        
-        # Adiciona os atributos específicos
-        for name, tipo in satellite.attributes.items():
-            safe_attr = re.sub(r'\W+', '_', name)
-            mermaid_lines.append(f'        {tipo} {safe_attr} "{name}"')
-        
-        # Adiciona os campos de auditoria
-        mermaid_lines.append(f'        datetime load_date')
-        mermaid_lines.append(f'        string record_source')
+        if attributes:
+            # Adiciona o HK_DIFF e campos default
+            mermaid_lines.append(f'        string HK_DIFF')
+            mermaid_lines.append(f'        datetime valid_from')
+            mermaid_lines.append(f'        datetime valid_to')
+            mermaid_lines.append(f'        boolean is_current')
+            
+            # Adiciona os atributos específicos
+            for name, tipo in satellite.attributes.items():
+                safe_attr = re.sub(r'\W+', '_', name)
+                mermaid_lines.append(f'        {tipo} {safe_attr} "{name}"')
+            
+            # Adiciona os campos de auditoria
+            mermaid_lines.append(f'        datetime load_date')
+            mermaid_lines.append(f'        string record_source')
         mermaid_lines.append('    }')
         
         # Adiciona o relacionamento do Satellite com seu pai
-        if parent_name:
-            safe_parent = re.sub(r'\W+', '_', parent_name)
-            prefix = 'H_' if satellite.content_type.model == 'hub' else 'L_'
+        if parent is not None:
+            prefix = 'H_' if parent_kind == 'hub' else 'L_'
             mermaid_lines.append(f'    S_{safe_name} }}|--|| {prefix}{safe_parent} : "describes"')
     
-    mermaid_data = "\n".join(mermaid_lines)
+    return "\n".join(mermaid_lines)
+
+def neighborhood_mermaid(project, scope):
+    """Mermaid da vizinhança escolhida em ``scope`` (dados de DiagramScopeForm)."""
+    kind, entity_id = scope['focus']
+    depth = scope['depth']
+    hide_satellites, hide_attributes = scope['hide_satellites'], scope['hide_attributes']
+
+    def build():
+        graph = load_neighborhood_graph(project, kind, entity_id, depth, satellites=not hide_satellites)
+        if graph is None:
+            raise Http404('Entidade não encontrada no projeto.')
+        return build_mermaid(graph, attributes=not hide_attributes)
+
+    artifact = f'mermaid-{kind}-{entity_id}-{depth}-{int(hide_satellites)}{int(hide_attributes)}'
+    return artifact_cache.get_or_build(artifact, project, build)
+
+def full_mermaid(project, scope):
+    """Mermaid do projeto inteiro, ou '' se ele passar de MAX_DIAGRAM_ENTITIES
+    entidades (o '' também fica no cache, até a próxima revisão)."""
+    full, hide_attributes = scope['full'], scope['hide_attributes']
+
+    def build():
+        # Um COUNT antes de montar o grafo: projetos grandes nem chegam a carregá-lo
+        entities = project.hubs.values('pk').union(
+            project.links.values('pk'), project.satellites.values('pk'), all=True
+        )
+        if not full and entities.count() > MAX_DIAGRAM_ENTITIES:
+            return ''
+        return build_mermaid(load_project_graph(project), attributes=not hide_attributes)
+
+    artifact = 'mermaid' + ('-full' if full else '') + ('-collapsed' if hide_attributes else '')
+    return artifact_cache.get_or_build(artifact, project, build)
+
+@project_condition('visualize')
+def visualize(request, pk):
+    """Visualiza o modelo Data Vault usando Mermaid.
+
+    Com ``focus`` (``hub:<id>`` ou ``link:<id>``) mostra só a vizinhança da
+    entidade; sem ele, o projeto inteiro, exceto quando grande demais para o
+    navegador, caso em que lista os hubs (paginados) para escolher o recorte.
+    """
+    project = get_project(request, pk)
+    scope_form = DiagramScopeForm(request.GET)
     error_message = None
+    mermaid_data = ''
+    focus = hub_page = None
+    if not scope_form.is_valid():
+        error_message = 'Recorte inválido: ' + '; '.join(
+            f'{field}: {" ".join(errors)}' for field, errors in scope_form.errors.items()
+        )
+    elif scope_form.cleaned_data['focus']:
+        kind, entity_id = scope_form.cleaned_data['focus']
+        model = Hub if kind == 'hub' else Link
+        focus = get_object_or_404(model.objects.only('id', 'name'), pk=entity_id, project=project)
+        focus.kind = kind
+        mermaid_data = neighborhood_mermaid(project, scope_form.cleaned_data)
+    else:
+        mermaid_data = full_mermaid(project, scope_form.cleaned_data)
+        if not mermaid_data:
+            hubs = Hub.objects.filter(project=project).order_by('name').only('id', 'name')
+            hub_page = Paginator(hubs, DIAGRAM_HUBS_PER_PAGE).get_page(request.GET.get('page'))
     
     return render(request, 'modeler/visualize.html', {
         'mermaid_data': mermaid_data,
         'error_message': error_message,
-        'project': project
+        'project': project,
+        'scope_form': scope_form,
+        'focus': focus,
+        'hub_page': hub_page,
+        'max_entities': MAX_DIAGRAM_ENTITIES,
     })
 
 class ProjectListView(ListView):
@@ -365,13 +770,13 @@ class ProjectListView(ListView):
 class ProjectCreateView(CreateView):
     model = Project
     template_name = 'modeler/project_form.html'
-    fields = ['name', 'description']
+    form_class = ProjectForm
     success_url = reverse_lazy('project_list')
 
 class ProjectUpdateView(UpdateView):
     model = Project
     template_name = 'modeler/project_form.html'
-    fields = ['name', 'description']
+    form_class = ProjectForm
     success_url = reverse_lazy('project_list')
 
 class ProjectDeleteView(DeleteView):
@@ -379,192 +784,158 @@ class ProjectDeleteView(DeleteView):
     template_name = 'modeler/project_confirm_delete.html'
     success_url = reverse_lazy('project_list')
 
-def project_detail(request, pk):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['impact'] = DeleteImpact.for_project(self.object)
+        return context
+
+    def form_valid(self, form):
+        # A prévia (DeleteImpact) só é montada na página de confirmação
+        delete_project(self.object)
+        return redirect(self.get_success_url())
+
+
+@require_http_methods(['GET', 'POST'])
+def api_batch(request, pk):
+    """API JSON: aplica um lote de operações em hubs, links e satellites.
+
+    Recebe ``{"operations": [...]}`` e responde ``{"ok": ..., "results": [...]}``
+    com um resultado por operação; com qualquer erro, nada é gravado (400).
+    O POST passa pela proteção CSRF (cabeçalho ``X-CSRFToken``) e só aceita
+    ``application/json``; o GET devolve o token e grava o cookie ``csrftoken``.
+    """
+    if request.method == 'GET':
+        get_object_or_404(Project, pk=pk)
+        return JsonResponse({'csrf_token': get_token(request)})
+    if request.content_type != 'application/json':
+        return JsonResponse({'ok': False, 'error': 'Envie o lote com Content-Type: application/json.'}, status=415)
+    project = get_object_or_404(Project, pk=pk)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'ok': False, 'error': 'O corpo da requisição deve ser JSON.'}, status=400)
+    operations = payload.get('operations') if isinstance(payload, dict) else None
+    if not isinstance(operations, list):
+        return JsonResponse({'ok': False, 'error': 'Informe a lista "operations".'}, status=400)
+    if len(operations) > MAX_OPERATIONS:
+        return JsonResponse(
+            {'ok': False, 'error': f'O lote aceita no máximo {MAX_OPERATIONS} operações.'}, status=400
+        )
+    ok, results = apply_batch(project, operations)
+    return JsonResponse({'ok': ok, 'results': results}, status=200 if ok else 400)
+
+def clone_project(request, pk):
+    """Cria uma cópia completa do projeto com outro nome."""
+    project = get_object_or_404(Project, pk=pk)
+    if request.method == 'POST':
+        form = ProjectCloneForm(request.POST)
+        if form.is_valid():
+            clone = project.clone(form.cleaned_data['name'])
+            messages.success(request, f'Projeto copiado para "{clone.name}".')
+            return redirect('project_detail', pk=clone.pk)
+    else:
+        form = ProjectCloneForm(initial={'name': f'{project.name} (cópia)'})
+
+    return render(request, 'modeler/project_clone.html', {'project': project, 'form': form})
+
+def export_project(request, pk):
+    """Exporta o modelo do projeto em JSON (o formato aceito pela importação)."""
     project = get_object_or_404(Project, pk=pk)
+    response = StreamingHttpResponse(
+        iter_encoded(iter_project_json(project)), content_type='application/json; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{project.name}.json"'
+    return response
+
+@project_condition('project_detail')
+def project_detail(request, pk):
+    project = get_project(request, pk)
     context = {
         'project': project,
         'hubs': project.hubs.all(),
         'links': project.links.all(),
-        'satellites': project.satellites.all()
+        'satellites': project.satellites.select_related('hub', 'link'),
+        'pits': project.pits.select_related('hub', 'link'),
+        'bridges': project.bridges.select_related('start_hub')
     }
     return render(request, 'modeler/project_detail.html', context)
 
+def import_model(request, pk):
+    """Importa hubs, links, satellites e atributos de um arquivo de modelo."""
+    project = get_object_or_404(Project, pk=pk)
+    errors = []
+    if request.method == 'POST':
+        form = ModelFileForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                counts = import_model_upload(project, form.cleaned_data['model_file'])
+            except ModelImportError as error:
+                messages.error(request, f'Nada foi importado: {error}')
+                errors = error.errors
+            else:
+                messages.success(
+                    request,
+                    f'Importados {counts["hubs"]} hub(s), {counts["links"]} link(s), '
+                    f'{counts["satellites"]} satellite(s) e {counts["attributes"]} atributo(s).'
+                )
+                return redirect('project_detail', pk=project.pk)
+    else:
+        form = ModelFileForm()
+
+    return render(request, 'modeler/import_model.html', {
+        'project': project,
+        'form': form,
+        'errors': errors,
+    })
+
+@project_condition('view_ddl')
 def view_ddl(request, pk):
     """Visualiza o DDL SQL na página."""
-    project = get_object_or_404(Project, pk=pk)
-    hubs = Hub.objects.filter(project=project)
-    links = Link.objects.filter(project=project)
-    satellites = Satellite.objects.filter(project=project)
-    
-    # Mapeamento de tipos Python para SQL
-    type_mapping = {
-        'string': 'VARCHAR(255)',
-        'integer': 'INTEGER',
-        'float': 'DECIMAL(18,2)',
-        'boolean': 'BOOLEAN',
-        'datetime': 'TIMESTAMP',
-        'date': 'DATE'
-    }
-    
-    ddl_lines = []
-    ddl_lines.append(f'-- DDL gerado automaticamente para o projeto: {project.name}')
-    ddl_lines.append('\n-- Criação dos Hubs')
-    
-    # Gera DDL para Hubs
-    for hub in hubs:
-        safe_name = re.sub(r'\W+', '_', hub.name)
-        ddl_lines.append(f'\nCREATE TABLE H_{safe_name} (')
-        ddl_lines.append(f'    HK_{safe_name} VARCHAR(32) PRIMARY KEY,')
-        ddl_lines.append(f'    {hub.business_key} VARCHAR(255) NOT NULL,')
-        ddl_lines.append('    load_date TIMESTAMP NOT NULL,')
-        ddl_lines.append('    record_source VARCHAR(255) NOT NULL')
-        ddl_lines.append(');')
-    
-    # Gera DDL para Links
-    ddl_lines.append('\n-- Criação dos Links')
-    for link in links:
-        safe_name = re.sub(r'\W+', '_', link.name)
-        ddl_lines.append(f'\nCREATE TABLE L_{safe_name} (')
-        ddl_lines.append(f'    HK_{safe_name} VARCHAR(32) PRIMARY KEY,')
-        
-        # Adiciona as chaves dos Hubs relacionados
-        for hub in link.hubs.all():
-            safe_hub = re.sub(r'\W+', '_', hub.name)
-            ddl_lines.append(f'    HK_{safe_hub} VARCHAR(32) NOT NULL,')
-            ddl_lines.append(f'    FOREIGN KEY (HK_{safe_hub}) REFERENCES H_{safe_hub}(HK_{safe_hub}),')
-        
-        ddl_lines.append('    load_date TIMESTAMP NOT NULL,')
-        ddl_lines.append('    record_source VARCHAR(255) NOT NULL')
-        ddl_lines.append(');')
-    
-    # Gera DDL para Satellites
-    ddl_lines.append('\n-- Criação dos Satellites')
-    for satellite in satellites:
-        safe_name = re.sub(r'\W+', '_', satellite.name)
-        ddl_lines.append(f'\nCREATE TABLE S_{safe_name} (')
-        
-        # Adiciona a chave do pai (Hub ou Link)
-        parent_fk = None
-        if satellite.content_type.model == 'hub':
-            parent_name = Hub.objects.get(id=satellite.object_id).name
-            safe_parent = re.sub(r'\W+', '_', parent_name)
-            ddl_lines.append(f'    HK_{safe_parent} VARCHAR(32) NOT NULL,')
-            ddl_lines.append(f'    FOREIGN KEY (HK_{safe_parent}) REFERENCES H_{safe_parent}(HK_{safe_parent}),')
-        elif satellite.content_type.model == 'link':
-            parent_name = Link.objects.get(id=satellite.object_id).name
-            safe_parent = re.sub(r'\W+', '_', parent_name)
-            ddl_lines.append(f'    HK_{safe_parent} VARCHAR(32) NOT NULL,')
-            ddl_lines.append(f'    FOREIGN KEY (HK_{safe_parent}) REFERENCES L_{safe_parent}(HK_{safe_parent}),')
-        
-        # Adiciona o HK_DIFF e campos default
-        ddl_lines.append('    HK_DIFF VARCHAR(32) NOT NULL,')
-        ddl_lines.append('    valid_from TIMESTAMP NOT NULL,')
-        ddl_lines.append('    valid_to TIMESTAMP,')
-        ddl_lines.append('    is_current BOOLEAN NOT NULL,')
-        
-        # Adiciona os atributos específicos
-        for name, tipo in satellite.attributes.items():
-            safe_attr = re.sub(r'\W+', '_', name)
-            sql_type = type_mapping.get(tipo.lower(), 'VARCHAR(255)')
-            ddl_lines.append(f'    {safe_attr} {sql_type},')
-        
-        # Adiciona os campos de auditoria
-        ddl_lines.append('    load_date TIMESTAMP NOT NULL,')
-        ddl_lines.append('    record_source VARCHAR(255) NOT NULL,')
-        ddl_lines.append('    PRIMARY KEY (HK_DIFF)')
-        ddl_lines.append(');')
+    project = get_project(request, pk)
+    ddl_content = artifact_cache.get_or_build(
+        'ddl', project, lambda: build_ddl(load_project_graph(project))
+    )
     
     return render(request, 'modeler/view_ddl.html', {
         'project': project,
-        'ddl_content': '\n'.join(ddl_lines)
+        'ddl_content': ddl_content
     })
 
+@project_condition('view_load_sql')
+def view_load_sql(request, pk):
+    """Visualiza o SQL de carga (INSERT ... SELECT) do projeto."""
+    project = get_project(request, pk)
+    load_sql = artifact_cache.get_or_build(
+        'load_sql', project, lambda: build_load_sql(load_project_graph(project))
+    )
+    
+    return render(request, 'modeler/view_load_sql.html', {
+        'project': project,
+        'load_sql': load_sql
+    })
+
+@project_condition('generate_ddl')
 def generate_ddl(request, pk):
     """Gera o DDL SQL para download."""
-    project = get_object_or_404(Project, pk=pk)
-    hubs = Hub.objects.filter(project=project)
-    links = Link.objects.filter(project=project)
-    satellites = Satellite.objects.filter(project=project)
-    
-    # Mapeamento de tipos Python para SQL
-    type_mapping = {
-        'string': 'VARCHAR(255)',
-        'integer': 'INTEGER',
-        'float': 'DECIMAL(18,2)',
-        'boolean': 'BOOLEAN',
-        'datetime': 'TIMESTAMP',
-        'date': 'DATE'
-    }
-    
-    ddl_lines = []
-    ddl_lines.append(f'-- DDL gerado automaticamente para o projeto: {project.name}')
-    ddl_lines.append('\n-- Criação dos Hubs')
-    
-    # Gera DDL para Hubs
-    for hub in hubs:
-        safe_name = re.sub(r'\W+', '_', hub.name)
-        ddl_lines.append(f'\nCREATE TABLE H_{safe_name} (')
-        ddl_lines.append(f'    HK_{safe_name} VARCHAR(32) PRIMARY KEY,')
-        ddl_lines.append(f'    {hub.business_key} VARCHAR(255) NOT NULL,')
-        ddl_lines.append('    load_date TIMESTAMP NOT NULL,')
-        ddl_lines.append('    record_source VARCHAR(255) NOT NULL')
-        ddl_lines.append(');')
+    project = get_project(request, pk)
     
-    # Gera DDL para Links
-    ddl_lines.append('\n-- Criação dos Links')
-    for link in links:
-        safe_name = re.sub(r'\W+', '_', link.name)
-        ddl_lines.append(f'\nCREATE TABLE L_{safe_name} (')
-        ddl_lines.append(f'    HK_{safe_name} VARCHAR(32) PRIMARY KEY,')
-        
-        # Adiciona as chaves dos Hubs relacionados
-        for hub in link.hubs.all():
-            safe_hub = re.sub(r'\W+', '_', hub.name)
-            ddl_lines.append(f'    HK_{safe_hub} VARCHAR(32) NOT NULL,')
-            ddl_lines.append(f'    FOREIGN KEY (HK_{safe_hub}) REFERENCES H_{safe_hub}(HK_{safe_hub}),')
-        
-        ddl_lines.append('    load_date TIMESTAMP NOT NULL,')
-        ddl_lines.append('    record_source VARCHAR(255) NOT NULL')
-        ddl_lines.append(');')
+    # Com ?gzip=1 o arquivo é comprimido durante o envio
+    compress = request.GET.get('gzip') == '1'
     
-    # Gera DDL para Satellites
-    ddl_lines.append('\n-- Criação dos Satellites')
-    for satellite in satellites:
-        safe_name = re.sub(r'\W+', '_', satellite.name)
-        ddl_lines.append(f'\nCREATE TABLE S_{safe_name} (')
-        
-        # Adiciona a chave do pai (Hub ou Link)
-        parent_fk = None
-        if satellite.content_type.model == 'hub':
-            parent_name = Hub.objects.get(id=satellite.object_id).name
-            safe_parent = re.sub(r'\W+', '_', parent_name)
-            ddl_lines.append(f'    HK_{safe_parent} VARCHAR(32) NOT NULL,')
-            ddl_lines.append(f'    FOREIGN KEY (HK_{safe_parent}) REFERENCES H_{safe_parent}(HK_{safe_parent}),')
-        elif satellite.content_type.model == 'link':
-            parent_name = Link.objects.get(id=satellite.object_id).name
-            safe_parent = re.sub(r'\W+', '_', parent_name)
-            ddl_lines.append(f'    HK_{safe_parent} VARCHAR(32) NOT NULL,')
-            ddl_lines.append(f'    FOREIGN KEY (HK_{safe_parent}) REFERENCES L_{safe_parent}(HK_{safe_parent}),')
-        
-        # Adiciona o HK_DIFF e campos default
-        ddl_lines.append('    HK_DIFF VARCHAR(32) NOT NULL,')
-        ddl_lines.append('    valid_from TIMESTAMP NOT NULL,')
-        ddl_lines.append('    valid_to TIMESTAMP,')
-        ddl_lines.append('    is_current BOOLEAN NOT NULL,')
-        
-        # Adiciona os atributos específicos
-        for name, tipo in satellite.attributes.items():
-            safe_attr = re.sub(r'\W+', '_', name)
-            sql_type = type_mapping.get(tipo.lower(), 'VARCHAR(255)')
-            ddl_lines.append(f'    {safe_attr} {sql_type},')
-        
-        # Adiciona os campos de auditoria
-        ddl_lines.append('    load_date TIMESTAMP NOT NULL,')
-        ddl_lines.append('    record_source VARCHAR(255) NOT NULL,')
-        ddl_lines.append('    PRIMARY KEY (HK_DIFF)')
-        ddl_lines.append(');')
+    # Serve do cache quando disponível; caso contrário gera o DDL entidade
+    # por entidade, sem montar o arquivo inteiro em memória
+    ddl_content = artifact_cache.get('ddl', project)
+    if ddl_content is not None:
+        chunks = [ddl_content]
+    else:
+        chunks = iter_ddl(load_project_graph(project, stream_satellites=True))
     
     # Retorna o DDL como texto com encoding UTF-8
-    response = HttpResponse('\n'.join(ddl_lines), content_type='text/plain; charset=utf-8')
-    response['Content-Disposition'] = f'attachment; filename="{project.name}_ddl.sql"'
+    filename = f'{project.name}_ddl.sql'
+    if compress:
+        response = StreamingHttpResponse(iter_encoded(chunks, gzip=True), content_type='application/gzip')
+        filename += '.gz'
+    else:
+        response = StreamingHttpResponse(iter_encoded(chunks), content_type='text/plain; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response